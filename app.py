@@ -15,9 +15,14 @@ import sys
 sys.path.append(str(Path(__file__).parent))
 
 # Import modules
-from config import PAGE_TITLE, PAGE_ICON, LAYOUT, MAX_ROWS_DISPLAY
+from config import PAGE_TITLE, PAGE_ICON, LAYOUT, MAX_ROWS_DISPLAY, ENABLE_PROFILER
 from auth import show_login_page, check_authentication, logout, get_current_user, get_user_role, has_access
-from src.data.loader import load_all_data, refresh_cache, load_katalog
+from src.data.loader import (
+    load_all_data, refresh_cache, load_katalog, get_load_timings,
+    load_fleet_health_trend, load_feasibility_features, load_rental_cube, load_aggregates, load_occupancy,
+    load_dashboard_cube, load_reliability, load_demand_forecast, is_refreshing, RENTAL_CUBE_GRAIN,
+    HISTORY_PREVIEW
+)
 from src.data.processor import (
     get_maintenance_summary,
     get_top_maintenance_items,
@@ -26,8 +31,13 @@ from src.data.processor import (
     get_rental_trends,
     get_utilization_rate,
     get_category_performance,
+    get_maintenance_mix,
     get_strategic_insights,
-    classify_lifecycle_stage
+    classify_lifecycle_stage,
+    evaluate_scoring_policies,
+    ScoringParams,
+    DEFAULT_SCORING,
+    TREND_GRANULARITIES
 )
 from src.visualization.charts import (
     create_recommendation_pie_chart,
@@ -41,13 +51,20 @@ from src.visualization.charts import (
     create_box_feasibility_by_category,
     create_heatmap_maintenance_burden,
     create_quadrant_lifecycle,
-    create_gauge_chart
+    create_gauge_chart,
+    create_fleet_health_trend_chart,
+    create_category_occupancy_chart,
+    create_maintenance_mix_chart,
+    create_survival_curve_chart,
+    create_demand_forecast_chart
 )
 from src.visualization.metrics import (
     display_summary_metrics,
     display_severity_metrics,
     display_recommendation_summary
 )
+from src.data.forecast import forecast_totals, FORECAST_HORIZON, INTERVAL_LEVEL
+from src.utils.cache import frame_version, stamp_version
 
 # Page config
 st.set_page_config(
@@ -256,6 +273,15 @@ def main():
     with st.spinner("Loading data..."):
         katalog_df, penyewaan_df, maintenance_df, insight_df = load_all_data()
     
+    if is_refreshing():
+        st.sidebar.caption("🔄 Data baru sedang diproses di background - menampilkan versi sebelumnya")
+    
+    if ENABLE_PROFILER:
+        with st.sidebar:
+            st.caption("⏱️ Load timings (cache miss terakhir)")
+            for source, seconds in get_load_timings().items():
+                st.caption(f"{source}: {seconds * 1000:.0f} ms")
+    
     if katalog_df.empty or insight_df.empty:
         st.error("❌ Data tidak dapat dimuat. Pastikan semua file dataset tersedia.")
         return
@@ -388,7 +414,7 @@ def show_overview_page(katalog_df, penyewaan_df, maintenance_df, insight_df):
     
     with col1:
         # Pie chart
-        rec_dist = get_recommendation_distribution(insight_df)
+        rec_dist = get_recommendation_distribution(insight_df, cube=load_dashboard_cube())
         if not rec_dist.empty:
             fig = create_recommendation_pie_chart(rec_dist)
             st.plotly_chart(fig, use_container_width=True)
@@ -421,6 +447,26 @@ def show_overview_page(katalog_df, penyewaan_df, maintenance_df, insight_df):
     
     st.divider()
     
+    # Rental Trend - setiap granularity adalah rollup dari cube penyewaan yang sudah di-cache.
+    # Cube bulanan (streaming mode) hanya bisa di-rollup ke bulanan / kuartalan.
+    st.subheader("📈 Trend Penyewaan")
+    
+    options = list(TREND_GRANULARITIES) if RENTAL_CUBE_GRAIN == 'D' else ['M', 'Q']
+    granularity = st.radio(
+        "Granularity",
+        options=options,
+        index=options.index('M'),
+        format_func=TREND_GRANULARITIES.get,
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+    trends = get_rental_trends(load_rental_cube(), katalog_df, granularity)
+    if not trends.empty:
+        fig = create_rental_trend_chart(trends, granularity)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Data trend penyewaan tidak tersedia")
+    
     
 
 
@@ -461,6 +507,13 @@ def show_tactical_dashboard(insight_df, maintenance_df):
         return
     
     filtered_df = insight_df[insight_df['kategori'].isin(selected_categories)].copy()
+    # Hasil filter diberi token turunan agar cache processor/charts tidak meng-hash isinya
+    insight_version = frame_version(insight_df)
+    if insight_version is not None:
+        stamp_version(filtered_df, (insight_version, 'kategori', tuple(sorted(selected_categories))))
+    
+    # Ringkasan (statistik, median, threshold count) untuk kategori terpilih
+    summary = get_strategic_insights(filtered_df)
     
     st.divider()
     
@@ -485,7 +538,7 @@ def show_tactical_dashboard(insight_df, maintenance_df):
         )
     
     with col2:
-        avg_kelayakan = filtered_df['kelayakan'].mean()
+        avg_kelayakan = summary['avg_kelayakan']
         st.metric(
             "Avg Kelayakan",
             f"{avg_kelayakan:.1f}%",
@@ -493,18 +546,16 @@ def show_tactical_dashboard(insight_df, maintenance_df):
         )
     
     with col3:
-        high_maintenance = len(filtered_df[filtered_df['maintenance_ratio'] > 0.3])
         st.metric(
             "High Maintenance",
-            high_maintenance,
+            summary['high_maintenance_count'],
             help="Alat dengan maintenance ratio > 30%"
         )
     
     with col4:
-        underutilized = len(filtered_df[filtered_df['freq_sewa'] < filtered_df['freq_sewa'].median()])
         st.metric(
             "Underutilized",
-            underutilized,
+            summary['underutilized_count'],
             help="Alat dengan utilisasi di bawah median"
         )
     
@@ -512,7 +563,9 @@ def show_tactical_dashboard(insight_df, maintenance_df):
     
     # Category Performance Cards - Lazy render dengan expander
     with st.expander("📊 Category Performance", expanded=False):
-        category_perf = get_category_performance(filtered_df)
+        category_perf = get_category_performance(
+            filtered_df, cube=load_dashboard_cube(), categories=selected_categories
+        )
         
         # Display as cards - limit to 3 for performance
         cols = st.columns(3)
@@ -551,12 +604,68 @@ def show_tactical_dashboard(insight_df, maintenance_df):
     
     # Utilization chart in expander for lazy loading
     with st.expander("📈 View Top Utilization Chart", expanded=False):
-        util_data = get_utilization_rate(filtered_df)
+        occupancy_days = st.selectbox("Periode Okupansi", options=[30, 90, 180, 365], index=1,
+                                      format_func=lambda d: f"{d} hari terakhir")
+        item_occupancy, category_occupancy = load_occupancy(occupancy_days)
+        
+        util_data = get_utilization_rate(filtered_df, item_occupancy)
         if not util_data.empty:
             fig = create_utilization_chart(util_data, top_n=10)
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("Data utilisasi tidak tersedia")
+        
+        if not category_occupancy.empty:
+            selected = category_occupancy[category_occupancy['kategori'].isin(selected_categories)]
+            fig = create_category_occupancy_chart(selected)
+            st.plotly_chart(fig, use_container_width=True)
+    
+    # Reliability: interval antar maintenance (MTBF) dan survival curve per kategori
+    with st.expander("🔧 Maintenance Interval & MTBF", expanded=False):
+        item_reliability, category_reliability, survival = load_reliability()
+        
+        if category_reliability.empty:
+            st.info("Data interval maintenance tidak tersedia")
+        else:
+            category_reliability = category_reliability[category_reliability['kategori'].isin(selected_categories)]
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                mtbf = (category_reliability['mtbf_hari'] * category_reliability['jumlah_interval']).sum()
+                st.metric("MTBF", f"{mtbf / max(category_reliability['jumlah_interval'].sum(), 1):.1f} hari",
+                          help="Rata-rata hari antar dua maintenance berurutan")
+            with col2:
+                st.metric("Interval Tercatat", f"{int(category_reliability['jumlah_interval'].sum()):,}")
+            with col3:
+                sewa = (category_reliability['sewa_antar_maintenance'] * category_reliability['jumlah_interval']).sum()
+                st.metric("Sewa antar Maintenance", f"{sewa / max(category_reliability['jumlah_interval'].sum(), 1):.1f}",
+                          help="Rata-rata jumlah sewa di antara dua maintenance")
+            
+            fig = create_survival_curve_chart(survival[survival['kategori'].isin(selected_categories)])
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(
+                category_reliability.round(1),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "kategori": "Kategori",
+                    "jumlah_interval": "Interval",
+                    "mtbf_hari": "MTBF (hari)",
+                    "p25_hari": "P25",
+                    "median_hari": "Median",
+                    "p75_hari": "P75",
+                    "sewa_antar_maintenance": "Sewa/Interval"
+                }
+            )
+            
+            # Barang dengan interval maintenance terpendek di kategori terpilih
+            shortest = filtered_df[['kode_barang', 'nama_barang', 'kategori']].merge(
+                item_reliability.dropna(subset=['mtbf_hari']), on='kode_barang'
+            ).nsmallest(10, 'mtbf_hari')
+            if not shortest.empty:
+                st.markdown("**Interval maintenance terpendek:**")
+                st.dataframe(shortest.round(1), use_container_width=True, hide_index=True)
     
     st.divider()
     
@@ -627,7 +736,8 @@ def show_strategic_dashboard(insight_df):
     # Category Ranking Table
     st.subheader("🏆 Category Ranking by Performance")
     
-    category_perf = get_category_performance(insight_df)
+    dashboard_cube = load_dashboard_cube()
+    category_perf = get_category_performance(insight_df, cube=dashboard_cube)
     
     # Format for display
     display_cat = category_perf.copy()
@@ -654,11 +764,13 @@ def show_strategic_dashboard(insight_df):
     st.divider()
     
     # Strategic Visualizations - Lazy loading per tab
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "📊 Correlation Analysis", 
         "📦 Portfolio Distribution", 
         "🔥 Maintenance Burden",
-        "🎯 Lifecycle Matrix"
+        "🎯 Lifecycle Matrix",
+        "📉 Fleet Health Trend",
+        "🔮 Demand Forecast"
     ])
     
     with tab1:
@@ -702,20 +814,25 @@ def show_strategic_dashboard(insight_df):
         st.caption("Identifikasi kategori dengan maintenance burden tertinggi")
         
         with st.spinner("Generating heatmap..."):
-            fig = create_heatmap_maintenance_burden(insight_df)
+            fig = create_heatmap_maintenance_burden(insight_df, category_stats=category_perf)
             st.plotly_chart(fig, use_container_width=True)
         
         # High burden categories
         high_burden = category_perf[category_perf['avg_maintenance_ratio'] > 0.3]
         if not high_burden.empty:
             st.warning(f"⚠️ {len(high_burden)} kategori memiliki maintenance ratio > 30%: {', '.join(high_burden['kategori'].tolist())}")
+        
+        # Komposisi jenis maintenance per bulan (rollup cube dashboard)
+        maintenance_mix = get_maintenance_mix(dashboard_cube)
+        if not maintenance_mix.empty:
+            st.plotly_chart(create_maintenance_mix_chart(maintenance_mix), use_container_width=True)
     
     with tab4:
         st.subheader("Asset Lifecycle Matrix")
         st.caption("Matriks strategis: Nilai Utilisasi vs Beban Maintenance")
         
         with st.spinner("Generating lifecycle matrix..."):
-            fig = create_quadrant_lifecycle(insight_df)
+            fig = create_quadrant_lifecycle(insight_df, summary=insights)
             st.plotly_chart(fig, use_container_width=True)
         
         # Quadrant insights
@@ -749,6 +866,56 @@ def show_strategic_dashboard(insight_df):
             - Phase out strategy
             """)
     
+    with tab5:
+        st.subheader("Trend Kesehatan Armada")
+        st.caption("Kelayakan seluruh alat dihitung ulang per hari berdasarkan event sampai tanggal tersebut")
+        
+        days = st.selectbox("Periode", options=[90, 180, 365], index=2,
+                            format_func=lambda d: f"{d} hari terakhir")
+        
+        with st.spinner("Generating fleet health trend..."):
+            trend = load_fleet_health_trend(days)
+            if trend.empty:
+                st.info("ℹ️ Trend tidak tersedia (data history belum dimuat penuh)")
+            else:
+                fig = create_fleet_health_trend_chart(trend)
+                st.plotly_chart(fig, use_container_width=True)
+                
+                change = trend['avg_kelayakan'].iloc[-1] - trend['avg_kelayakan'].iloc[0]
+                st.metric("Perubahan Avg Kelayakan", f"{trend['avg_kelayakan'].iloc[-1]:.1f}%",
+                          delta=f"{change:+.1f}% dalam {days} hari")
+    
+    with tab6:
+        st.subheader("Forecast Demand Kuartal Depan")
+        st.caption(f"Holt-Winters musiman atas transaksi bulanan, interval prediksi {INTERVAL_LEVEL:.0%}")
+        
+        with st.spinner("Generating demand forecast..."):
+            category_forecast, item_forecast = load_demand_forecast()
+        
+        if category_forecast.empty:
+            st.info("ℹ️ Data penyewaan belum cukup untuk forecast")
+        else:
+            level = st.radio("Level", options=['Kategori', 'Top Items'], horizontal=True)
+            forecast_df, key = ((category_forecast, 'kategori') if level == 'Kategori'
+                                else (item_forecast, 'kode_barang'))
+            totals = forecast_totals(forecast_df, key)
+            
+            series = st.selectbox("Series", options=totals[key].tolist())
+            fig = create_demand_forecast_chart(forecast_df, key, series)
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(
+                totals.round(1),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    key: key.replace('_', ' ').title(),
+                    "forecast": f"Forecast {FORECAST_HORIZON} Bulan",
+                    "lower": "Batas Bawah",
+                    "upper": "Batas Atas"
+                }
+            )
+    
     st.divider()
     
     # Investment Priority
@@ -778,8 +945,9 @@ def show_strategic_dashboard(insight_df):
     
     # Lifecycle Classification - Collapsed by default
     with st.expander("🔄 Equipment Lifecycle Distribution", expanded=False):
-        lifecycle_df = classify_lifecycle_stage(insight_df)
-        lifecycle_dist = lifecycle_df['lifecycle_stage'].value_counts().reset_index()
+        lifecycle_df = classify_lifecycle_stage(insight_df, summary=insights)
+        lifecycle_counts = lifecycle_df['lifecycle_stage'].value_counts()
+        lifecycle_dist = lifecycle_counts[lifecycle_counts > 0].reset_index()
         lifecycle_dist.columns = ['Stage', 'Count']
         
         # Display as metrics
@@ -790,6 +958,31 @@ def show_strategic_dashboard(insight_df):
             col_idx = idx % 3
             with cols[col_idx]:
                 st.metric(stage['Stage'], stage['Count'])
+    
+    # What-if scoring policy - semua policy dievaluasi sekaligus
+    with st.expander("🧪 What-if Scoring Policy", expanded=False):
+        st.caption("Bandingkan konstanta degradasi kelayakan: tambah / ubah baris policy di tabel")
+        
+        default_policies = pd.DataFrame(
+            [DEFAULT_SCORING, DEFAULT_SCORING._replace(maintenance_rate=0.4, maintenance_cap=25),
+             DEFAULT_SCORING._replace(rental_rate=0.3, rental_day_rate=0.03)],
+            columns=ScoringParams._fields,
+            index=["Default", "Maintenance ketat", "Sewa ringan"]
+        )
+        policies_df = st.data_editor(default_policies, num_rows="dynamic", use_container_width=True)
+        policies_df = policies_df.dropna()
+        
+        policies = [ScoringParams(*row) for row in policies_df.itertuples(index=False)]
+        result = evaluate_scoring_policies(load_feasibility_features(), policies)
+        if not result.empty:
+            result.index = policies_df.index
+            st.dataframe(
+                result.drop(columns=list(ScoringParams._fields)),
+                use_container_width=True,
+                column_config={
+                    "avg_kelayakan": st.column_config.NumberColumn("Avg Kelayakan", format="%.1f%%")
+                }
+            )
 
 
 def show_critical_items_page(insight_df, maintenance_df):
@@ -937,7 +1130,12 @@ def show_data_tables_page(katalog_df, penyewaan_df, maintenance_df, insight_df):
     
     with tab2:
         st.subheader("Riwayat Penyewaan")
-        st.info(f"Total: {len(penyewaan_df)} rows")
+        # Streaming / sqlite: frame hanya preview, total dibaca dari agregat per barang
+        if HISTORY_PREVIEW:
+            total = int(load_aggregates()['rental_items']['freq_sewa'].sum())
+            st.warning(f"Preview: {len(penyewaan_df)} baris terakhir dari total {total} transaksi")
+        else:
+            st.info(f"Total: {len(penyewaan_df)} rows")
         
         # Pagination for Penyewaan - Reduced rows
         if 'penyewaan_page' not in st.session_state:
@@ -990,11 +1188,28 @@ def show_data_tables_page(katalog_df, penyewaan_df, maintenance_df, insight_df):
                 st.session_state.penyewaan_page = total_pages - 1
                 st.rerun()
         
-        st.caption(f"Showing rows {start_idx + 1} to {end_idx} of {len(penyewaan_df)}")
+        preview = " (preview)" if HISTORY_PREVIEW else ""
+        st.caption(f"Showing rows {start_idx + 1} to {end_idx} of {len(penyewaan_df)}{preview}")
     
     with tab3:
         st.subheader("Riwayat Maintenance")
-        st.info(f"Total: {len(maintenance_df)} events")
+        aggregates = load_aggregates()
+        if HISTORY_PREVIEW:
+            total = aggregates['maintenance_summary'].get('total_events', 0)
+            st.warning(f"Preview: {len(maintenance_df)} baris terakhir dari total {total} events")
+        else:
+            st.info(f"Total: {len(maintenance_df)} events")
+        
+        # Ranking dari agregat per barang (lengkap juga pada streaming / sqlite), bukan dari frame preview
+        with st.expander("🔝 Top 10 Alat dengan Maintenance Terbanyak", expanded=False):
+            top_items = get_top_maintenance_items(aggregates=aggregates)
+            if not top_items.empty:
+                nama_barang = katalog_df.drop_duplicates('kode_barang').set_index('kode_barang')['nama_barang']
+                top_items = top_items.assign(kode_barang=top_items['kode_barang'].astype(str))
+                top_items['nama_barang'] = top_items['kode_barang'].map(nama_barang).fillna(top_items['kode_barang'])
+                st.plotly_chart(create_top_maintenance_chart(top_items), use_container_width=True)
+            else:
+                st.info("Data maintenance tidak tersedia")
         
         # Pagination for Maintenance - Reduced rows
         if 'maintenance_page' not in st.session_state:
@@ -1044,7 +1259,8 @@ def show_data_tables_page(katalog_df, penyewaan_df, maintenance_df, insight_df):
                 st.session_state.maintenance_page = total_pages - 1
                 st.rerun()
         
-        st.caption(f"Showing rows {start_idx + 1} to {end_idx} of {len(maintenance_df)}")
+        preview = " (preview)" if HISTORY_PREVIEW else ""
+        st.caption(f"Showing rows {start_idx + 1} to {end_idx} of {len(maintenance_df)}{preview}")
     
     with tab4:
         st.subheader("Insight Kelayakan Alat")
@@ -0,0 +1,315 @@
+"""
+Benchmark Suite
+Ukur waktu dan peak memory fungsi processor & chart builder pada beberapa
+ukuran dataset sintetis, di luar Streamlit dan tanpa cache.
+Waktu disimpan relatif terhadap loop kalibrasi yang diukur di proses yang sama,
+sehingga baseline bisa dibandingkan lintas mesin. Hasil dibandingkan dengan
+baseline tersimpan; exit code 1 jika ada hot path yang tetap lebih lambat /
+lebih boros dari toleransi setelah diukur ulang.
+
+Contoh:
+    python -m benchmarks.run                      # bandingkan dengan baseline
+    python -m benchmarks.run --sizes small medium large
+    python -m benchmarks.run --update-baseline    # simpan hasil sebagai baseline baru
+"""
+import argparse
+import gc
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from streamlit import logger as streamlit_logger
+
+# Streamlit mengeluarkan warning "No runtime found" di luar `streamlit run`
+streamlit_logger.set_log_level(logging.ERROR)
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.data import forecast, occupancy, processor, reliability
+from src.visualization import charts
+from src.utils.synthetic import generate_dataset
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+
+# Ukuran dataset: (items, rentals, maintenance)
+SIZES = {
+    'small': (500, 5_000, 2_000),
+    'medium': (5_000, 100_000, 20_000),
+    'large': (50_000, 2_000_000, 200_000),
+}
+
+REFERENCE_DATE = pd.Timestamp('2026-01-01')
+
+# Perubahan di bawah batas ini dianggap noise, bukan regresi
+MIN_TIME_DELTA = 0.005  # detik
+MIN_MEMORY_DELTA = 1 << 20  # byte
+
+# Kandidat regresi diukur ulang dengan repeat x faktor ini sebelum dilaporkan
+CONFIRM_REPEAT_FACTOR = 3
+
+
+def _uncached(func: Callable) -> Callable:
+    """Fungsi asli di balik @st.cache_data agar cache tidak ikut terukur"""
+    return getattr(func, '__wrapped__', func)
+
+
+def _benchmarks(data: Dict[str, pd.DataFrame]) -> List[Tuple[str, Callable[[], object]]]:
+    """Daftar (nama, callable) yang diukur untuk satu ukuran dataset"""
+    katalog, penyewaan, maintenance, insight = (
+        data['katalog'], data['penyewaan'], data['maintenance'], data['insight']
+    )
+    dist = _uncached(processor.get_recommendation_distribution)(insight)
+    critical = insight[insight['kelayakan'] < 70].sort_values('kelayakan')
+    util = _uncached(processor.get_utilization_rate)(insight)
+    intervals = occupancy.build_rental_intervals(penyewaan, katalog)
+    occupancy_start = REFERENCE_DATE - pd.Timedelta(days=364)
+    events = reliability.build_maintenance_events(maintenance, katalog, until=REFERENCE_DATE)
+    # Statistik bersama dihitung sekali (seperti saat load), lalu dibaca consumer
+    aggregates = processor.compute_aggregates(penyewaan, maintenance)
+    # Cube trend barang x hari dibangun terpisah dari agregat ingest (seperti load_rental_cube)
+    rental_cube = processor.aggregate_rental_cube(penyewaan)
+    # Cube dashboard dibangun sekali per versi data (seperti load_dashboard_cube)
+    cube = processor.build_dashboard_cube(insight, katalog, rental_cube, maintenance)
+    # Matriks permintaan bulanan per barang (series terbanyak yang mungkin di-fit)
+    demand, _, _ = forecast.demand_matrix(
+        _uncached(processor.get_item_rental_trends)(rental_cube, len(katalog)), 'kode_barang')
+    # What-if: 50 policy dengan konstanta default diskalakan 0.5x - 1.5x
+    features = processor.build_feature_matrix(katalog, insight, REFERENCE_DATE)
+    default = np.array(processor.DEFAULT_SCORING)
+    policies = [processor.ScoringParams(*(default * scale)) for scale in np.linspace(0.5, 1.5, 50)]
+    # Update inkremental: 1% event terakhir datang sebagai delta
+    rental_split, maintenance_split = int(len(penyewaan) * 0.99), int(len(maintenance) * 0.99)
+    insight_before = _uncached(processor.calculate_equipment_feasibility)(
+        katalog, penyewaan.iloc[:rental_split], maintenance.iloc[:maintenance_split], REFERENCE_DATE)
+    
+    return [
+        ('calculate_equipment_feasibility', lambda: _uncached(processor.calculate_equipment_feasibility)(
+            katalog, penyewaan, maintenance, REFERENCE_DATE)),
+        ('update_equipment_feasibility', lambda: processor.update_equipment_feasibility(
+            insight_before, katalog, penyewaan.iloc[rental_split:], maintenance.iloc[maintenance_split:],
+            REFERENCE_DATE)),
+        ('calculate_feasibility_history', lambda: processor.calculate_feasibility_history(
+            katalog, penyewaan, maintenance, pd.date_range(end=REFERENCE_DATE, periods=365))),
+        ('build_rental_intervals', lambda: occupancy.build_rental_intervals(penyewaan, katalog)),
+        ('item_occupancy', lambda: occupancy.item_occupancy(intervals, katalog, occupancy_start, REFERENCE_DATE)),
+        ('daily_occupancy', lambda: occupancy.daily_occupancy(intervals, katalog, occupancy_start, REFERENCE_DATE)),
+        ('build_maintenance_events', lambda: reliability.build_maintenance_events(
+            maintenance, katalog, until=REFERENCE_DATE)),
+        ('item_reliability', lambda: reliability.item_reliability(events, katalog, REFERENCE_DATE, intervals)),
+        ('category_reliability', lambda: reliability.category_reliability(
+            reliability.maintenance_intervals(events, katalog, intervals))),
+        ('survival_curves', lambda: reliability.survival_curves(events, katalog, REFERENCE_DATE)),
+        ('fit_holt_winters', lambda: forecast.fit_holt_winters(demand)),
+        ('evaluate_scoring_policies', lambda: processor.evaluate_scoring_policies(features, policies)),
+        ('get_strategic_insights', lambda: _uncached(processor.get_strategic_insights)(insight)),
+        ('classify_lifecycle_stage', lambda: _uncached(processor.classify_lifecycle_stage)(insight)),
+        ('get_category_performance', lambda: _uncached(processor.get_category_performance)(insight)),
+        ('get_category_performance_cube', lambda: _uncached(processor.get_category_performance)(insight, cube=cube)),
+        ('build_dashboard_cube', lambda: processor.build_dashboard_cube(
+            insight, katalog, rental_cube, maintenance)),
+        ('compute_aggregates', lambda: processor.compute_aggregates(penyewaan, maintenance)),
+        ('aggregate_rental_cube', lambda: processor.aggregate_rental_cube(penyewaan)),
+        # Tanpa aggregates: agregasi maintenance yang menjadi dasar summary ikut terukur
+        ('get_maintenance_summary', lambda: _uncached(processor.get_maintenance_summary)(maintenance)),
+        ('get_top_maintenance_items', lambda: _uncached(processor.get_top_maintenance_items)(
+            maintenance, aggregates=aggregates)),
+        ('create_recommendation_pie_chart', lambda: charts.create_recommendation_pie_chart(dist)),
+        ('create_maintenance_ratio_chart', lambda: charts.create_maintenance_ratio_chart(critical, top_n=10)),
+        ('create_utilization_chart', lambda: charts.create_utilization_chart(util, top_n=10)),
+        ('create_scatter_feasibility_utilization', lambda: _uncached(charts.create_scatter_feasibility_utilization)(insight)),
+        ('create_box_feasibility_by_category', lambda: _uncached(charts.create_box_feasibility_by_category)(insight)),
+        ('create_heatmap_maintenance_burden', lambda: _uncached(charts.create_heatmap_maintenance_burden)(insight)),
+        ('create_quadrant_lifecycle', lambda: _uncached(charts.create_quadrant_lifecycle)(insight)),
+    ]
+
+
+# Workload kalibrasi tetap (sort numpy + groupby pandas), satuan waktu relatif
+_CALIBRATION_DATA = np.random.default_rng(0).random(200_000)
+_CALIBRATION_KEYS = np.arange(200_000) % 1000
+
+# Satu sampel menjalankan fungsi berulang minimal selama ini, agar jitter scheduler
+# pada fungsi yang hanya beberapa milidetik ikut dirata-rata
+MIN_SAMPLE_SECONDS = 0.1
+
+
+def _calibration_workload() -> None:
+    np.sort(_CALIBRATION_DATA)
+    pd.Series(_CALIBRATION_DATA).groupby(_CALIBRATION_KEYS).sum()
+
+
+def _loops_for(func: Callable[[], object]) -> int:
+    """Jumlah pemanggilan per sampel (minimal MIN_SAMPLE_SECONDS, seperti timeit.autorange)"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return max(1, int(np.ceil(MIN_SAMPLE_SECONDS / max(elapsed, 1e-9))))
+
+
+def _sample(func: Callable[[], object], loops: int) -> float:
+    """Waktu rata-rata (detik) satu pemanggilan dalam satu sampel"""
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return (time.perf_counter() - start) / loops
+
+
+def _timed(func: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """
+    (waktu fungsi, waktu kalibrasi) terbaik dalam detik. Sampel fungsi dan kalibrasi
+    diambil berselang-seling, jadi keduanya mengalami beban mesin yang sama
+    """
+    loops, calibration_loops = _loops_for(func), _loops_for(_calibration_workload)
+    seconds, unit = [], []
+    for _ in range(repeat):
+        unit.append(_sample(_calibration_workload, calibration_loops))
+        seconds.append(_sample(func, loops))
+    return min(seconds), min(unit)
+
+
+def _measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Waktu terbaik relatif terhadap kalibrasi dan peak memory (tracemalloc) satu run"""
+    seconds, unit = _timed(func, repeat)
+    
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {'relative': seconds / unit, 'seconds': seconds, 'peak_bytes': peak}
+
+
+def _size_benchmarks(size: str, only: List[str] = None) -> List[Tuple[str, Callable[[], object]]]:
+    """Benchmark untuk satu ukuran dataset (dataset sintetis dibangun sekali)"""
+    n_items, n_rentals, n_maintenance = SIZES[size]
+    katalog, penyewaan, maintenance = generate_dataset(n_items, n_rentals, n_maintenance)
+    insight = _uncached(processor.calculate_equipment_feasibility)(
+        katalog, penyewaan, maintenance, REFERENCE_DATE
+    )
+    data = {'katalog': katalog, 'penyewaan': penyewaan, 'maintenance': maintenance, 'insight': insight}
+    return [(name, func) for name, func in _benchmarks(data) if not only or name in only]
+
+
+def _print_result(size: str, name: str, result: Dict[str, float]) -> None:
+    print(f"[{size:>6}] {name:<40} {result['seconds'] * 1000:9.1f} ms {result['relative']:8.3f}x "
+          f"{result['peak_bytes'] / (1 << 20):8.1f} MiB")
+
+
+def run_benchmarks(sizes: List[str], repeat: int = 3, only: List[str] = None) -> Dict[str, Dict[str, dict]]:
+    """
+    Jalankan semua benchmark.
+    Returns: {size: {nama_fungsi: {relative, seconds, peak_bytes}}} - relative = seconds / kalibrasi
+    """
+    results = {}
+    for size in sizes:
+        results[size] = {}
+        for name, func in _size_benchmarks(size, only):
+            results[size][name] = _measure(func, repeat)
+            _print_result(size, name, results[size][name])
+    
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Dict[str, dict]], baseline: Dict[str, Dict[str, dict]],
+                          tolerance: float) -> List[str]:
+    """
+    Daftar regresi: waktu relatif / peak memory yang melebihi baseline * (1 + tolerance)
+    di luar batas noise (delta waktu absolut di bawah MIN_TIME_DELTA diabaikan)
+    """
+    regressions = []
+    for size, functions in results.items():
+        for name, current in functions.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference is None or 'relative' not in reference:
+                continue
+            
+            # Delta waktu dalam detik di mesin ini: selisih relatif x satuan kalibrasi saat ini
+            unit = current['seconds'] / current['relative']
+            checks = [('relative', (current['relative'] - reference['relative']) * unit, MIN_TIME_DELTA),
+                      ('peak_bytes', current['peak_bytes'] - reference['peak_bytes'], MIN_MEMORY_DELTA)]
+            for metric, delta, min_delta in checks:
+                limit = reference[metric] * (1 + tolerance)
+                if current[metric] > limit and delta > min_delta:
+                    regressions.append(
+                        f"{size}/{name}: {metric} {current[metric]:.4g} > baseline "
+                        f"{reference[metric]:.4g} (+{tolerance:.0%})"
+                    )
+    return regressions
+
+
+def confirm_regressions(results: Dict[str, Dict[str, dict]], baseline: Dict[str, Dict[str, dict]],
+                        tolerance: float, repeat: int) -> List[str]:
+    """
+    Ukur ulang fungsi yang terdeteksi regresi dengan repeat lebih banyak; hanya yang
+    tetap melewati toleransi yang dilaporkan (satu run lambat karena beban mesin bukan regresi)
+    """
+    suspects = {}
+    for size, functions in results.items():
+        for name in functions:
+            if compare_with_baseline({size: {name: functions[name]}}, baseline, tolerance):
+                suspects.setdefault(size, []).append(name)
+    if not suspects:
+        return []
+    
+    print("\nMengukur ulang kandidat regresi:")
+    confirmed = {}
+    for size, names in suspects.items():
+        confirmed[size] = {}
+        for name, func in _size_benchmarks(size, names):
+            result = _measure(func, repeat * CONFIRM_REPEAT_FACTOR)
+            # Ambil hasil terbaik dari kedua pengukuran
+            first = results[size][name]
+            if first['relative'] < result['relative']:
+                result = dict(result, relative=first['relative'], seconds=first['seconds'])
+            result['peak_bytes'] = min(first['peak_bytes'], result['peak_bytes'])
+            confirmed[size][name] = result
+            _print_result(size, name, result)
+    
+    return compare_with_baseline(confirmed, baseline, tolerance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark processor & chart builder")
+    parser.add_argument('--sizes', nargs='+', default=['small', 'medium'], choices=list(SIZES))
+    parser.add_argument('--only', nargs='+', help="Hanya jalankan fungsi dengan nama ini")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Toleransi regresi (0.25 = 25%%)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true', help="Simpan hasil sebagai baseline")
+    args = parser.parse_args()
+    
+    results = run_benchmarks(args.sizes, repeat=args.repeat, only=args.only)
+    
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        for size, functions in results.items():
+            # Hanya waktu relatif & memory yang disimpan - detik absolut berlaku untuk satu mesin saja
+            baseline.setdefault(size, {}).update({
+                name: {'relative': result['relative'], 'peak_bytes': result['peak_bytes']}
+                for name, result in functions.items()
+            })
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline disimpan ke {args.baseline}")
+        return
+    
+    if not args.baseline.exists():
+        print("Baseline belum ada - jalankan dengan --update-baseline terlebih dahulu")
+        return
+    
+    regressions = confirm_regressions(results, json.loads(args.baseline.read_text()), args.tolerance, args.repeat)
+    if regressions:
+        print("\nRegresi terdeteksi:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\nTidak ada regresi terhadap baseline")
+
+
+if __name__ == '__main__':
+    main()
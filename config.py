@@ -1,17 +1,49 @@
 """
 Configuration file untuk Dashboard Kelayakan Alat
 """
+import os
 from pathlib import Path
 
 # Base paths
 BASE_DIR = Path(__file__).parent
-DATA_DIR = BASE_DIR / "dataset"
+# DASHBOARD_DATA_DIR dapat menunjuk ke dataset lain (mis. hasil src.utils.synthetic)
+DATA_DIR = Path(os.environ.get("DASHBOARD_DATA_DIR", BASE_DIR / "dataset"))
 
 # Data files
 KATALOG_FILE = DATA_DIR / "katalog_barang.xlsx"
 RIWAYAT_PENYEWAAN_FILE = DATA_DIR / "riwayat_penyewaan.csv"
 RIWAYAT_MAINTENANCE_FILE = DATA_DIR / "riwayat_maintenance.csv"
-INSIGHT_FILE = DATA_DIR / "insight_kelayakan_alat.csv"
+
+# Snapshot cache (Parquet jika pyarrow tersedia, fallback ke pickle)
+SNAPSHOT_DIR = DATA_DIR / ".snapshot"
+
+# Insight hasil perhitungan di-materialize di sini beserta fingerprint inputnya
+INSIGHT_FILE = SNAPSHOT_DIR / "insight_kelayakan_alat"
+ENABLE_SNAPSHOT_CACHE = True
+
+# Storage backend: "pandas" (in-memory) atau "sqlite" (history di-ingest ke database dan
+# agregasi di-push down ke SQL; frame history di memori hanya preview baris terakhir)
+STORAGE_BACKEND = "pandas"
+SQLITE_DB_FILE = DATA_DIR / "dashboard.sqlite"
+
+# Jumlah thread untuk load source secara paralel di load_all_data
+LOADER_WORKERS = 3
+
+# Streaming mode untuk history sangat besar: history dibaca per chunk dan hanya
+# agregat per barang yang disimpan (memori dibatasi ukuran katalog, bukan history).
+# Frame penyewaan/maintenance yang dikembalikan hanya berisi baris terakhir (preview).
+STREAMING_MODE = False
+STREAM_CHUNK_SIZE = 500_000
+STREAM_PREVIEW_ROWS = 1000
+
+# Recompute saat data berubah dijalankan worker background (satu untuk semua session);
+# selama itu session tetap menerima versi sebelumnya. False = hitung di script thread.
+BACKGROUND_COMPUTE = True
+# Versi yang gagal dihitung worker baru dicoba ulang setelah sekian detik (atau saat data berubah lagi)
+COMPUTE_RETRY_AFTER = 60
+
+# Engine pembaca CSV: "auto" = pyarrow jika terinstall, selain itu "c"
+CSV_ENGINE = "auto"
 
 # Streamlit config
 PAGE_TITLE = "Dashboard Kelayakan Alat Camping"
@@ -51,7 +83,9 @@ CONDITION_COLORS = {
 }
 
 # Dashboard settings
-CACHE_TTL = 3600  # Cache duration in seconds (1 hour)
+CACHE_TTL = None  # Loader di-invalidasi via fingerprint file; isi detik untuk batas waktu tambahan
+CACHE_MAX_ENTRIES = 4  # Jumlah versi data yang disimpan per loader
+FINGERPRINT_CONTENT_HASH = False  # True = fingerprint juga memakai hash isi file (lebih lambat)
 MAX_ROWS_DISPLAY = 15  # Maximum rows to display in tables (reduced for performance)
 CHART_HEIGHT_DEFAULT = 400  # Default chart height
 ENABLE_PROFILER = False  # Set to True to debug performance
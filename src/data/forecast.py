@@ -0,0 +1,196 @@
+"""
+Demand Forecast
+Holt-Winters aditif (level + trend + musiman) atas matriks penyewaan bulanan
+(series x bulan). Semua series dan semua kandidat parameter di-fit sekaligus:
+loop hanya sepanjang sumbu waktu, setiap langkah berupa operasi array
+(kandidat x series). Parameter terbaik dipilih per series dari SSE one-step.
+"""
+from itertools import product
+from statistics import NormalDist
+from typing import NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Satu musim = 12 bulan; butuh minimal dua musim untuk estimasi komponen musiman
+SEASON_LENGTH = 12
+FORECAST_HORIZON = 3
+INTERVAL_LEVEL = 0.8
+
+# Grid kandidat (alpha, beta, gamma) yang dievaluasi bersamaan untuk semua series
+SMOOTHING_GRID = np.array(list(product([0.1, 0.3, 0.5, 0.8], [0.0, 0.1], [0.1, 0.3])))
+
+
+class ForecastResult(NamedTuple):
+    """Hasil fit per series; forecast/lower/upper berukuran (series, horizon)"""
+    fitted: np.ndarray
+    forecast: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    params: np.ndarray
+    sigma: np.ndarray
+
+
+def demand_matrix(trends_df: pd.DataFrame, key: str, value: str = 'Jumlah Transaksi',
+                  as_of=None) -> Tuple[np.ndarray, pd.Index, pd.DatetimeIndex]:
+    """
+    Trend bulanan long (Periode, key, value - output get_rental_trends) -> matriks padat
+    series x bulan, bulan tanpa sewa = 0. Dengan as_of, bulan berjalan (yang memuat as_of)
+    dibuang karena belum lengkap dan grid diperpanjang sampai bulan penuh terakhir sebelum
+    as_of, sehingga horizon forecast dimulai bulan as_of. Returns: (matriks, label series, awal bulan)
+    """
+    trends = trends_df
+    last_month = trends['Periode'].max() if not trends.empty else None
+    if as_of is not None and not trends.empty:
+        current_month = pd.Timestamp(as_of).to_period('M').start_time
+        trends = trends[trends['Periode'] < current_month]
+        last_month = current_month - pd.DateOffset(months=1)
+    if trends.empty:
+        return np.zeros((0, 0)), pd.Index([]), pd.DatetimeIndex([])
+    
+    # Bulan tanpa transaksi sampai as_of tetap masuk grid (nilai 0), bukan dilewati
+    periods = pd.date_range(trends['Periode'].min(), last_month, freq='MS')
+    series_codes, labels = pd.factorize(trends[key], sort=True)
+    month_codes = periods.get_indexer(trends['Periode'])
+    
+    matrix = np.zeros((len(labels), len(periods)))
+    np.add.at(matrix, (series_codes, month_codes), trends[value].to_numpy(dtype=np.float64))
+    return matrix, pd.Index(labels, name=key), periods
+
+
+def _smooth(matrix: np.ndarray, alpha, beta, gamma, level0: np.ndarray, trend0: np.ndarray,
+            season0: np.ndarray, start: int, keep_fitted: bool = False):
+    """
+    Rekursi Holt-Winters aditif. alpha/beta/gamma: (kandidat, 1) untuk grid atau (series,)
+    untuk satu parameter per series - state ikut berbentuk (kandidat, series) / (series,).
+    Returns: (fitted atau None, level, trend, SSE one-step, musiman) pada akhir series
+    """
+    shape = np.broadcast_shapes(np.shape(alpha), level0.shape)
+    level = np.broadcast_to(level0, shape).copy()
+    trend = np.broadcast_to(trend0, shape).copy()
+    season = np.broadcast_to(season0, shape + season0.shape[-1:]).copy()
+    sse = np.zeros(shape)
+    fitted = matrix.copy() if keep_fitted else None
+    m = season0.shape[-1]
+    
+    for t in range(start, matrix.shape[1]):
+        s = season[..., t % m]
+        y = matrix[:, t]
+        prediction = level + trend + s
+        sse += (y - prediction) ** 2
+        if keep_fitted:
+            fitted[:, t] = prediction
+        prev_level = level
+        level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        season[..., t % m] = gamma * (y - level) + (1 - gamma) * s
+    
+    return fitted, level, trend, sse, season
+
+
+def fit_holt_winters(matrix: np.ndarray, horizon: int = FORECAST_HORIZON,
+                     season_length: int = SEASON_LENGTH,
+                     interval: float = INTERVAL_LEVEL) -> ForecastResult:
+    """
+    Fit Holt-Winters aditif untuk setiap baris matriks (series x waktu) sekaligus.
+    Series dengan < 2 musim data di-fit tanpa komponen musiman (Holt linear).
+    Interval prediksi memakai varians h-step model aditif dari sigma error one-step;
+    forecast dan batas bawah dipotong di 0.
+    """
+    n_series, n_time = matrix.shape
+    if not n_series or n_time < 2:
+        empty = np.zeros((n_series, horizon))
+        return ForecastResult(matrix.copy(), empty, empty, empty,
+                              np.zeros((n_series, 3)), np.zeros(n_series))
+    
+    seasonal = n_time >= 2 * season_length
+    m = season_length if seasonal else 1
+    grid = SMOOTHING_GRID if seasonal else np.unique(SMOOTHING_GRID * [1, 1, 0], axis=0)
+    alpha, beta, gamma = (grid[:, i, None] for i in range(3))
+    
+    # Inisialisasi dari musim pertama (dan kedua untuk trend), identik untuk semua kandidat
+    if seasonal:
+        first, second = matrix[:, :m].mean(axis=1), matrix[:, m:2 * m].mean(axis=1)
+        level0, trend0 = first, (second - first) / m
+        season0 = matrix[:, :m] - first[:, None]
+        start = m
+    else:
+        level0, trend0 = matrix[:, 0], np.zeros(n_series)
+        season0 = np.zeros((n_series, 1))
+        start = 1
+    
+    # Pass 1: SSE semua kandidat (kandidat x series); pass 2: ulangi dengan parameter terbaik
+    sse = _smooth(matrix, alpha, beta, gamma, level0, trend0, season0, start)[3]
+    best = sse.argmin(axis=0)
+    a, b, g = grid[best].T
+    fitted, level, trend, best_sse, season = _smooth(matrix, a, b, g, level0, trend0, season0, start,
+                                                     keep_fitted=True)
+    
+    steps = np.arange(1, horizon + 1)
+    season_idx = (n_time + steps - 1) % m
+    forecast = level[:, None] + trend[:, None] * steps + season[:, season_idx]
+    
+    # Varians h-step: sigma^2 * (1 + sum_{j<h} c_j^2), c_j = alpha (1 + j beta) + gamma [j kelipatan m]
+    j = np.arange(1, horizon)
+    c = a[:, None] * (1 + j * b[:, None]) + g[:, None] * (j % m == 0) * seasonal
+    spread = np.sqrt(1 + np.concatenate([np.zeros((n_series, 1)), np.cumsum(c ** 2, axis=1)], axis=1))
+    sigma = np.sqrt(best_sse / max(n_time - start, 1))
+    z = NormalDist().inv_cdf(0.5 + interval / 2)
+    
+    return ForecastResult(
+        fitted=fitted,
+        forecast=np.maximum(forecast, 0),
+        lower=np.maximum(forecast - z * sigma[:, None] * spread, 0),
+        upper=np.maximum(forecast + z * sigma[:, None] * spread, 0),
+        params=grid[best],
+        sigma=sigma,
+    )
+
+
+def forecast_demand(trends_df: pd.DataFrame, key: str, value: str = 'Jumlah Transaksi',
+                    as_of=None, horizon: int = FORECAST_HORIZON,
+                    interval: float = INTERVAL_LEVEL) -> pd.DataFrame:
+    """
+    Forecast bulanan per series dari trend long (Periode, key, value).
+    Dengan as_of, horizon dimulai dari bulan as_of (lihat demand_matrix).
+    Returns: <key>, Periode, aktual (NaN untuk bulan forecast), forecast (fitted untuk
+    bulan historis), lower, upper (hanya bulan forecast)
+    """
+    columns = [key, 'Periode', 'aktual', 'forecast', 'lower', 'upper']
+    matrix, labels, periods = demand_matrix(trends_df, key, value, as_of)
+    if not len(labels):
+        return pd.DataFrame(columns=columns)
+    
+    result = fit_holt_winters(matrix, horizon, interval=interval)
+    future = pd.date_range(periods[-1], periods=horizon + 1, freq='MS')[1:]
+    n_series, n_time = matrix.shape
+    
+    history = pd.DataFrame({
+        key: np.repeat(labels.to_numpy(), n_time),
+        'Periode': np.tile(periods, n_series),
+        'aktual': matrix.ravel(),
+        'forecast': result.fitted.ravel(),
+        'lower': np.nan,
+        'upper': np.nan,
+    })
+    ahead = pd.DataFrame({
+        key: np.repeat(labels.to_numpy(), horizon),
+        'Periode': np.tile(future, n_series),
+        'aktual': np.nan,
+        'forecast': result.forecast.ravel(),
+        'lower': result.lower.ravel(),
+        'upper': result.upper.ravel(),
+    })
+    combined = pd.concat([history, ahead], ignore_index=True)
+    return combined.sort_values([key, 'Periode'], kind='stable', ignore_index=True)[columns]
+
+
+def forecast_totals(forecast_df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Total horizon forecast per series (mis. kuartal depan) beserta interval
+    (batas per bulan dijumlahkan - konservatif). Returns: <key>, forecast, lower, upper
+    """
+    ahead = forecast_df[forecast_df['aktual'].isna()]
+    totals = ahead.groupby(key, observed=True)[['forecast', 'lower', 'upper']].sum()
+    return totals.reset_index().sort_values('forecast', ascending=False, ignore_index=True)
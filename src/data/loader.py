@@ -2,10 +2,17 @@
 Data Loader Module
 Handle semua operasi loading data dengan caching
 """
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Callable, Dict, Iterator, Tuple, Optional
 import sys
 
 # Add parent directory to path
@@ -15,91 +22,984 @@ from config import (
     RIWAYAT_PENYEWAAN_FILE, 
     RIWAYAT_MAINTENANCE_FILE, 
     INSIGHT_FILE,
-    CACHE_TTL
+    CACHE_TTL,
+    CACHE_MAX_ENTRIES,
+    FINGERPRINT_CONTENT_HASH,
+    SNAPSHOT_DIR,
+    ENABLE_SNAPSHOT_CACHE,
+    CSV_ENGINE,
+    STORAGE_BACKEND,
+    LOADER_WORKERS,
+    STREAMING_MODE,
+    STREAM_CHUNK_SIZE,
+    STREAM_PREVIEW_ROWS,
+    BACKGROUND_COMPUTE,
+    COMPUTE_RETRY_AFTER
 )
+from src.utils.cache import stamp_version
+from src.utils.worker import ComputeWorker
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+_SNAPSHOT_SUFFIX = ".parquet" if _HAS_PYARROW else ".pkl"
+_CSV_ENGINE = ("pyarrow" if _HAS_PYARROW else "c") if CSV_ENGINE == "auto" else CSV_ENGINE
+
+# Schema per file: kolom yang dibaca (proyeksi, hanya jika ada di file),
+# dtype eksplisit, dan kolom tanggal yang di-parse saat read.
+# Kolom yang tidak dipakai dashboard (teknisi, biaya, dst) tidak pernah dibaca.
+PENYEWAAN_SCHEMA = {
+    'columns': [
+        'id_penyewaan', 'no', 'id', 'kode_barang', 'nama_pelanggan',
+        'tanggal_sewa', 'tanggal_kembali', 'durasi_sewa', 'harga_satuan', 'jumlah'
+    ],
+    'dtype': {
+        'kode_barang': 'category',
+        'nama_pelanggan': 'category',
+        'durasi_sewa': 'Int16',
+    },
+    'dates': ['tanggal_sewa', 'tanggal_kembali'],
+}
+
+MAINTENANCE_SCHEMA = {
+    'columns': [
+        'id_maintenance', 'kode_barang', 'tanggal_maintenance', 'jenis_maintenance',
+        'severity', 'kondisi_setelah_perbaikan', 'catatan'
+    ],
+    'dtype': {
+        'kode_barang': 'category',
+        'jenis_maintenance': 'category',
+        'severity': 'category',
+        'kondisi_setelah_perbaikan': 'category',
+        'catatan': 'category',
+    },
+    'dates': ['tanggal_maintenance'],
+}
+
+
+Fingerprint = Tuple[str, int, int, str]
+
+
+def get_file_fingerprint(path: Path) -> Fingerprint:
+    """
+    Fingerprint murah untuk source file: (path, mtime_ns, size, content_hash).
+    content_hash hanya dihitung jika FINGERPRINT_CONTENT_HASH aktif.
+    File yang tidak ada menghasilkan fingerprint kosong agar tetap bisa di-cache.
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return (str(path), 0, 0, "")
+    
+    content_hash = ""
+    if FINGERPRINT_CONTENT_HASH:
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(block)
+        content_hash = hasher.hexdigest()
+    
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size, content_hash)
+
+
+def _snapshot_path(source: Path, fingerprint: Fingerprint) -> Path:
+    """Path snapshot untuk source file, di-key dengan fingerprint source"""
+    key = "|".join(str(part) for part in fingerprint)
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return SNAPSHOT_DIR / f"{source.stem}-{digest}{_SNAPSHOT_SUFFIX}"
+
+
+def _read_snapshot(path: Path) -> Optional[pd.DataFrame]:
+    """Baca snapshot jika ada, None jika tidak ada atau rusak"""
+    if not path.exists():
+        return None
+    try:
+        if _SNAPSHOT_SUFFIX == ".parquet":
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+    except Exception:
+        return None
+
+
+def _write_snapshot(path: Path, df: pd.DataFrame) -> None:
+    """Tulis snapshot secara atomic dan hapus snapshot lama dari source yang sama"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if _SNAPSHOT_SUFFIX == ".parquet":
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        
+        stem = path.name.rsplit('-', 1)[0]
+        for old in path.parent.glob(f"{stem}-*{_SNAPSHOT_SUFFIX}"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    except Exception:
+        # Snapshot hanya optimasi - gagal tulis (mis. read-only FS) tidak fatal
+        tmp_path.unlink(missing_ok=True)
+
+
+def _read_with_snapshot(source: Path, reader: Callable[[Path], pd.DataFrame],
+                        fingerprint: Fingerprint) -> pd.DataFrame:
+    """
+    Baca source lewat snapshot kolumnar jika source tidak berubah.
+    Reader asli hanya dipanggil saat snapshot belum ada atau source berubah.
+    """
+    if not ENABLE_SNAPSHOT_CACHE:
+        return reader(source)
+    
+    path = _snapshot_path(source, fingerprint)
+    df = _read_snapshot(path)
+    if df is None:
+        df = reader(source)
+        _write_snapshot(path, df)
+    return df
+
+
+def _read_katalog_source(path: Path) -> pd.DataFrame:
+    df = pd.read_excel(path)
+    df['tanggal_pembelian'] = pd.to_datetime(df['tanggal_pembelian'], errors='coerce')
+    if 'kategori' in df.columns:
+        df['kategori'] = df['kategori'].astype('category')
+    # keterangan berisi campuran teks & angka - simpan sebagai string agar snapshot typed
+    if 'keterangan' in df.columns:
+        df['keterangan'] = df['keterangan'].astype('string')
+    return df
+
+
+def _read_csv_header(path: Path) -> list:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _read_csv_typed(source, schema: dict, header: list,
+                    names: Optional[list] = None, engine: Optional[str] = None) -> pd.DataFrame:
+    """
+    Baca CSV dengan proyeksi kolom, dtype eksplisit, dan parsing tanggal saat read.
+    names diisi untuk membaca potongan file tanpa header (ingest inkremental).
+    """
+    usecols = [col for col in schema['columns'] if col in header]
+    dtype = {col: t for col, t in schema['dtype'].items() if col in usecols}
+    dates = [col for col in schema['dates'] if col in usecols]
+    
+    kwargs = {}
+    if names is not None:
+        kwargs = {'header': None, 'names': names}
+    df = pd.read_csv(source, usecols=usecols, dtype=dtype, parse_dates=dates,
+                     engine=engine or _CSV_ENGINE, **kwargs)
+    
+    # Nilai tanggal tidak valid membuat parse_dates mengembalikan object - coerce ke NaT
+    for col in dates:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    
+    return df
+
+
+def _concat_history(df: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Concat frame history dengan baris baru tanpa kehilangan dtype category"""
+    combined = pd.concat([df, delta], ignore_index=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and col in delta.columns:
+            combined[col] = pd.api.types.union_categoricals(
+                [df[col], delta[col].astype('category')], ignore_order=True
+            )
+    return combined
+
+
+# State ingest inkremental per file history (per proses).
+# File history hanya bertambah di akhir, jadi cukup simpan byte offset terakhir
+# beserta agregat per barang yang sudah dihitung. Frame penuh tidak disimpan di state
+# (sudah ada di cache loader): saat append, frame versi sebelumnya dibaca dari snapshot.
+# Hanya preview streaming mode (dibatasi STREAM_PREVIEW_ROWS) yang ikut disimpan.
+_INCREMENTAL_STATE: Dict[str, dict] = {}
+_INCREMENTAL_LOCKS: Dict[str, threading.Lock] = {}
+_TAIL_PROBE_BYTES = 256
+
+
+def _read_probe(path: Path, offset: int) -> bytes:
+    """Baca beberapa byte terakhir sebelum offset untuk verifikasi append-only"""
+    start = max(0, offset - _TAIL_PROBE_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return f.read(offset - start)
+
+
+class _PrefixReader(io.RawIOBase):
+    """File read-only mulai byte `start` yang berhenti di byte `end` (ukuran saat fingerprint)"""
+    
+    def __init__(self, path: Path, end: int, start: int = 0):
+        super().__init__()
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = max(0, end - start)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._file.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+    
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def _open_prefix(path: Path, size: int, start: int = 0) -> io.BufferedReader:
+    """
+    Buka byte [start, size) file. Baris yang di-append setelah fingerprint diambil
+    tidak ikut dibaca, sehingga offset ingest (= size) selalu cocok dengan isi yang di-parse.
+    """
+    return io.BufferedReader(_PrefixReader(path, size, start))
+
+
+def _read_csv_chunks(source: Path, start: int, size: int, schema: dict,
+                     header: list) -> Iterator[pd.DataFrame]:
+    """
+    Baca byte [start, size) file history per STREAM_CHUNK_SIZE baris dengan schema eksplisit.
+    start > 0 adalah potongan tanpa header (baris yang di-append sejak offset start).
+    """
+    usecols = [col for col in schema['columns'] if col in header]
+    dtype = {col: t for col, t in schema['dtype'].items() if col in usecols}
+    dates = [col for col in schema['dates'] if col in usecols]
+    
+    kwargs = {'header': None, 'names': header} if start else {}
+    # chunksize hanya didukung engine "c"
+    with _open_prefix(source, size, start) as f, pd.read_csv(
+        f, usecols=usecols, dtype=dtype, parse_dates=dates, chunksize=STREAM_CHUNK_SIZE, engine='c', **kwargs
+    ) as reader:
+        for chunk in reader:
+            for col in dates:
+                if not pd.api.types.is_datetime64_any_dtype(chunk[col]):
+                    chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+            yield chunk
+
+
+def _stream_history(source: Path, size: int, schema: dict, header: list,
+                    aggregator: Callable[[pd.DataFrame], pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Baca `size` byte pertama history per chunk dan lipat agregat parsial per barang.
+    Hanya agregat dan STREAM_PREVIEW_ROWS baris terakhir yang disimpan.
+    Returns: (preview, agregat per barang)
+    """
+    from src.data.processor import merge_aggregates
+    
+    agg = aggregator(pd.DataFrame())
+    preview = None
+    for chunk in _read_csv_chunks(source, 0, size, schema, header):
+        agg = merge_aggregates(agg, aggregator(chunk))
+        tail = chunk.tail(STREAM_PREVIEW_ROWS)
+        preview = tail if preview is None else _concat_history(preview, tail).tail(STREAM_PREVIEW_ROWS)
+    
+    if preview is None:
+        preview = pd.DataFrame(columns=[col for col in schema['columns'] if col in header])
+        for col in schema['dates']:
+            if col in preview.columns:
+                preview[col] = pd.to_datetime(preview[col])
+    
+    return preview.reset_index(drop=True), agg
+
+
+def _ingest_history(source: Path, fingerprint: Fingerprint, schema: dict,
+                    aggregator: Callable[[pd.DataFrame], pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Ingest file history secara inkremental.
+    Jika file hanya bertambah di akhir sejak ingest terakhir, hanya baris baru
+    yang di-parse lalu digabung ke frame versi sebelumnya (dari snapshot) dan agregat
+    per barang yang ada. Selain itu (file baru, dipotong, diubah di tengah, atau
+    snapshot tidak tersedia) dilakukan full read.
+    Pada STREAMING_MODE frame yang disimpan hanya preview baris terakhir.
+    Returns: (frame, agregat per barang)
+    """
+    from src.data.processor import merge_aggregates
+    
+    key = str(source)
+    size = fingerprint[2]
+    
+    # Lock per file agar penyewaan & maintenance bisa di-ingest paralel
+    with _INCREMENTAL_LOCKS.setdefault(key, threading.Lock()):
+        state = _INCREMENTAL_STATE.get(key)
+        previous = None
+        if state is not None:
+            # Frame versi terakhir: preview di state (streaming) atau snapshot versi itu
+            previous = state['df'] if STREAMING_MODE else _previous_frame(source, state['fingerprint'])
+            if state['fingerprint'] == fingerprint and previous is not None:
+                return previous, state['agg']
+        
+        offset = state['offset'] if state is not None else 0
+        appended = (
+            previous is not None
+            and size >= offset
+            and state['probe'].endswith(b'\n')
+            and _read_probe(source, offset) == state['probe']
+        )
+        
+        if appended:
+            with open(source, 'rb') as f:
+                f.seek(offset)
+                tail = f.read(size - offset)
+            
+            df, agg = previous, state['agg']
+            if tail.strip():
+                # Potongan kecil tanpa header - engine "c" cukup dan mendukung names + usecols
+                delta = _read_csv_typed(io.BytesIO(tail), schema, state['columns'],
+                                        names=state['columns'], engine='c')
+                df = _concat_history(df, delta)
+                if STREAMING_MODE:
+                    df = df.tail(STREAM_PREVIEW_ROWS).reset_index(drop=True)
+                agg = merge_aggregates(agg, aggregator(delta))
+            if not STREAMING_MODE:
+                # Dasar append berikutnya (menggantikan snapshot versi sebelumnya)
+                _write_snapshot(_snapshot_path(source, fingerprint), df)
+        elif STREAMING_MODE:
+            df, agg = _stream_history(source, size, schema, _read_csv_header(source), aggregator)
+        else:
+            header = _read_csv_header(source)
+            
+            def read(path: Path) -> pd.DataFrame:
+                # Hanya sampai ukuran di fingerprint: baris yang di-append sesudahnya
+                # masuk lewat jalur inkremental berikutnya, bukan dua kali
+                with _open_prefix(path, size) as f:
+                    return _read_csv_typed(f, schema, header)
+            
+            df = _read_with_snapshot(source, read, fingerprint)
+            agg = aggregator(df)
+        
+        _INCREMENTAL_STATE[key] = {
+            'fingerprint': fingerprint,
+            'offset': size,
+            'probe': _read_probe(source, size),
+            'columns': _read_csv_header(source),
+            'df': df if STREAMING_MODE else None,
+            'agg': agg,
+        }
+        return df, agg
+
+
+def _previous_frame(source: Path, fingerprint: Fingerprint) -> Optional[pd.DataFrame]:
+    """Frame history versi `fingerprint` dari snapshot, None jika tidak ada (-> full read)"""
+    if not ENABLE_SNAPSHOT_CACHE:
+        return None
+    return _read_snapshot(_snapshot_path(source, fingerprint))
+
+
+def _ingest_penyewaan(fingerprint: Fingerprint) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    from src.data.processor import aggregate_rentals
+    return _ingest_history(RIWAYAT_PENYEWAAN_FILE, fingerprint, PENYEWAAN_SCHEMA,
+                           aggregate_rentals)
+
+
+def _ingest_maintenance(fingerprint: Fingerprint) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    from src.data.processor import aggregate_maintenance
+    return _ingest_history(RIWAYAT_MAINTENANCE_FILE, fingerprint, MAINTENANCE_SCHEMA,
+                           aggregate_maintenance)
+
+
+# Backend sqlite: history disimpan di database, bukan sebagai frame penuh di memori.
+# _load_all_data hanya memegang preview baris terakhir; agregat dijawab SQL dan
+# frame penuh dibaca dari database hanya oleh analitik yang butuh baris per event.
+HISTORY_PREVIEW = STREAMING_MODE or STORAGE_BACKEND == "sqlite"
+
+
+def _sync_history_sqlite(source: Path, name: str, fingerprint: Fingerprint, schema: dict) -> None:
+    """
+    Ingest file history ke database sampai ukuran di fingerprint, per chunk.
+    Database menyimpan offset & probe versi terakhir yang di-ingest (lintas proses / restart):
+    file yang hanya bertambah di akhir cukup di-INSERT baris barunya. Tabel hanya di-replace
+    jika `fingerprint` adalah isi file saat ini - versi lama (mis. session yang dipin ke versi
+    sebelumnya) tidak pernah menimpa versi yang lebih baru; query versi itu jatuh ke jalur pandas.
+    """
+    from src.data import storage
+    
+    size = fingerprint[2]
+    with _INCREMENTAL_LOCKS.setdefault(str(source), threading.Lock()), storage.ingest_transaction() as conn:
+        state = storage.source_state(conn, name)
+        if state is not None and state['fingerprint'] == repr(fingerprint):
+            return
+        
+        offset = state['byte_offset'] if state is not None else None
+        appended = (
+            offset is not None
+            and 0 < offset <= size
+            and (state['probe'] or b'').endswith(b'\n')
+            and _read_probe(source, offset) == state['probe']
+        )
+        if not appended and fingerprint != get_file_fingerprint(source):
+            return
+        
+        header = _read_csv_header(source)
+        start = offset if appended else 0
+        storage.write_source(conn, name, _read_csv_chunks(source, start, size, schema, header),
+                             fingerprint, replace=not appended, byte_offset=size,
+                             probe=_read_probe(source, size))
+
+
+def _typed_history(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """Pasang dtype schema pada frame history yang dibaca dari database"""
+    for col, dtype in schema['dtype'].items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    for col in schema['dates']:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def _read_sqlite_history(source: Path, name: str, fingerprint: Fingerprint, schema: dict,
+                         ingest: Callable[[Fingerprint], Tuple[pd.DataFrame, pd.DataFrame]],
+                         limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Frame history versi `fingerprint` dari database (limit: hanya baris terakhir).
+    Versi yang tidak ada di database dibaca lewat jalur pandas (ingest).
+    """
+    from src.data import storage
+    
+    df = storage.read_source(name, fingerprint, limit)
+    if df is None:
+        df = ingest(fingerprint)[0]
+        return df if limit is None else df.tail(limit).reset_index(drop=True)
+    return _typed_history(df, schema)
+
+
+def _ingest_sqlite(source: Path, name: str, fingerprint: Fingerprint, schema: dict,
+                   query: Callable[[Fingerprint], Optional[pd.DataFrame]],
+                   ingest: Callable[[Fingerprint], Tuple[pd.DataFrame, pd.DataFrame]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Backend sqlite: ingest history ke database lalu agregat per barang dijawab SQL
+    (tanpa frame penuh maupun agregasi pandas). Jika database berisi versi lain
+    (mis. versi lebih baru dari worker / proses lain), versi ini dihitung lewat jalur pandas.
+    Returns: (preview STREAM_PREVIEW_ROWS baris terakhir, agregat per barang)
+    """
+    _sync_history_sqlite(source, name, fingerprint, schema)
+    agg = query(fingerprint)
+    if agg is None:
+        df, agg = ingest(fingerprint)
+        return df.tail(STREAM_PREVIEW_ROWS).reset_index(drop=True), agg
+    return _read_sqlite_history(source, name, fingerprint, schema, ingest, STREAM_PREVIEW_ROWS), agg
+
+
+def _ingest_penyewaan_sqlite(fingerprint: Fingerprint) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    from src.data import storage
+    return _ingest_sqlite(RIWAYAT_PENYEWAAN_FILE, 'penyewaan', fingerprint, PENYEWAAN_SCHEMA,
+                          storage.query_rental_aggregates, _ingest_penyewaan)
+
+
+def _ingest_maintenance_sqlite(fingerprint: Fingerprint) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    from src.data import storage
+    return _ingest_sqlite(RIWAYAT_MAINTENANCE_FILE, 'maintenance', fingerprint, MAINTENANCE_SCHEMA,
+                          storage.query_maintenance_aggregates, _ingest_maintenance)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_sqlite_history(penyewaan_fp: Fingerprint,
+                         maintenance_fp: Fingerprint) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Frame history penuh dari database, hanya untuk analitik per event (lihat _history_frames)"""
+    return (_read_sqlite_history(RIWAYAT_PENYEWAAN_FILE, 'penyewaan', penyewaan_fp,
+                                 PENYEWAAN_SCHEMA, _ingest_penyewaan),
+            _read_sqlite_history(RIWAYAT_MAINTENANCE_FILE, 'maintenance', maintenance_fp,
+                                 MAINTENANCE_SCHEMA, _ingest_maintenance))
+
+
+def _history_frames(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                    today: pd.Timestamp) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Frame history penuh (penyewaan, maintenance) untuk analitik per event
+    (okupansi, reliability, trend as-of). Backend sqlite membacanya dari database
+    saat dibutuhkan; selain itu frame hasil ingest di _load_all_data.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return _load_sqlite_history(fingerprints[1], fingerprints[2])
+    return _load_all_data(fingerprints, today)[1:3]
 
 
-@st.cache_data(ttl=CACHE_TTL)
 def load_katalog() -> pd.DataFrame:
-    """Load katalog barang dengan caching"""
+    """Load katalog barang, di-cache berdasarkan fingerprint file"""
+    fingerprint = get_file_fingerprint(KATALOG_FILE)
     try:
-        df = pd.read_excel(KATALOG_FILE)
-        df['tanggal_pembelian'] = pd.to_datetime(df['tanggal_pembelian'], errors='coerce')
-        return df
+        return stamp_version(_load_katalog(fingerprint), ('katalog', fingerprint))
     except Exception as e:
         st.error(f"Error loading katalog: {str(e)}")
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=CACHE_TTL)
 def load_riwayat_penyewaan() -> pd.DataFrame:
-    """Load riwayat penyewaan dengan caching"""
+    """Load riwayat penyewaan, di-cache berdasarkan fingerprint file"""
+    fingerprint = get_file_fingerprint(RIWAYAT_PENYEWAAN_FILE)
     try:
-        df = pd.read_csv(RIWAYAT_PENYEWAAN_FILE)
-        df['tanggal_sewa'] = pd.to_datetime(df['tanggal_sewa'], errors='coerce')
-        # tanggal_kembali optional - jika ada, convert ke datetime
-        if 'tanggal_kembali' in df.columns:
-            df['tanggal_kembali'] = pd.to_datetime(df['tanggal_kembali'], errors='coerce')
-        return df
+        return stamp_version(_load_riwayat_penyewaan(fingerprint), ('penyewaan', fingerprint))
     except Exception as e:
         st.error(f"Error loading riwayat penyewaan: {str(e)}")
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=CACHE_TTL)
 def load_riwayat_maintenance() -> pd.DataFrame:
-    """Load riwayat maintenance dengan caching"""
+    """Load riwayat maintenance, di-cache berdasarkan fingerprint file"""
+    fingerprint = get_file_fingerprint(RIWAYAT_MAINTENANCE_FILE)
     try:
-        df = pd.read_csv(RIWAYAT_MAINTENANCE_FILE)
-        df['tanggal_maintenance'] = pd.to_datetime(df['tanggal_maintenance'], errors='coerce')
-        
-        # Remove unwanted columns
-        columns_to_drop = ['biaya_perbaikan', 'durasi_perbaikan_hari', 'teknisi']
-        df = df.drop(columns=[col for col in columns_to_drop if col in df.columns], errors='ignore')
-        
-        return df
+        return stamp_version(_load_riwayat_maintenance(fingerprint), ('maintenance', fingerprint))
     except Exception as e:
         st.error(f"Error loading riwayat maintenance: {str(e)}")
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=CACHE_TTL)
+# Load yang gagal raise (tidak di-cache st.cache_data); error ditampilkan oleh wrapper publik
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_katalog(fingerprint: Fingerprint) -> pd.DataFrame:
+    """Load katalog barang dengan caching"""
+    return _read_with_snapshot(KATALOG_FILE, _read_katalog_source, fingerprint)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_riwayat_penyewaan(fingerprint: Fingerprint) -> pd.DataFrame:
+    """Load riwayat penyewaan dengan caching"""
+    return _ingest_penyewaan(fingerprint)[0]
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_riwayat_maintenance(fingerprint: Fingerprint) -> pd.DataFrame:
+    """Load riwayat maintenance dengan caching"""
+    return _ingest_maintenance(fingerprint)[0]
+
+
 def load_insight() -> pd.DataFrame:
-    """Load insight kelayakan alat dengan caching"""
-    try:
-        df = pd.read_csv(INSIGHT_FILE)
-        
-        # Remove financial columns - focus only on equipment condition insights
-        columns_to_drop = ['total_biaya_maintenance', 'estimated_revenue', 'cost_benefit_ratio']
-        df = df.drop(columns=[col for col in columns_to_drop if col in df.columns], errors='ignore')
-        
-        return df
-    except Exception as e:
-        st.error(f"Error loading insight: {str(e)}")
+    """Load insight kelayakan alat (materialized, dihitung ulang hanya jika input berubah)"""
+    return load_all_data()[3]
+
+
+def load_aggregates() -> Dict:
+    """
+    Statistik per barang hasil agregasi satu-pass saat ingest (lihat processor.build_aggregates).
+    Dibagi ke processor & charts agar tabel history tidak di-scan ulang per fungsi.
+    """
+    fingerprints, today = _served_load_key()
+    aggregates = _load_all_data(fingerprints, today)[4]
+    for name, value in aggregates.items():
+        if isinstance(value, pd.DataFrame):
+            stamp_version(value, ('aggregates', name, fingerprints))
+    return aggregates
+
+
+def _insight_fingerprint(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                         today: pd.Timestamp) -> tuple:
+    """Fingerprint insight: fingerprint ketiga input + tanggal referensi + versi & parameter scoring"""
+    from src.data.processor import DEFAULT_SCORING, SCORING_VERSION
+    return (fingerprints, today.isoformat(), SCORING_VERSION, tuple(DEFAULT_SCORING))
+
+
+def _materialized_insight(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                          today: pd.Timestamp,
+                          compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Pakai insight yang sudah di-materialize jika fingerprint input cocok,
+    sehingga proses lain / server yang baru restart tidak perlu menghitung ulang.
+    """
+    if not ENABLE_SNAPSHOT_CACHE:
+        return compute()
+    
+    path = _snapshot_path(INSIGHT_FILE, _insight_fingerprint(fingerprints, today))
+    insight = _read_snapshot(path)
+    if insight is None:
+        insight = compute()
+        if not insight.empty:
+            _write_snapshot(path, insight)
+    return insight
+
+
+# Grain cube trend penyewaan: harian dari frame penuh, bulanan pada streaming mode
+# (satu pass chunked terpisah; state ingest tetap agregat per barang)
+RENTAL_CUBE_GRAIN = 'M' if STREAMING_MODE else 'D'
+
+
+def load_rental_cube() -> pd.DataFrame:
+    """Cube penyewaan barang x periode (RENTAL_CUBE_GRAIN) untuk trend, dibangun terpisah dari ingest"""
+    fingerprints, today = _served_load_key()
+    cube = _load_rental_cube(fingerprints, today)
+    return stamp_version(cube, ('rental_cube', fingerprints[1], RENTAL_CUBE_GRAIN))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_rental_cube(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                      today: pd.Timestamp) -> pd.DataFrame:
+    from functools import partial
+    from src.data.processor import aggregate_rental_cube
+    
+    penyewaan = _load_all_data(fingerprints, today)[1]
+    if penyewaan.empty:
+        return aggregate_rental_cube(penyewaan)
+    if STORAGE_BACKEND == "sqlite":
+        from src.data import storage
+        cube = storage.query_rental_cube(fingerprints[1], RENTAL_CUBE_GRAIN)
+        if cube is not None:
+            return cube
+    if STREAMING_MODE:
+        # Frame hanya preview - cube bulanan dilipat per chunk sampai ukuran di fingerprint
+        source = RIWAYAT_PENYEWAAN_FILE
+        aggregator = partial(aggregate_rental_cube, grain=RENTAL_CUBE_GRAIN)
+        return _stream_history(source, fingerprints[1][2], PENYEWAAN_SCHEMA,
+                               _read_csv_header(source), aggregator)[1]
+    return aggregate_rental_cube(_history_frames(fingerprints, today)[0], RENTAL_CUBE_GRAIN)
+
+
+def load_feasibility_features() -> pd.DataFrame:
+    """Fitur per barang (umur, sewa, maintenance) untuk evaluasi what-if policy scoring"""
+    fingerprints, today = _served_load_key()
+    features = _load_feasibility_features(fingerprints, today)
+    return stamp_version(features, ('features', _insight_fingerprint(fingerprints, today)))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_feasibility_features(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                               today: pd.Timestamp) -> pd.DataFrame:
+    from src.data.processor import build_feature_matrix
+    
+    katalog, _, _, insight, _ = _load_all_data(fingerprints, today)
+    return build_feature_matrix(katalog, insight, reference_date=today)
+
+
+def load_fleet_health_trend(days: int = 365) -> pd.DataFrame:
+    """Trend kesehatan armada harian (as-of) untuk `days` hari terakhir"""
+    return _load_fleet_health_trend(*_served_load_key(), days)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_fleet_health_trend(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                             today: pd.Timestamp, days: int) -> pd.DataFrame:
+    from src.data.processor import calculate_feasibility_history, get_fleet_health_trend
+    
+    # Pada streaming mode frame history hanya preview - trend tidak bisa dihitung
+    if STREAMING_MODE:
+        return pd.DataFrame()
+    
+    katalog = _load_all_data(fingerprints, today)[0]
+    penyewaan, maintenance = _history_frames(fingerprints, today)
+    # Semua tanggal dievaluasi dalam satu batch (bukan satu recompute per tanggal)
+    history = calculate_feasibility_history(
+        katalog, penyewaan, maintenance, pd.date_range(end=today, periods=days)
+    )
+    return get_fleet_health_trend(history)
+
+
+def load_occupancy(days: int = 365) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Okupansi `days` hari terakhir (lihat src.data.occupancy)
+    Returns: (okupansi per barang, okupansi harian per kategori)
+    """
+    fingerprints, today = _served_load_key()
+    items, daily = _load_occupancy(fingerprints, today, days)
+    token = ('occupancy', fingerprints, today.isoformat(), days)
+    return stamp_version(items, token + ('items',)), stamp_version(daily, token + ('kategori',))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_occupancy(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                    today: pd.Timestamp, days: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    from src.data.occupancy import build_rental_intervals, daily_occupancy, item_occupancy
+    
+    # Pada streaming mode frame history hanya preview - interval sewa tidak lengkap
+    if STREAMING_MODE:
+        return pd.DataFrame(), pd.DataFrame()
+    
+    katalog = _load_all_data(fingerprints, today)[0]
+    penyewaan = _history_frames(fingerprints, today)[0]
+    intervals = build_rental_intervals(penyewaan, katalog)
+    start = today - pd.Timedelta(days=days - 1)
+    return (item_occupancy(intervals, katalog, start, today),
+            daily_occupancy(intervals, katalog, start, today, by='kategori'))
+
+
+def load_reliability() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Analitik interval maintenance (lihat src.data.reliability)
+    Returns: (reliability per barang, sebaran interval per kategori, kurva survival per kategori)
+    """
+    fingerprints, today = _served_load_key()
+    items, categories, survival = _load_reliability(fingerprints, today)
+    token = ('reliability', fingerprints, today.isoformat())
+    return (stamp_version(items, token + ('items',)), stamp_version(categories, token + ('kategori',)),
+            stamp_version(survival, token + ('survival',)))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_reliability(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                      today: pd.Timestamp) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    from src.data.occupancy import build_rental_intervals
+    from src.data.reliability import (
+        build_maintenance_events, category_reliability, item_reliability,
+        maintenance_intervals, survival_curves
+    )
+    
+    # Pada streaming mode frame history hanya preview - urutan event tidak lengkap
+    if STREAMING_MODE:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    
+    katalog = _load_all_data(fingerprints, today)[0]
+    penyewaan, maintenance = _history_frames(fingerprints, today)
+    events = build_maintenance_events(maintenance, katalog, until=today)
+    rentals = build_rental_intervals(penyewaan, katalog)
+    return (item_reliability(events, katalog, today, rentals),
+            category_reliability(maintenance_intervals(events, katalog, rentals)),
+            survival_curves(events, katalog, today, by='kategori'))
+
+
+def load_demand_forecast(top_items: int = 10) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Forecast penyewaan bulanan (lihat src.data.forecast)
+    Returns: (forecast per kategori, forecast top_items barang)
+    """
+    fingerprints, today = _served_load_key()
+    categories, items = _load_demand_forecast(fingerprints, today, top_items)
+    token = ('forecast', fingerprints, today.isoformat(), top_items)
+    return stamp_version(categories, token + ('kategori',)), stamp_version(items, token + ('items',))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_demand_forecast(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                          today: pd.Timestamp, top_items: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    from src.data.forecast import forecast_demand
+    from src.data.processor import get_item_rental_trends, get_rental_trends
+    
+    katalog = _load_all_data(fingerprints, today)[0]
+    rental_cube = _load_rental_cube(fingerprints, today)
+    # Bulan berjalan belum lengkap, jadi tidak ikut di-fit
+    return (forecast_demand(get_rental_trends(rental_cube, katalog, 'M', by_category=True),
+                            'kategori', as_of=today),
+            forecast_demand(get_item_rental_trends(rental_cube, top_items), 'kode_barang', as_of=today))
+
+
+def load_dashboard_cube() -> pd.DataFrame:
+    """Cube dashboard kategori x bulan x rekomendasi x severity x jenis_maintenance (per versi data)"""
+    fingerprints, today = _served_load_key()
+    cube = _load_dashboard_cube(fingerprints, today)
+    return stamp_version(cube, ('dashboard_cube', _insight_fingerprint(fingerprints, today)))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_dashboard_cube(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                         today: pd.Timestamp) -> pd.DataFrame:
+    from src.data.processor import build_dashboard_cube
+    
+    # Pada streaming mode frame maintenance hanya preview - consumer memakai insight langsung
+    if STREAMING_MODE:
         return pd.DataFrame()
+    
+    katalog, _, _, insight, _ = _load_all_data(fingerprints, today)
+    maintenance = _history_frames(fingerprints, today)[1]
+    return build_dashboard_cube(insight, katalog, _load_rental_cube(fingerprints, today), maintenance)
+
+
+# Durasi load per source dari cache miss terakhir load_all_data
+_LOAD_TIMINGS: Dict[str, float] = {}
+
+
+class SourceLoadError(Exception):
+    """Satu atau lebih source gagal dimuat (errors: nama source -> pesan)"""
+    
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__("; ".join(f"{name}: {message}" for name, message in errors.items()))
+        self.errors = errors
 
 
-@st.cache_data(ttl=CACHE_TTL)
 def load_all_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Load semua data sekaligus untuk performa optimal
     Returns: (katalog, penyewaan, maintenance, insight)
     
+    Cache di-key dengan fingerprint ketiga file + tanggal hari ini,
+    sehingga file yang tidak berubah tidak pernah dibaca ulang.
+    Dipanggil pertama di setiap script run: versi data yang disajikan dipin di sini.
+    Error load (juga yang terjadi di thread worker) ditampilkan di script thread.
+    """
+    try:
+        fingerprints, today = _served_load_key(pin=True)
+        katalog, penyewaan, maintenance, insight = _load_all_data(fingerprints, today)[:4]
+    except SourceLoadError as e:
+        for name, message in e.errors.items():
+            st.error(f"Error loading {name}: {message}")
+        empty = pd.DataFrame()
+        return empty, empty, empty, empty
+    
+    # Versi baru gagal dihitung di worker: versi sebelumnya tetap disajikan
+    error = _compute_worker().last_error if BACKGROUND_COMPUTE else None
+    if error is not None:
+        st.warning(f"Data terbaru gagal dimuat, menampilkan versi sebelumnya: {error}")
+    
+    # Cache hit mengembalikan salinan baru, jadi token dipasang ulang setiap panggilan (O(1)).
+    # Fungsi processor & charts lalu di-key dengan token ini, bukan hash isi frame.
+    for name, df, fingerprint in [('katalog', katalog, fingerprints[0]),
+                                  ('penyewaan', penyewaan, fingerprints[1]),
+                                  ('maintenance', maintenance, fingerprints[2])]:
+        stamp_version(df, (name, fingerprint))
+    stamp_version(insight, ('insight', _insight_fingerprint(fingerprints, today)))
+    
+    return katalog, penyewaan, maintenance, insight
+
+
+def _current_load_key() -> Tuple[Tuple[Fingerprint, Fingerprint, Fingerprint], pd.Timestamp]:
+    """Key cache _load_all_data: fingerprint ketiga file + tanggal hari ini"""
+    fingerprints = (
+        get_file_fingerprint(KATALOG_FILE),
+        get_file_fingerprint(RIWAYAT_PENYEWAAN_FILE),
+        get_file_fingerprint(RIWAYAT_MAINTENANCE_FILE),
+    )
+    # Umur alat dihitung per hari, jadi insight cukup dihitung ulang sekali sehari
+    return fingerprints, pd.Timestamp.now().normalize()
+
+
+# Key session_state tempat versi yang disajikan dipin selama satu script run
+_SERVED_KEY_STATE = '_served_load_key'
+
+
+def _served_load_key(pin: bool = False) -> Tuple[Tuple[Fingerprint, Fingerprint, Fingerprint], pd.Timestamp]:
+    """
+    Key versi yang disajikan ke session: versi terbaru jika sudah dihitung, selain itu
+    versi sebelumnya selama worker menghitung versi baru (stale-while-revalidate).
+    Dalam script run key dipin di session_state (pin=True di awal run, oleh load_all_data),
+    sehingga swap versi oleh worker di tengah run tidak mencampur dua versi.
+    """
+    in_run = get_script_run_ctx(suppress_warning=True) is not None
+    if in_run and not pin and _SERVED_KEY_STATE in st.session_state:
+        return st.session_state[_SERVED_KEY_STATE]
+    
+    key = _current_load_key()
+    if BACKGROUND_COMPUTE:
+        key = _compute_worker().get(key)[0]
+    if in_run:
+        st.session_state[_SERVED_KEY_STATE] = key
+    return key
+
+
+@st.cache_resource
+def _compute_worker() -> ComputeWorker:
+    """Worker recompute bersama untuk semua session (satu per proses server)"""
+    return ComputeWorker(_compute_version, retry_after=COMPUTE_RETRY_AFTER)
+
+
+def _compute_version(key: Tuple[Tuple[Fingerprint, Fingerprint, Fingerprint], pd.Timestamp]) -> None:
+    """
+    Dijalankan di thread worker: isi cache loader untuk versi `key` sebelum versi ini
+    disajikan, sehingga session tidak pernah menghitungnya di script thread
+    """
+    fingerprints, today = key
+    _load_all_data(fingerprints, today)
+    for loader, args in _WARMUP_LOADERS:
+        try:
+            loader(fingerprints, today, *args)
+        except Exception:
+            # Turunan yang gagal dihitung ulang (dan error-nya tampil) di halaman yang memakainya
+            pass
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+def _load_all_data(fingerprints: Tuple[Fingerprint, Fingerprint, Fingerprint],
+                   today: pd.Timestamp) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, Dict]:
+    """
     Insight sekarang dihitung otomatis, bukan dari file CSV
+    Returns: (katalog, penyewaan, maintenance, insight, aggregates)
+    Pada HISTORY_PREVIEW (streaming / sqlite) penyewaan & maintenance hanya preview baris terakhir.
     """
-    from src.data.processor import calculate_equipment_feasibility
+    from src.data.processor import build_aggregates, calculate_equipment_feasibility
+    
+    katalog_fp, penyewaan_fp, maintenance_fp = fingerprints
     
-    katalog = load_katalog()
-    penyewaan = load_riwayat_penyewaan()
-    maintenance = load_riwayat_maintenance()
+    # Ketiga source independen - load paralel lalu join sebelum perhitungan insight.
+    # Thread hanya memanggil reader murni; error dikumpulkan lalu di-raise.
+    # Backend sqlite: history di-ingest ke database dan agregat per barang dijawab SQL
+    sqlite = STORAGE_BACKEND == "sqlite"
+    tasks = {
+        'katalog': (_read_with_snapshot, KATALOG_FILE, _read_katalog_source, katalog_fp),
+        'penyewaan': (_ingest_penyewaan_sqlite if sqlite else _ingest_penyewaan, penyewaan_fp),
+        'maintenance': (_ingest_maintenance_sqlite if sqlite else _ingest_maintenance, maintenance_fp),
+    }
+    with ThreadPoolExecutor(max_workers=max(1, LOADER_WORKERS)) as executor:
+        futures = {name: executor.submit(_timed, *task) for name, task in tasks.items()}
+    
+    results = {}
+    timings = {}
+    errors = {}
+    for name, future in futures.items():
+        try:
+            results[name], timings[name] = future.result()
+        except Exception as e:
+            errors[name] = str(e)
+    # Raise agar hasil parsial tidak di-cache; pemanggil (load_all_data) menampilkan error-nya
+    if errors:
+        raise SourceLoadError(errors)
+    
+    katalog = results['katalog']
+    penyewaan, rental_agg = results['penyewaan']
+    maintenance, maintenance_agg = results['maintenance']
     
     # Generate insight secara otomatis dari data
-    insight = calculate_equipment_feasibility(katalog, penyewaan, maintenance)
+    # Agregat per barang dari ingest inkremental (tanpa groupby ulang history)
+    start = time.perf_counter()
+    loaded_ok = not (katalog.empty or penyewaan.empty or maintenance.empty)
+    aggregates = build_aggregates(rental_agg, maintenance_agg)
     
-    return katalog, penyewaan, maintenance, insight
+    def compute() -> pd.DataFrame:
+        # Umur dihitung terhadap tanggal di key, bukan jam saat compute berjalan
+        # (compute yang melewati tengah malam / versi stale di worker tetap konsisten)
+        return calculate_equipment_feasibility(
+            katalog, penyewaan, maintenance, reference_date=today,
+            rental_agg=aggregates['rental_items'], maintenance_agg=maintenance_agg
+        )
+    
+    # Materialisasi hanya jika semua source berhasil dimuat
+    insight = _materialized_insight(fingerprints, today, compute) if loaded_ok else compute()
+    timings['insight'] = time.perf_counter() - start
+    
+    _LOAD_TIMINGS.clear()
+    _LOAD_TIMINGS.update(timings)
+    
+    return katalog, penyewaan, maintenance, insight, aggregates
+
+
+# Loader turunan yang dirender halaman dashboard, dengan parameter default UI-nya
+_WARMUP_LOADERS = [
+    (_load_rental_cube, ()),
+    (_load_dashboard_cube, ()),
+    (_load_feasibility_features, ()),
+    (_load_occupancy, (90,)),
+    (_load_reliability, ()),
+    (_load_demand_forecast, (10,)),
+    (_load_fleet_health_trend, (365,)),
+]
+
+
+def is_refreshing() -> bool:
+    """True selama worker menghitung versi data baru (session menerima versi sebelumnya)"""
+    return BACKGROUND_COMPUTE and _compute_worker().refreshing
+
+
+def _timed(func: Callable, *args):
+    """Jalankan func dan kembalikan (hasil, durasi dalam detik)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def get_load_timings() -> Dict[str, float]:
+    """Durasi (detik) per source dari load terakhir yang benar-benar membaca data"""
+    return dict(_LOAD_TIMINGS)
 
 
 def refresh_cache():
-    """Clear all cached data"""
+    """Paksa reload: clear semua cached data dan snapshot"""
+    # Reset worker dulu: versi yang sedang dihitung tidak dipasang setelah cache di-clear
+    if BACKGROUND_COMPUTE:
+        _compute_worker().reset()
     st.cache_data.clear()
+    # Per file di bawah lock-nya, agar ingest yang sedang berjalan tidak menulis state lama sesudahnya
+    for key, lock in list(_INCREMENTAL_LOCKS.items()):
+        with lock:
+            _INCREMENTAL_STATE.pop(key, None)
+    for snapshot in SNAPSHOT_DIR.glob(f"*{_SNAPSHOT_SUFFIX}"):
+        snapshot.unlink(missing_ok=True)
     st.success("Cache berhasil di-refresh!")
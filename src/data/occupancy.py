@@ -0,0 +1,186 @@
+"""
+Occupancy Engine
+Sweep-line atas interval sewa (tanggal_sewa + durasi_sewa): okupansi harian,
+hari idle, gap idle terpanjang dan jumlah sewa yang berjalan bersamaan,
+per barang atau per kategori pada rentang tanggal bebas.
+Semua langkah vectorized; biaya terbesar adalah sort event, O(n log n).
+"""
+from typing import NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Sewa tanpa durasi tetap dihitung memakai barang pada hari pengambilan
+MIN_DURASI_HARI = 1
+
+
+class RentalIntervals(NamedTuple):
+    """Interval sewa [start, end) dalam hari sejak epoch; item = posisi barang di katalog"""
+    item: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+
+
+def _day_number(value) -> int:
+    """Tanggal -> nomor hari sejak epoch"""
+    return int(np.datetime64(pd.Timestamp(value).normalize(), 'D').astype(np.int64))
+
+
+def _day_numbers(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Series tanggal -> (nomor hari sejak epoch, mask NaT)"""
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values, errors='coerce')
+    days = values.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    return days.astype(np.int64), np.isnat(days)
+
+
+def build_rental_intervals(penyewaan_df: pd.DataFrame, katalog_df: pd.DataFrame) -> RentalIntervals:
+    """
+    Interval sewa per baris penyewaan, di-key dengan posisi barang di katalog.
+    Baris tanpa tanggal_sewa atau dengan kode_barang di luar katalog dilewati.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if (penyewaan_df.empty or katalog_df.empty
+            or not {'kode_barang', 'tanggal_sewa'} <= set(penyewaan_df.columns)):
+        return RentalIntervals(empty, empty, empty)
+    
+    item = pd.Index(katalog_df['kode_barang']).get_indexer(penyewaan_df['kode_barang'])
+    start, missing = _day_numbers(penyewaan_df['tanggal_sewa'])
+    
+    if 'durasi_sewa' in penyewaan_df.columns:
+        durasi = penyewaan_df['durasi_sewa'].astype('Int64').fillna(MIN_DURASI_HARI).to_numpy(dtype=np.int64)
+        durasi = np.maximum(durasi, MIN_DURASI_HARI)
+    else:
+        durasi = np.full(len(penyewaan_df), MIN_DURASI_HARI, dtype=np.int64)
+    
+    valid = (item >= 0) & ~missing
+    return RentalIntervals(item[valid].astype(np.int64), start[valid], start[valid] + durasi[valid])
+
+
+def _item_windows(katalog_df: pd.DataFrame, start, end) -> Tuple[np.ndarray, int]:
+    """
+    Awal jendela ketersediaan per barang (maks. dari awal rentang dan tanggal pembelian)
+    dan akhir rentang (eksklusif), dalam nomor hari
+    """
+    first, window_end = _day_number(start), _day_number(end) + 1
+    window_start = np.full(len(katalog_df), first, dtype=np.int64)
+    if 'tanggal_pembelian' in katalog_df.columns:
+        purchase, missing = _day_numbers(katalog_df['tanggal_pembelian'])
+        window_start = np.where(missing, first, np.maximum(first, purchase))
+    return window_start, window_end
+
+
+def _clip(intervals: RentalIntervals, window_start: np.ndarray, window_end: int) -> RentalIntervals:
+    """Potong interval ke jendela barangnya dan buang yang tidak beririsan"""
+    start = np.maximum(intervals.start, window_start[intervals.item])
+    end = np.minimum(intervals.end, window_end)
+    keep = start < end
+    return RentalIntervals(intervals.item[keep], start[keep], end[keep])
+
+
+def item_occupancy(intervals: RentalIntervals, katalog_df: pd.DataFrame, start, end) -> pd.DataFrame:
+    """
+    Okupansi per barang pada rentang [start, end] (inklusif).
+    Returns per kode_barang: hari_tersedia (sejak dibeli), hari_terpakai (minimal satu
+    sewa berjalan), hari_idle, idle_terpanjang, hari_sewa (jumlah durasi, overlap ikut
+    terhitung), puncak_bersamaan (sewa berjalan bersamaan terbanyak), occupancy_pct.
+    """
+    n_items = len(katalog_df)
+    window_start, window_end = _item_windows(katalog_df, start, end)
+    window_len = np.maximum(window_end - window_start, 0)
+    clipped = _clip(intervals, window_start, window_end)
+    
+    hari_sewa = np.bincount(clipped.item, weights=clipped.end - clipped.start, minlength=n_items)
+    
+    # Event +1 saat sewa mulai, -1 saat selesai, dikodekan dalam satu key integer
+    # (barang, hari, jenis) sehingga cukup satu sort; di hari yang sama selesai diproses dulu
+    first = int(window_start.min()) if n_items else 0
+    span = max(window_end - first, 0) + 1
+    keys = np.sort(np.concatenate([
+        ((clipped.item * span + clipped.start - first) << 1) | 1,
+        (clipped.item * span + clipped.end - first) << 1,
+    ]))
+    ev_delta = (keys & 1) * 2 - 1
+    ev_item, ev_day = np.divmod(keys >> 1, span)
+    ev_day = ev_day + first
+    
+    # Total delta per barang = 0, jadi satu cumsum global sudah kembali ke 0 di batas barang
+    active = np.cumsum(ev_delta)
+    same_item_next = np.append(ev_item[1:] == ev_item[:-1], False)
+    segment = np.where(same_item_next, np.append(np.diff(ev_day), 0), 0)
+    
+    hari_terpakai = np.bincount(ev_item, weights=segment * (active > 0), minlength=n_items).astype(np.int64)
+    puncak = np.zeros(n_items, dtype=np.int64)
+    # Barang tanpa sewa: seluruh jendela adalah satu gap idle
+    idle_terpanjang = window_len.copy()
+    
+    if len(ev_item):
+        first_idx = np.flatnonzero(np.append(True, ev_item[1:] != ev_item[:-1]))
+        last_idx = np.append(first_idx[1:] - 1, len(ev_item) - 1)
+        rented = ev_item[first_idx]
+        
+        puncak[rented] = np.maximum.reduceat(active, first_idx)
+        inner_gap = np.maximum.reduceat(np.where(active == 0, segment, 0), first_idx)
+        leading_gap = ev_day[first_idx] - window_start[rented]
+        trailing_gap = window_end - ev_day[last_idx]
+        idle_terpanjang[rented] = np.maximum.reduce([inner_gap, leading_gap, trailing_gap])
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        occupancy_pct = np.where(window_len > 0, hari_terpakai / window_len * 100, 0.0)
+    
+    return pd.DataFrame({
+        'kode_barang': katalog_df['kode_barang'].to_numpy(),
+        'hari_tersedia': window_len,
+        'hari_terpakai': hari_terpakai,
+        'hari_idle': window_len - hari_terpakai,
+        'idle_terpanjang': idle_terpanjang,
+        'hari_sewa': hari_sewa.astype(np.int64),
+        'puncak_bersamaan': puncak,
+        'occupancy_pct': occupancy_pct,
+    })
+
+
+def daily_occupancy(intervals: RentalIntervals, katalog_df: pd.DataFrame, start, end,
+                    by: str = 'kategori') -> pd.DataFrame:
+    """
+    Okupansi harian per grup (kolom katalog `by`, mis. kategori; 'kode_barang' untuk per barang
+    - hasilnya barang x hari, jadi batasi katalog / rentang untuk katalog besar).
+    Returns: tanggal, <by>, unit_keluar (sewa berjalan), unit_tersedia (barang yang sudah
+    dibeli), occupancy_pct
+    """
+    columns = ['tanggal', by, 'unit_keluar', 'unit_tersedia', 'occupancy_pct']
+    window_start, window_end = _item_windows(katalog_df, start, end)
+    first = _day_number(start)
+    n_days = window_end - first
+    if katalog_df.empty or n_days <= 0:
+        return pd.DataFrame(columns=columns)
+    
+    group_codes, groups = pd.factorize(katalog_df[by], sort=True)
+    n_groups = len(groups)
+    clipped = _clip(intervals, window_start, window_end)
+    known = group_codes[clipped.item] >= 0
+    group = group_codes[clipped.item][known]
+    
+    # Sweep per grup: +1 di hari mulai, -1 di hari selesai, lalu cumsum sepanjang hari
+    size = n_groups * (n_days + 1)
+    diff = (np.bincount(group * (n_days + 1) + clipped.start[known] - first, minlength=size)
+            - np.bincount(group * (n_days + 1) + clipped.end[known] - first, minlength=size))
+    keluar = np.cumsum(diff.reshape(n_groups, n_days + 1), axis=1)[:, :n_days]
+    
+    # Unit tersedia bertambah sejak hari pembelian (dalam rentang)
+    owned = (group_codes >= 0) & (window_start < window_end)
+    added = np.bincount(group_codes[owned] * (n_days + 1) + window_start[owned] - first, minlength=size)
+    tersedia = np.cumsum(added.reshape(n_groups, n_days + 1), axis=1)[:, :n_days]
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct = np.where(tersedia > 0, keluar / tersedia * 100, 0.0)
+    
+    tanggal = pd.date_range(pd.Timestamp(start).normalize(), periods=n_days, freq='D')
+    return pd.DataFrame({
+        'tanggal': np.tile(tanggal, n_groups),
+        by: np.repeat(np.asarray(groups), n_days),
+        'unit_keluar': keluar.ravel(),
+        'unit_tersedia': tersedia.ravel(),
+        'occupancy_pct': pct.ravel(),
+    })[columns]
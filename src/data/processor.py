@@ -2,52 +2,136 @@
 Data Processor Module
 Handle transformasi dan agregasi data
 """
+import numpy as np
 import pandas as pd
 import streamlit as st
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+import sys
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.cache import FRAME_HASH_FUNCS
 
-@st.cache_data
-def get_maintenance_summary(maintenance_df: pd.DataFrame) -> Dict:
-    """Aggregasi summary maintenance"""
-    if maintenance_df.empty:
-        return {}
-    
-    summary = {
-        'total_events': len(maintenance_df),
-        'severity_dist': maintenance_df['severity'].value_counts().to_dict() if 'severity' in maintenance_df else {},
-        'condition_dist': maintenance_df['kondisi_setelah_perbaikan'].value_counts().to_dict() if 'kondisi_setelah_perbaikan' in maintenance_df else {}
-    }
+# Naikkan jika rumus scoring kelayakan berubah, agar insight yang sudah
+# di-materialize tidak dipakai lagi (perubahan konstanta ikut lewat ScoringParams)
+SCORING_VERSION = 1
+
+
+class ScoringParams(NamedTuple):
+    """
+    Konstanta degradasi kelayakan: laju (% per unit) dan batas maksimum (%).
+    Field boleh berupa array numpy untuk evaluasi banyak policy sekaligus.
+    """
+    age_rate: float = 0.01  # per hari umur
+    age_cap: float = 20
+    rental_rate: float = 0.5  # per sewa
+    rental_cap: float = 30
+    rental_day_rate: float = 0.05  # per hari sewa
+    rental_day_cap: float = 20
+    maintenance_rate: float = 0.2  # per event maintenance
+    maintenance_cap: float = 15
+
+
+DEFAULT_SCORING = ScoringParams()
+
+# Label rekomendasi dari kondisi terbaik ke terburuk, dan batas bawah kelayakan
+# untuk setiap label kecuali yang terakhir (kelayakan < 40 = PERLU PERHATIAN KHUSUS)
+RECOMMENDATION_LABELS = [
+    'KONDISI SANGAT BAIK',
+    'LAYAK OPERASIONAL',
+    'TINGKATKAN PEMELIHARAAN',
+    'PERLU PERHATIAN KHUSUS'
+]
+RECOMMENDATION_THRESHOLDS = [85, 70, 40]
+
+# Dimensi maintenance yang ikut diagregasi dalam satu pass (jika kolomnya ada)
+MAINTENANCE_DIMENSIONS = ['severity', 'kondisi_setelah_perbaikan']
+# State ingest penyewaan = agregat per barang; cube trend barang x periode dibangun terpisah
+RENTAL_CUBE_KEYS = ['kode_barang', 'tanggal_sewa']
+# Grain cube trend yang didukung: harian atau bulanan (awal bulan)
+RENTAL_CUBE_GRAINS = {'D': 'datetime64[D]', 'M': 'datetime64[M]'}
+RENTAL_VALUES = ['freq_sewa', 'total_hari_sewa']
+# Cube trend juga membawa pendapatan tercatat (harga_satuan x jumlah) untuk revenue per kategori
+RENTAL_CUBE_VALUES = RENTAL_VALUES + ['pendapatan']
+# Kolom key agregat - kolom lainnya dijumlahkan saat merge agregat parsial
+AGGREGATE_KEYS = ['kode_barang', 'tanggal_sewa'] + MAINTENANCE_DIMENSIONS
+
+# Granularity trend penyewaan (frekuensi pandas Period) dan labelnya
+TREND_GRANULARITIES = {'D': 'Harian', 'W': 'Mingguan', 'M': 'Bulanan', 'Q': 'Kuartalan'}
+
+
+def classify_by_thresholds(values, thresholds: Sequence[float], labels: Sequence[str]) -> pd.Categorical:
+    """
+    Bucket nilai ke label secara vectorized.
+    thresholds menurun, labels[i] untuk nilai >= thresholds[i], label terakhir untuk sisanya
+    (termasuk NaN - sama seperti perbandingan if/elif per baris).
+    """
+    values = np.asarray(values, dtype=float)
+    passed = np.zeros(values.shape, dtype=np.int8)
+    for threshold in thresholds:
+        passed += values >= threshold
+    codes = len(thresholds) - passed
+    return pd.Categorical.from_codes(codes, categories=list(labels))
+
+
+def classify_recommendation(kelayakan: pd.Series) -> pd.Series:
+    """Label rekomendasi (categorical) dari kelayakan dengan cut point 85/70/40"""
+    return pd.Series(
+        classify_by_thresholds(kelayakan, RECOMMENDATION_THRESHOLDS, RECOMMENDATION_LABELS),
+        index=kelayakan.index,
+        name='rekomendasi'
+    )
+
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_maintenance_summary(maintenance_df: pd.DataFrame, aggregates: Dict = None) -> Dict:
+    """Aggregasi summary maintenance (dari aggregates bersama jika tersedia)"""
+    if aggregates is None:
+        if maintenance_df.empty:
+            return {}
+        aggregates = compute_aggregates(maintenance_df=maintenance_df)
     
-    return summary
+    return aggregates['maintenance_summary']
 
 
-@st.cache_data
-def get_top_maintenance_items(maintenance_df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
-    """Get top N items dengan maintenance terbanyak"""
-    if maintenance_df.empty:
-        return pd.DataFrame()
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_top_maintenance_items(maintenance_df: pd.DataFrame = None, n: int = 10,
+                              aggregates: Dict = None) -> pd.DataFrame:
+    """
+    Get top N items dengan maintenance terbanyak (dari aggregates bersama jika tersedia;
+    pada backend sqlite agregat itu sudah hasil query SQL)
+    """
+    if aggregates is None:
+        if maintenance_df is None or maintenance_df.empty:
+            return pd.DataFrame()
+        
+        aggregates = compute_aggregates(maintenance_df=maintenance_df)
     
-    top_items = maintenance_df.groupby('kode_barang').agg({
-        'id_maintenance': 'count'
-    }).rename(columns={'id_maintenance': 'jumlah_maintenance'})
+    top_items = aggregates['maintenance_items']
+    if top_items.empty:
+        return pd.DataFrame()
     
     top_items = top_items.sort_values('jumlah_maintenance', ascending=False).head(n)
-    return top_items.reset_index()
+    return top_items.reset_index(drop=True)
 
 
-@st.cache_data
-def get_recommendation_distribution(insight_df: pd.DataFrame) -> pd.DataFrame:
-    """Distribusi rekomendasi alat"""
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_recommendation_distribution(insight_df: pd.DataFrame, cube: pd.DataFrame = None) -> pd.DataFrame:
+    """Distribusi rekomendasi alat (dari rollup cube dashboard jika diberikan)"""
     if insight_df.empty or 'rekomendasi' not in insight_df:
         return pd.DataFrame()
     
-    dist = insight_df['rekomendasi'].value_counts().reset_index()
+    if cube is not None and not cube.empty:
+        counts = rollup_cube(cube, ['rekomendasi']).set_index('rekomendasi')['jumlah_items']
+        dist = counts.sort_values(ascending=False, kind='stable').reset_index()
+    else:
+        dist = insight_df['rekomendasi'].value_counts().reset_index()
     dist.columns = ['Rekomendasi', 'Jumlah']
-    return dist
+    # Kolom categorical juga menghitung label yang tidak muncul
+    return dist[dist['Jumlah'] > 0].reset_index(drop=True)
 
 
-@st.cache_data
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
 def get_critical_items(insight_df: pd.DataFrame, threshold: float = 0.3) -> pd.DataFrame:
     """Get alat dengan maintenance ratio tinggi (kritis) atau kelayakan rendah"""
     if insight_df.empty:
@@ -71,29 +155,87 @@ def get_critical_items(insight_df: pd.DataFrame, threshold: float = 0.3) -> pd.D
     return critical[columns]
 
 
-@st.cache_data
-def get_rental_trends(penyewaan_df: pd.DataFrame) -> pd.DataFrame:
-    """Trend penyewaan per bulan"""
-    if penyewaan_df.empty or 'tanggal_sewa' not in penyewaan_df:
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_daily_rental_trends(rental_cube: pd.DataFrame, katalog_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rollup cube penyewaan (barang x hari, atau x bulan untuk cube grain 'M') ke periode x kategori.
+    Frame kecil ini menjadi dasar semua granularity di get_rental_trends.
+    """
+    columns = ['tanggal', 'kategori', 'Jumlah Transaksi', 'Hari Sewa']
+    cube = rental_cube.dropna(subset=['tanggal_sewa']) if not rental_cube.empty else rental_cube
+    if cube.empty:
+        return pd.DataFrame(columns=columns)
+    
+    # Kategori per baris cube lewat posisi di katalog (tanpa merge string)
+    katalog = katalog_df.drop_duplicates('kode_barang')
+    positions = pd.Index(katalog['kode_barang']).get_indexer(cube['kode_barang'])
+    kategori = katalog['kategori'].astype(str).to_numpy()
+    kategori = np.where(positions >= 0, kategori[positions], 'lainnya')
+    
+    kategori = pd.Series(kategori, index=cube.index, name='kategori', dtype='category')
+    daily = cube[RENTAL_VALUES].groupby([cube['tanggal_sewa'].rename('tanggal'), kategori],
+                                        observed=True).sum()
+    daily = daily.reset_index()
+    daily.columns = columns
+    
+    return daily
+
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_rental_trends(rental_cube: pd.DataFrame, katalog_df: pd.DataFrame,
+                      granularity: str = 'M', by_category: bool = False) -> pd.DataFrame:
+    """
+    Trend penyewaan per periode (granularity: D/W/M/Q, lihat TREND_GRANULARITIES)
+    Hasil rollup dari cube harian, bukan groupby ulang atas history mentah.
+    Returns: Periode (awal periode), [kategori], Jumlah Transaksi, Hari Sewa
+    """
+    daily = get_daily_rental_trends(rental_cube, katalog_df)
+    if daily.empty:
         return pd.DataFrame()
     
-    # Filter hanya transaksi utama (yang punya nomor)
-    main_df = penyewaan_df[penyewaan_df['no'].notna()].copy()
+    periode = daily['tanggal'].dt.to_period(granularity).dt.start_time.rename('Periode')
+    keys = [periode, daily['kategori']] if by_category else [periode]
+    trends = daily.groupby(keys, observed=True)[['Jumlah Transaksi', 'Hari Sewa']].sum()
     
-    if main_df.empty:
+    return trends.reset_index()
+
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_item_rental_trends(rental_cube: pd.DataFrame, top_n: int = 10,
+                           granularity: str = 'M') -> pd.DataFrame:
+    """
+    Trend penyewaan per periode untuk top_n barang dengan transaksi terbanyak
+    (rollup cube barang x hari, seperti get_rental_trends).
+    Returns: Periode, kode_barang, Jumlah Transaksi, Hari Sewa
+    """
+    cube = rental_cube.dropna(subset=['tanggal_sewa']) if not rental_cube.empty else rental_cube
+    if cube.empty:
         return pd.DataFrame()
     
-    main_df['bulan'] = main_df['tanggal_sewa'].dt.to_period('M')
-    trends = main_df.groupby('bulan').size().reset_index()
-    trends.columns = ['Bulan', 'Jumlah Transaksi']
-    trends['Bulan'] = trends['Bulan'].astype(str)
+    totals = cube.groupby('kode_barang', observed=True)['freq_sewa'].sum()
+    top = totals.iloc[top_k_positions(totals.to_numpy(), top_n)].index
+    cube = cube[cube['kode_barang'].isin(top)]
+    
+    periode = cube['tanggal_sewa'].dt.to_period(granularity).dt.start_time.rename('Periode')
+    kode = cube['kode_barang'].astype(str)
+    trends = cube[RENTAL_VALUES].groupby([periode, kode]).sum()
+    trends.columns = ['Jumlah Transaksi', 'Hari Sewa']
     
-    return trends
+    return trends.reset_index()
 
 
-@st.cache_data
-def get_revenue_by_category(penyewaan_df: pd.DataFrame, katalog_df: pd.DataFrame) -> pd.DataFrame:
-    """Revenue per kategori"""
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_revenue_by_category(penyewaan_df: pd.DataFrame, katalog_df: pd.DataFrame,
+                            cube: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Revenue per kategori = pendapatan tercatat per transaksi (harga_satuan x jumlah)
+    cube: cube dashboard - measure yang sama, dijumlahkan saat build cube (tanpa scan history)
+    """
+    if cube is not None and not cube.empty:
+        revenue = rollup_cube(cube, ['kategori'])[['kategori', 'pendapatan']]
+        revenue.columns = ['Kategori', 'Total Revenue']
+        return revenue.sort_values('Total Revenue', ascending=False)
+    
     if penyewaan_df.empty or katalog_df.empty:
         return pd.DataFrame()
     
@@ -104,29 +246,42 @@ def get_revenue_by_category(penyewaan_df: pd.DataFrame, katalog_df: pd.DataFrame
         how='left'
     )
     
-    # Clean harga satuan
-    merged['harga_clean'] = merged['harga_satuan'].apply(clean_rupiah)
-    merged['revenue'] = merged['harga_clean'] * merged['jumlah']
+    merged['revenue'] = _rental_revenue(merged)
     
     # Aggregate per kategori
-    revenue = merged.groupby('kategori')['revenue'].sum().reset_index()
+    revenue = merged.groupby('kategori', observed=True)['revenue'].sum().reset_index()
     revenue.columns = ['Kategori', 'Total Revenue']
     revenue = revenue.sort_values('Total Revenue', ascending=False)
     
     return revenue
 
 
-@st.cache_data
-def get_utilization_rate(insight_df: pd.DataFrame) -> pd.DataFrame:
-    """Calculate utilization rate untuk top items"""
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_utilization_rate(insight_df: pd.DataFrame, occupancy_df: pd.DataFrame = None,
+                         top_n: int = 20) -> pd.DataFrame:
+    """
+    Calculate utilization rate untuk top items
+    occupancy_df: hasil occupancy.item_occupancy - jika ada, item diurutkan berdasarkan
+    okupansi sebenarnya (persentase hari terpakai), bukan frekuensi sewa
+    """
     if insight_df.empty:
         return pd.DataFrame()
     
-    top_items = insight_df.nlargest(20, 'freq_sewa')[
-        ['kode_barang', 'nama_barang', 'freq_sewa', 'total_hari_sewa', 'kategori']
-    ].copy()
+    columns = ['kode_barang', 'nama_barang', 'freq_sewa', 'total_hari_sewa', 'kategori']
+    if occupancy_df is None or occupancy_df.empty:
+        return insight_df.nlargest(top_n, 'freq_sewa')[columns].copy()
+    
+    # Ambil baris okupansi per barang lewat posisi (tanpa merge string)
+    positions = pd.Index(occupancy_df['kode_barang']).get_indexer(insight_df['kode_barang'])
+    occupancy_pct = np.where(positions >= 0, occupancy_df['occupancy_pct'].to_numpy()[positions], np.nan)
+    top = top_k_positions(occupancy_pct, top_n)
     
-    return top_items
+    top_items = insight_df.iloc[top][columns].reset_index(drop=True)
+    # Barang tanpa baris okupansi (posisi -1, menyusul di akhir) mendapat NaN
+    occupancy = occupancy_df.drop(columns='kode_barang').reset_index(drop=True).reindex(positions[top])
+    occupancy = occupancy.reset_index(drop=True)
+    
+    return pd.concat([top_items, occupancy], axis=1)
 
 
 def clean_rupiah(val) -> float:
@@ -140,6 +295,25 @@ def clean_rupiah(val) -> float:
         return 0
 
 
+def clean_rupiah_series(values: pd.Series) -> pd.Series:
+    """Versi vectorized clean_rupiah untuk satu Series (NaN / tidak valid -> 0)"""
+    # Harga berulang di jutaan baris: cukup parse sekali per nilai unik
+    codes, uniques = pd.factorize(values)
+    cleaned = (
+        pd.Series(uniques, dtype=object).astype(str)
+        .str.replace('Rp.', '', regex=False)
+        .str.replace('RP.', '', regex=False)
+        .str.replace('.', '', regex=False)
+        .str.replace(',', '', regex=False)
+        .str.strip()
+    )
+    parsed = pd.to_numeric(cleaned, errors='coerce').fillna(0).to_numpy(dtype=float)
+    
+    # Slot terakhir = 0 untuk code -1 (NaN)
+    parsed = np.append(parsed, 0.0)
+    return pd.Series(parsed[codes], index=values.index, name=values.name)
+
+
 def format_rupiah(value: float) -> str:
     """Format float ke Rupiah string"""
     try:
@@ -156,9 +330,417 @@ def calculate_age_days(purchase_date: pd.Series, reference_date: pd.Timestamp =
     return (reference_date - purchase_date).dt.days
 
 
-@st.cache_data
+def _plain_key(agg: pd.DataFrame) -> pd.DataFrame:
+    """Kembalikan kode_barang kategorikal ke dtype aslinya agar merge dengan katalog tetap konsisten"""
+    dtype = agg['kode_barang'].dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        agg['kode_barang'] = agg['kode_barang'].astype(dtype.categories.dtype)
+    return agg
+
+
+def _rental_weights(penyewaan_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Per baris penyewaan: (dihitung sebagai sewa?, durasi dalam hari)"""
+    # Cari kolom ID yang tersedia untuk counting
+    id_col = None
+    for col in ['id_penyewaan', 'no', 'id']:
+        if col in penyewaan_df.columns:
+            id_col = col
+            break
+    
+    # durasi_sewa dibaca sebagai Int16 - jumlahkan dalam int64 agar tidak overflow
+    durasi = penyewaan_df['durasi_sewa'].astype('Int64')
+    # Fallback: hitung dari durasi_sewa jika tidak ada kolom ID
+    ids = penyewaan_df[id_col] if id_col else durasi
+    
+    return ids.notna().to_numpy(), durasi.fillna(0).to_numpy(dtype='int64')
+
+
+def _rental_revenue(penyewaan_df: pd.DataFrame) -> np.ndarray:
+    """Pendapatan tercatat per baris penyewaan: harga_satuan x jumlah (0 jika kolom tidak ada / tidak valid)"""
+    if not {'harga_satuan', 'jumlah'} <= set(penyewaan_df.columns):
+        return np.zeros(len(penyewaan_df))
+    jumlah = pd.to_numeric(penyewaan_df['jumlah'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    return clean_rupiah_series(penyewaan_df['harga_satuan']).to_numpy() * jumlah
+
+
+def aggregate_rentals(penyewaan_df: pd.DataFrame) -> pd.DataFrame:
+    """Agregasi penyewaan per barang: freq_sewa dan total_hari_sewa"""
+    if penyewaan_df.empty or 'kode_barang' not in penyewaan_df.columns:
+        return pd.DataFrame(columns=['kode_barang', 'freq_sewa', 'total_hari_sewa'])
+    
+    # Satu pass: factorize kode_barang sekali lalu bincount untuk kedua statistik
+    # (jauh lebih ringan dari groupby.agg, terutama untuk delta kecil)
+    counted, days = _rental_weights(penyewaan_df)
+    
+    codes, uniques = pd.factorize(penyewaan_df['kode_barang'], sort=True)
+    valid = codes >= 0
+    codes = codes[valid]
+    counted = counted[valid]
+    days = days[valid]
+    
+    rental_agg = pd.DataFrame({
+        'kode_barang': uniques,
+        'freq_sewa': np.bincount(codes, weights=counted, minlength=len(uniques)).astype('int64'),  # frekuensi sewa
+        'total_hari_sewa': np.bincount(codes, weights=days, minlength=len(uniques)).astype('int64')  # total hari sewa
+    })
+    rental_agg = _plain_key(rental_agg)
+    
+    return rental_agg
+
+
+def aggregate_rental_cube(penyewaan_df: pd.DataFrame, grain: str = 'D') -> pd.DataFrame:
+    """
+    Agregasi penyewaan per barang x periode (tanggal_sewa = awal hari / bulan sesuai grain,
+    lihat RENTAL_CUBE_GRAINS): freq_sewa, total_hari_sewa dan pendapatan. Dasar trend
+    periodik dan cube dashboard; state ingest tetap per barang (aggregate_rentals).
+    """
+    if penyewaan_df.empty or 'kode_barang' not in penyewaan_df.columns:
+        return pd.DataFrame(columns=RENTAL_CUBE_KEYS + RENTAL_CUBE_VALUES)
+    
+    counted, days = _rental_weights(penyewaan_df)
+    revenue = _rental_revenue(penyewaan_df)
+    
+    # Periode sebagai integer (hari / bulan sejak epoch); NaT ditandai terpisah
+    unit = RENTAL_CUBE_GRAINS[grain]
+    if 'tanggal_sewa' in penyewaan_df.columns:
+        tanggal = penyewaan_df['tanggal_sewa']
+        if not pd.api.types.is_datetime64_any_dtype(tanggal):
+            tanggal = pd.to_datetime(tanggal, errors='coerce')
+        day = tanggal.to_numpy(dtype='datetime64[ns]').astype(unit)
+    else:
+        day = np.full(len(penyewaan_df), np.datetime64('NaT'), dtype=unit)
+    missing = np.isnat(day)
+    day = day.astype(np.int64)
+    
+    item_codes, items = pd.factorize(penyewaan_df['kode_barang'], sort=True)
+    # Kembalikan ke dtype asli di level uniques (kecil), bukan per baris cube
+    items = pd.Index(items)
+    if isinstance(items.dtype, pd.CategoricalDtype):
+        items = items.astype(items.dtype.categories.dtype)
+    valid = item_codes >= 0
+    
+    # Key gabungan barang x hari; hari kosong (NaT) mendapat slot 0
+    first_day = day[~missing].min() if (~missing).any() else 0
+    day_slot = np.where(missing, 0, day - first_day + 1)
+    span = int(day_slot.max()) + 1
+    keys = item_codes[valid].astype(np.int64) * span + day_slot[valid]
+    cells, cell_codes = np.unique(keys, return_inverse=True)
+    
+    cell_days = cells % span
+    tanggal_sewa = (first_day + cell_days - 1).astype(unit).astype('datetime64[ns]')
+    tanggal_sewa[cell_days == 0] = np.datetime64('NaT')
+    
+    rental_cube = pd.DataFrame({
+        'kode_barang': items.take(cells // span),
+        'tanggal_sewa': tanggal_sewa,
+        'freq_sewa': np.bincount(cell_codes, weights=counted[valid], minlength=len(cells)).astype('int64'),
+        'total_hari_sewa': np.bincount(cell_codes, weights=days[valid], minlength=len(cells)).astype('int64'),
+        'pendapatan': np.bincount(cell_codes, weights=revenue[valid], minlength=len(cells)),
+    })
+    
+    return rental_cube
+
+
+def aggregate_maintenance(maintenance_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agregasi maintenance dalam satu pass: kode_barang x severity x kondisi_setelah_perbaikan
+    (dimensi yang kolomnya ada). jumlah_maintenance = count id_maintenance, events = jumlah baris.
+    Statistik per barang dan distribusi severity/kondisi diturunkan dari cube ini.
+    """
+    if maintenance_df.empty or 'kode_barang' not in maintenance_df.columns:
+        return pd.DataFrame(columns=['kode_barang', 'jumlah_maintenance', 'events'])
+    
+    keys = ['kode_barang'] + [col for col in MAINTENANCE_DIMENSIONS if col in maintenance_df.columns]
+    # dropna=False: baris dengan severity/kondisi kosong tetap dihitung per barang
+    grouped = maintenance_df.groupby(keys, observed=True, dropna=False)['id_maintenance']
+    maintenance_agg = grouped.agg(['count', 'size']).reset_index()
+    maintenance_agg.columns = keys + ['jumlah_maintenance', 'events']
+    
+    return _plain_key(maintenance_agg)
+
+
+def rollup_aggregate(agg: pd.DataFrame, keys: List[str], values: List[str]) -> pd.DataFrame:
+    """Jumlahkan agregat ke level keys; key kosong (NaN) dibuang seperti groupby biasa"""
+    if agg.empty:
+        return pd.DataFrame(columns=keys + values)
+    return agg.groupby(keys, observed=True)[values].sum().reset_index()
+
+
+def merge_aggregates(base_agg: pd.DataFrame, delta_agg: pd.DataFrame) -> pd.DataFrame:
+    """Gabungkan agregat per barang dengan agregat dari data baru (delta)"""
+    if delta_agg.empty:
+        return base_agg
+    if base_agg.empty:
+        return delta_agg
+    
+    merged = pd.concat([base_agg, delta_agg], ignore_index=True)
+    keys = [col for col in AGGREGATE_KEYS if col in merged.columns]
+    return merged.groupby(keys, sort=False, observed=True, dropna=False).sum().reset_index()
+
+
+def build_aggregates(rental_agg: pd.DataFrame, maintenance_agg: pd.DataFrame) -> Dict:
+    """
+    Turunkan semua statistik per barang dari agregat satu-pass per source,
+    tanpa scan ulang tabel penuh. Hasilnya dibagi ke processor & charts.
+    rental_agg: agregat per barang (aggregate_rentals)
+    """
+    maintenance_items = rollup_aggregate(maintenance_agg, ['kode_barang'], ['jumlah_maintenance'])
+    
+    maintenance_summary = {}
+    if not maintenance_agg.empty:
+        maintenance_summary = {'total_events': int(maintenance_agg['events'].sum())}
+        for key, col in [('severity_dist', 'severity'), ('condition_dist', 'kondisi_setelah_perbaikan')]:
+            if col in maintenance_agg.columns:
+                dist = maintenance_agg.groupby(col, observed=True)['events'].sum()
+                maintenance_summary[key] = dist.sort_values(ascending=False).to_dict()
+            else:
+                maintenance_summary[key] = {}
+    
+    return {
+        'rental_items': rental_agg,
+        'maintenance_items': maintenance_items,
+        'maintenance_cube': maintenance_agg,
+        'maintenance_summary': maintenance_summary,
+    }
+
+
+def compute_aggregates(penyewaan_df: pd.DataFrame = None, maintenance_df: pd.DataFrame = None) -> Dict:
+    """Satu pass groupby per source untuk semua statistik per barang (source None dilewati)"""
+    empty = pd.DataFrame()
+    return build_aggregates(
+        aggregate_rentals(penyewaan_df if penyewaan_df is not None else empty),
+        aggregate_maintenance(maintenance_df if maintenance_df is not None else empty)
+    )
+
+
+def aggregate_categories(insight_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Statistik per kategori dalam satu groupby - dipakai bersama oleh
+    get_category_performance dan heatmap beban maintenance.
+    Input sudah per barang (kecil), jadi tidak di-cache terpisah:
+    hashing insight_df sama mahalnya dengan groupby ini.
+    """
+    if insight_df.empty:
+        return pd.DataFrame()
+    
+    # Satu grouper dipakai ulang untuk semua kolom
+    grouped = insight_df.groupby('kategori', observed=True)
+    category_stats = pd.DataFrame({
+        'avg_kelayakan': grouped['kelayakan'].mean(),
+        'min_kelayakan': grouped['kelayakan'].min(),
+        'max_kelayakan': grouped['kelayakan'].max(),
+        'jumlah_items': grouped['kelayakan'].count(),
+        'total_sewa': grouped['freq_sewa'].sum(),
+        'total_maintenance': grouped['jumlah_maintenance'].sum(),
+        'avg_maintenance_ratio': grouped['maintenance_ratio'].mean()
+    }).reset_index()
+    
+    return category_stats
+
+
+# Cube dashboard: dimensi, measure yang dijumlahkan dan measure min/max saat rollup
+CUBE_DIMENSIONS = ['kategori', 'bulan', 'rekomendasi', 'severity', 'jenis_maintenance']
+CUBE_SUM_MEASURES = [
+    'jumlah_items', 'sum_kelayakan', 'sum_maintenance_ratio',  # fakta barang
+    'freq_sewa', 'hari_sewa', 'pendapatan',  # fakta penyewaan
+    'jumlah_maintenance', 'events',  # fakta maintenance
+]
+CUBE_MIN_MAX_MEASURES = {'min_kelayakan': 'min', 'max_kelayakan': 'max'}
+
+
+def build_dashboard_cube(insight_df: pd.DataFrame, katalog_df: pd.DataFrame,
+                         rental_cube: pd.DataFrame, maintenance_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cube kecil kategori x bulan x rekomendasi x severity x jenis_maintenance,
+    dibangun sekali per versi data. Tiga fakta digabung dalam satu frame dan setiap
+    measure hanya terisi di baris faktanya (barang: tanpa bulan; penyewaan: tanpa
+    severity / jenis), jadi semua slice cukup dijawab dengan rollup_cube.
+    Dimensi yang kolomnya tidak ada di source (mis. severity) berisi NaN.
+    """
+    if insight_df.empty:
+        return pd.DataFrame(columns=CUBE_DIMENSIONS + CUBE_SUM_MEASURES + list(CUBE_MIN_MAX_MEASURES))
+    
+    items = pd.Index(insight_df['kode_barang'])
+    kategori = insight_df['kategori'].to_numpy()
+    rekomendasi = insight_df['rekomendasi'].to_numpy()
+    
+    def facts(positions: np.ndarray, frame: pd.DataFrame, bulan=None, **dims) -> List[pd.Series]:
+        """Key dimensi per baris fakta (kategori & rekomendasi diambil dari insight)"""
+        keys = {'kategori': kategori[positions], 'bulan': bulan, 'rekomendasi': rekomendasi[positions]}
+        keys.update(dims)
+        return [pd.Series(values, index=frame.index, name=name)
+                for name, values in keys.items() if values is not None]
+    
+    # Fakta barang: snapshot per barang (tanpa bulan)
+    grouped = insight_df.groupby(['kategori', 'rekomendasi'], observed=True)
+    item_facts = pd.DataFrame({
+        'jumlah_items': grouped['kelayakan'].count(),
+        'sum_kelayakan': grouped['kelayakan'].sum(),
+        'sum_maintenance_ratio': grouped['maintenance_ratio'].sum(),
+        'min_kelayakan': grouped['kelayakan'].min(),
+        'max_kelayakan': grouped['kelayakan'].max(),
+    }).reset_index()
+    
+    # Fakta penyewaan: dari cube barang x periode (bukan history mentah)
+    rentals = rental_cube[items.get_indexer(rental_cube['kode_barang']) >= 0] if not rental_cube.empty else rental_cube
+    rental_facts = pd.DataFrame()
+    if not rentals.empty:
+        positions = items.get_indexer(rentals['kode_barang'])
+        # Pendapatan tercatat dari cube (measure yang sama dengan get_revenue_by_category tanpa cube)
+        values = pd.DataFrame({
+            'freq_sewa': rentals['freq_sewa'],
+            'hari_sewa': rentals['total_hari_sewa'],
+            'pendapatan': rentals['pendapatan'] if 'pendapatan' in rentals.columns else 0.0,
+        }, index=rentals.index)
+        bulan = rentals['tanggal_sewa'].dt.to_period('M').dt.start_time
+        rental_facts = values.groupby(facts(positions, rentals, bulan), observed=True, dropna=False).sum().reset_index()
+    
+    # Fakta maintenance: per event
+    maintenance = maintenance_df
+    if not maintenance.empty and 'kode_barang' in maintenance.columns:
+        maintenance = maintenance[items.get_indexer(maintenance['kode_barang']) >= 0]
+    maintenance_facts = pd.DataFrame()
+    if not maintenance.empty and 'kode_barang' in maintenance.columns:
+        positions = items.get_indexer(maintenance['kode_barang'])
+        bulan = None
+        if 'tanggal_maintenance' in maintenance.columns:
+            bulan = pd.to_datetime(maintenance['tanggal_maintenance'], errors='coerce').dt.to_period('M').dt.start_time
+        dims = {col: maintenance[col].to_numpy() if col in maintenance.columns else np.full(len(maintenance), np.nan)
+                for col in ['severity', 'jenis_maintenance']}
+        counted = (maintenance['id_maintenance'].notna() if 'id_maintenance' in maintenance.columns
+                   else pd.Series(True, index=maintenance.index))
+        values = pd.DataFrame({'jumlah_maintenance': counted.astype('int64'), 'events': 1}, index=maintenance.index)
+        maintenance_facts = values.groupby(facts(positions, maintenance, bulan, **dims),
+                                           observed=True, dropna=False).sum().reset_index()
+    
+    cube = pd.concat([item_facts, rental_facts, maintenance_facts], ignore_index=True)
+    cube = cube.reindex(columns=CUBE_DIMENSIONS + CUBE_SUM_MEASURES + list(CUBE_MIN_MAX_MEASURES))
+    cube[CUBE_SUM_MEASURES] = cube[CUBE_SUM_MEASURES].fillna(0)
+    counts = ['jumlah_items', 'freq_sewa', 'hari_sewa', 'jumlah_maintenance', 'events']
+    cube[counts] = cube[counts].astype('int64')
+    for col in ['kategori', 'rekomendasi', 'severity', 'jenis_maintenance']:
+        cube[col] = cube[col].astype('category')
+    cube['bulan'] = pd.to_datetime(cube['bulan'])
+    
+    return cube
+
+
+def rollup_cube(cube: pd.DataFrame, by: List[str], where: Dict[str, Sequence] = None) -> pd.DataFrame:
+    """
+    Rollup cube dashboard ke dimensi `by` (measure sum / min / max).
+    where: filter opsional {dimensi: nilai yang dipakai}, mis. {'kategori': ['tenda']}.
+    Baris dengan dimensi `by` kosong (mis. fakta barang saat by=['bulan']) tidak ikut.
+    """
+    if where:
+        mask = np.ones(len(cube), dtype=bool)
+        for dim, values in where.items():
+            mask &= cube[dim].isin(values).to_numpy()
+        cube = cube[mask]
+    
+    grouped = cube.groupby(by, observed=True)
+    result = grouped[CUBE_SUM_MEASURES].sum()
+    for col, func in CUBE_MIN_MAX_MEASURES.items():
+        result[col] = grouped[col].agg(func)
+    
+    return result.reset_index()
+
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_maintenance_mix(cube: pd.DataFrame, categories: Sequence = None) -> pd.DataFrame:
+    """Jumlah event maintenance per bulan x jenis_maintenance (rollup cube dashboard)"""
+    if cube.empty:
+        return pd.DataFrame()
+    
+    mix = rollup_cube(cube, ['bulan', 'jenis_maintenance'],
+                      {'kategori': categories} if categories is not None else None)
+    mix = mix[mix['events'] > 0]
+    return mix[['bulan', 'jenis_maintenance', 'events']].reset_index(drop=True)
+
+
+def cube_category_stats(cube: pd.DataFrame, categories: Sequence = None) -> pd.DataFrame:
+    """Statistik per kategori seperti aggregate_categories, dijawab dari cube dashboard"""
+    stats = rollup_cube(cube, ['kategori'], {'kategori': categories} if categories is not None else None)
+    stats = stats[stats['jumlah_items'] > 0]
+    
+    return pd.DataFrame({
+        'kategori': stats['kategori'],
+        'avg_kelayakan': stats['sum_kelayakan'] / stats['jumlah_items'],
+        'min_kelayakan': stats['min_kelayakan'],
+        'max_kelayakan': stats['max_kelayakan'],
+        'jumlah_items': stats['jumlah_items'],
+        'total_sewa': stats['freq_sewa'],
+        'total_maintenance': stats['jumlah_maintenance'],
+        'avg_maintenance_ratio': stats['sum_maintenance_ratio'] / stats['jumlah_items'],
+    }).reset_index(drop=True)
+
+
+# Kolom hasil calculate_equipment_feasibility
+FEASIBILITY_COLUMNS = [
+    'kode_barang', 'nama_barang', 'kategori', 
+    'freq_sewa', 'total_hari_sewa', 'jumlah_maintenance', 
+    'maintenance_ratio',
+    'kelayakan', 'rekomendasi'
+]
+
+
+def feasibility_score(umur_hari, freq_sewa, total_hari_sewa, jumlah_maintenance,
+                      params: ScoringParams = DEFAULT_SCORING):
+    """
+    Rumus kelayakan (0-100). Berlaku untuk Series maupun array numpy
+    (mis. matriks barang x tanggal pada calculate_feasibility_history,
+    atau policy x barang pada evaluate_scoring_policies).
+    """
+    # Hitung impact dari maintenance (default: setiap maintenance = -0.2%)
+    maintenance_impact = jumlah_maintenance * -params.maintenance_rate
+    
+    # PERHITUNGAN KELAYAKAN
+    # Mulai dari 100%
+    kelayakan = 100.0
+    
+    # Degradasi dari umur (default: 0.01% per hari, max 20%)
+    kelayakan = kelayakan - np.minimum(umur_hari * params.age_rate, params.age_cap)
+    
+    # Degradasi dari frekuensi sewa (default: 0.5% per sewa, max 30%)
+    kelayakan = kelayakan - np.minimum(freq_sewa * params.rental_rate, params.rental_cap)
+    
+    # Degradasi dari total hari sewa (default: 0.05% per hari, max 20%)
+    kelayakan = kelayakan - np.minimum(total_hari_sewa * params.rental_day_rate, params.rental_day_cap)
+    
+    # Degradasi dari maintenance (default: 0.2% per event, max 15%)
+    kelayakan = kelayakan + np.maximum(maintenance_impact, -params.maintenance_cap)
+    
+    # Pastikan kelayakan dalam range 0-100
+    return np.clip(kelayakan, 0, 100)
+
+
+def score_feasibility(insight: pd.DataFrame, params: ScoringParams = DEFAULT_SCORING) -> pd.DataFrame:
+    """
+    Hitung kelayakan, maintenance_ratio dan rekomendasi dari kolom umur_hari,
+    freq_sewa, total_hari_sewa dan jumlah_maintenance (in-place).
+    Dipakai oleh perhitungan penuh maupun update inkremental.
+    """
+    insight['kelayakan'] = feasibility_score(
+        insight['umur_hari'], insight['freq_sewa'],
+        insight['total_hari_sewa'], insight['jumlah_maintenance'], params
+    )
+    
+    # Hitung maintenance ratio
+    insight['maintenance_ratio'] = 0.0
+    mask = insight['freq_sewa'] > 0
+    insight.loc[mask, 'maintenance_ratio'] = insight.loc[mask, 'jumlah_maintenance'] / insight.loc[mask, 'freq_sewa']
+    
+    # Tentukan rekomendasi berdasarkan kelayakan (vectorized, categorical)
+    insight['rekomendasi'] = classify_recommendation(insight['kelayakan'])
+    
+    return insight
+
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
 def calculate_equipment_feasibility(katalog_df: pd.DataFrame, penyewaan_df: pd.DataFrame, 
-                                   maintenance_df: pd.DataFrame, reference_date: pd.Timestamp = None) -> pd.DataFrame:
+                                   maintenance_df: pd.DataFrame, reference_date: pd.Timestamp = None,
+                                   rental_agg: pd.DataFrame = None,
+                                   maintenance_agg: pd.DataFrame = None,
+                                   params: ScoringParams = DEFAULT_SCORING) -> pd.DataFrame:
     """
     Menghitung kelayakan alat secara otomatis berdasarkan:
     - Umur barang (sejak pembelian)
@@ -167,7 +749,10 @@ def calculate_equipment_feasibility(katalog_df: pd.DataFrame, penyewaan_df: pd.D
     - Riwayat maintenance dan severity
     - Recovery dari maintenance
     
-    Kelayakan dimulai dari 100% dan berkurang seiring penggunaan
+    Kelayakan dimulai dari 100% dan berkurang seiring penggunaan.
+    rental_agg / maintenance_agg opsional: agregat per barang yang sudah
+    dihitung (mis. dari ingest inkremental), sehingga groupby dilewati.
+    params: konstanta degradasi (default DEFAULT_SCORING).
     """
     if katalog_df.empty:
         return pd.DataFrame()
@@ -182,27 +767,10 @@ def calculate_equipment_feasibility(katalog_df: pd.DataFrame, penyewaan_df: pd.D
     insight['umur_hari'] = (reference_date - insight['tanggal_pembelian']).dt.days
     
     # Agregasi data penyewaan per barang
-    if not penyewaan_df.empty and 'kode_barang' in penyewaan_df.columns:
-        # Cari kolom ID yang tersedia untuk counting
-        id_col = None
-        for col in ['id_penyewaan', 'no', 'id']:
-            if col in penyewaan_df.columns:
-                id_col = col
-                break
-        
-        if id_col:
-            rental_agg = penyewaan_df.groupby('kode_barang').agg({
-                id_col: 'count',  # frekuensi sewa
-                'durasi_sewa': 'sum'  # total hari sewa
-            }).reset_index()
-            rental_agg.columns = ['kode_barang', 'freq_sewa', 'total_hari_sewa']
-        else:
-            # Fallback: hitung dengan size()
-            rental_agg = penyewaan_df.groupby('kode_barang').agg({
-                'durasi_sewa': ['count', 'sum']
-            }).reset_index()
-            rental_agg.columns = ['kode_barang', 'freq_sewa', 'total_hari_sewa']
-        
+    if rental_agg is None:
+        rental_agg = aggregate_rentals(penyewaan_df)
+    
+    if not rental_agg.empty:
         insight = insight.merge(rental_agg, on='kode_barang', how='left')
     else:
         insight['freq_sewa'] = 0
@@ -213,66 +781,232 @@ def calculate_equipment_feasibility(katalog_df: pd.DataFrame, penyewaan_df: pd.D
     insight['total_hari_sewa'] = insight['total_hari_sewa'].fillna(0)
     
     # Agregasi data maintenance per barang
-    if not maintenance_df.empty and 'kode_barang' in maintenance_df.columns:
-        maintenance_agg = maintenance_df.groupby('kode_barang').agg({
-            'id_maintenance': 'count'
-        }).reset_index()
-        maintenance_agg.columns = ['kode_barang', 'jumlah_maintenance']
-        
+    if maintenance_agg is None:
+        maintenance_agg = aggregate_maintenance(maintenance_df)
+    # Agregat maintenance berupa cube - ringkas ke level barang
+    maintenance_agg = rollup_aggregate(maintenance_agg, ['kode_barang'], ['jumlah_maintenance'])
+    
+    if not maintenance_agg.empty:
         insight = insight.merge(maintenance_agg, on='kode_barang', how='left')
-        
-        # Hitung impact dari maintenance (setiap maintenance = -0.2%)
-        insight['maintenance_impact'] = insight['jumlah_maintenance'] * -0.2
     else:
         insight['jumlah_maintenance'] = 0
-        insight['maintenance_impact'] = 0
     
     # Fill NaN
     insight['jumlah_maintenance'] = insight['jumlah_maintenance'].fillna(0)
-    insight['maintenance_impact'] = insight['maintenance_impact'].fillna(0)
     
-    # PERHITUNGAN KELAYAKAN
-    # Mulai dari 100%
-    insight['kelayakan'] = 100.0
+    # Hitungan selalu float agar update inkremental menghasilkan dtype yang sama
+    for col in ['freq_sewa', 'total_hari_sewa', 'jumlah_maintenance']:
+        insight[col] = insight[col].astype('float64')
     
-    # Degradasi dari umur (0.01% per hari, max 20%)
-    insight['kelayakan'] -= (insight['umur_hari'] * 0.01).clip(upper=20)
+    insight = score_feasibility(insight, params)
     
-    # Degradasi dari frekuensi sewa (0.5% per sewa, max 30%)
-    insight['kelayakan'] -= (insight['freq_sewa'] * 0.5).clip(upper=30)
+    # Pilih kolom yang akan ditampilkan
+    result = insight[FEASIBILITY_COLUMNS].copy()
     
-    # Degradasi dari total hari sewa (0.05% per hari, max 20%)
-    insight['kelayakan'] -= (insight['total_hari_sewa'] * 0.05).clip(upper=20)
+    # No default sorting - maintain natural order based on kode_barang
+    # Users can sort via UI if needed
     
-    # Degradasi dari maintenance (0.2% per event, max 15%)
-    impact_clipped = insight['maintenance_impact'].clip(lower=-15)
-    insight['kelayakan'] += impact_clipped
+    return result
+
+
+def update_equipment_feasibility(insight_df: pd.DataFrame, katalog_df: pd.DataFrame,
+                                penyewaan_delta: pd.DataFrame = None,
+                                maintenance_delta: pd.DataFrame = None,
+                                reference_date: pd.Timestamp = None,
+                                params: ScoringParams = DEFAULT_SCORING) -> pd.DataFrame:
+    """
+    Update insight hanya untuk barang yang punya event baru (delta penyewaan / maintenance).
+    insight_df harus hasil calculate_equipment_feasibility atas katalog_df yang sama
+    dengan reference_date dan params yang sama; hasilnya identik dengan perhitungan ulang penuh.
+    """
+    if insight_df.empty:
+        return insight_df
     
-    # Pastikan kelayakan dalam range 0-100
-    insight['kelayakan'] = insight['kelayakan'].clip(lower=0, upper=100)
+    if reference_date is None:
+        reference_date = pd.Timestamp.now()
     
-    # Hitung maintenance ratio
-    insight['maintenance_ratio'] = 0.0
-    mask = insight['freq_sewa'] > 0
-    insight.loc[mask, 'maintenance_ratio'] = insight.loc[mask, 'jumlah_maintenance'] / insight.loc[mask, 'freq_sewa']
+    # Agregat per barang dari event baru saja
+    deltas = []
+    if penyewaan_delta is not None and not penyewaan_delta.empty:
+        deltas.append(aggregate_rentals(penyewaan_delta))
+    if maintenance_delta is not None and not maintenance_delta.empty:
+        deltas.append(rollup_aggregate(aggregate_maintenance(maintenance_delta),
+                                       ['kode_barang'], ['jumlah_maintenance']))
     
-    # Tentukan rekomendasi berdasarkan kelayakan
-    insight['rekomendasi'] = insight.apply(determine_recommendation, axis=1)
+    result = insight_df.copy()
+    if not deltas:
+        return result
+    # Lookup via hash index (isin pada kolom string arrow jauh lebih lambat)
+    changed = pd.Index(pd.concat([delta['kode_barang'] for delta in deltas])).unique()
+    affected = changed.get_indexer(result['kode_barang']) >= 0
+    if not affected.any():
+        return result
     
-    # Pilih kolom yang akan ditampilkan
-    result = insight[[
-        'kode_barang', 'nama_barang', 'kategori', 
-        'freq_sewa', 'total_hari_sewa', 'jumlah_maintenance', 
-        'maintenance_ratio',
-        'kelayakan', 'rekomendasi'
-    ]].copy()
+    rows = result.loc[affected, ['kode_barang', 'freq_sewa', 'total_hari_sewa', 'jumlah_maintenance']]
+    for delta in deltas:
+        columns = [col for col in delta.columns if col != 'kode_barang']
+        added = rows[['kode_barang']].merge(delta, on='kode_barang', how='left')[columns].fillna(0)
+        rows[columns] = rows[columns].to_numpy() + added.to_numpy(dtype='float64')
     
-    # No default sorting - maintain natural order based on kode_barang
-    # Users can sort via UI if needed
+    # Baris insight sejajar dengan baris katalog (merge left mempertahankan urutan)
+    purchase = katalog_df['tanggal_pembelian'].iloc[np.flatnonzero(affected)]
+    rows['umur_hari'] = (reference_date - purchase).dt.days.to_numpy()
+    rows = score_feasibility(rows, params)
+    
+    updated = ['freq_sewa', 'total_hari_sewa', 'jumlah_maintenance', 'maintenance_ratio', 'kelayakan', 'rekomendasi']
+    for col in updated:
+        result.loc[affected, col] = rows[col].to_numpy()
     
     return result
 
 
+# Blok barang per iterasi as-of agar matriks sementara (barang x tanggal) tetap kecil
+HISTORY_ITEM_BLOCK = 4096
+
+
+def _asof_totals(item_idx: np.ndarray, event_days: np.ndarray, weights: List[np.ndarray],
+                 n_items: int, query_days: np.ndarray) -> List[np.ndarray]:
+    """
+    Jumlah weights per barang untuk event dengan hari <= tiap query day.
+    Event di-sort sekali dengan key (barang, hari); total as-of diambil dari
+    cumsum dengan searchsorted. Returns: satu matriks (n_items x n_dates) per weights.
+    """
+    day0 = min(event_days.min(initial=query_days.min()), query_days.min())
+    span = max(event_days.max(initial=query_days.max()), query_days.max()) - day0 + 1
+    
+    keys = item_idx * span + (event_days - day0)
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    cumsums = [np.concatenate([[0.0], np.cumsum(w[order], dtype='float64')]) for w in weights]
+    
+    totals = [np.empty((n_items, len(query_days))) for _ in weights]
+    offsets = query_days - day0
+    for block in range(0, n_items, HISTORY_ITEM_BLOCK):
+        items = np.arange(block, min(block + HISTORY_ITEM_BLOCK, n_items))
+        starts = np.searchsorted(keys, items * span, side='left')
+        ends = np.searchsorted(keys, items[:, None] * span + offsets[None, :], side='right')
+        for total, cumsum in zip(totals, cumsums):
+            total[items] = cumsum[ends] - cumsum[starts][:, None]
+    
+    return totals
+
+
+def calculate_feasibility_history(katalog_df: pd.DataFrame, penyewaan_df: pd.DataFrame,
+                                  maintenance_df: pd.DataFrame, reference_dates,
+                                  params: ScoringParams = DEFAULT_SCORING) -> pd.DataFrame:
+    """
+    Kelayakan per barang untuk banyak tanggal referensi sekaligus (as-of):
+    hanya event dengan tanggal <= tanggal referensi (per hari) yang dihitung;
+    event tanpa tanggal diabaikan. Pada tanggal setelah event terakhir hasilnya
+    sama dengan calculate_equipment_feasibility(reference_date=tanggal itu).
+    Returns: DataFrame kelayakan (index kode_barang, kolom tanggal referensi)
+    """
+    dates = pd.DatetimeIndex(reference_dates)
+    if katalog_df.empty or len(dates) == 0:
+        return pd.DataFrame()
+    
+    kode = katalog_df['kode_barang']
+    item_codes, items = pd.factorize(kode)
+    items = pd.Index(items)
+    query_days = dates.to_numpy(dtype='datetime64[D]').astype('int64')
+    
+    def event_totals(df: pd.DataFrame, date_col: str,
+                     weights: Callable[[pd.DataFrame], List[np.ndarray]], n_weights: int) -> List[np.ndarray]:
+        if df.empty or date_col not in df.columns or 'kode_barang' not in df.columns:
+            return [np.zeros((len(items), len(dates))) for _ in range(n_weights)]
+        item_idx = items.get_indexer(df['kode_barang'])
+        event_dates = df[date_col].to_numpy(dtype='datetime64[D]')
+        valid = (item_idx >= 0) & ~np.isnat(event_dates)
+        return _asof_totals(item_idx[valid], event_dates[valid].astype('int64'),
+                            [w[valid] for w in weights(df)], len(items), query_days)
+    
+    freq, hari = event_totals(penyewaan_df, 'tanggal_sewa', lambda df: list(_rental_weights(df)), 2)
+    jumlah_maintenance, = event_totals(maintenance_df, 'tanggal_maintenance',
+                                       lambda df: [df['id_maintenance'].notna().to_numpy()], 1)
+    
+    # Umur dalam hari per barang x tanggal (NaT pembelian -> NaN, seperti .dt.days)
+    purchase = katalog_df['tanggal_pembelian'].to_numpy(dtype='datetime64[ns]')
+    age = dates.to_numpy(dtype='datetime64[ns]')[None, :] - purchase[:, None]
+    umur_hari = np.where(np.isnat(age), np.nan, age // np.timedelta64(1, 'D'))
+    
+    # Baris katalog dengan kode sama mendapat hitungan yang sama (seperti merge per barang)
+    kelayakan = feasibility_score(umur_hari, freq[item_codes], hari[item_codes],
+                                  jumlah_maintenance[item_codes], params)
+    
+    return pd.DataFrame(kelayakan, index=pd.Index(kode.to_numpy(), name='kode_barang'), columns=dates)
+
+
+def get_fleet_health_trend(kelayakan_history: pd.DataFrame) -> pd.DataFrame:
+    """Ringkasan kesehatan armada per tanggal dari calculate_feasibility_history"""
+    if kelayakan_history.empty:
+        return pd.DataFrame()
+    
+    values = kelayakan_history.to_numpy()
+    trend = pd.DataFrame({
+        'tanggal': kelayakan_history.columns,
+        'avg_kelayakan': np.nanmean(values, axis=0),
+    })
+    
+    # Jumlah barang per label rekomendasi di tiap tanggal
+    codes = classify_by_thresholds(values.ravel(), RECOMMENDATION_THRESHOLDS, RECOMMENDATION_LABELS).codes
+    codes = codes.reshape(values.shape)
+    for idx, label in enumerate(RECOMMENDATION_LABELS):
+        trend[label] = (codes == idx).sum(axis=0)
+    
+    return trend
+
+
+# Kolom fitur per barang yang menjadi input rumus kelayakan
+FEATURE_COLUMNS = ['umur_hari', 'freq_sewa', 'total_hari_sewa', 'jumlah_maintenance']
+
+
+def build_feature_matrix(katalog_df: pd.DataFrame, insight_df: pd.DataFrame,
+                         reference_date: pd.Timestamp = None) -> pd.DataFrame:
+    """
+    Fitur per barang (FEATURE_COLUMNS) dari insight hasil calculate_equipment_feasibility
+    atas katalog_df yang sama - input evaluate_scoring_policies.
+    """
+    if insight_df.empty:
+        return pd.DataFrame(columns=['kode_barang'] + FEATURE_COLUMNS)
+    
+    if reference_date is None:
+        reference_date = pd.Timestamp.now()
+    
+    features = insight_df[['kode_barang', 'freq_sewa', 'total_hari_sewa', 'jumlah_maintenance']].copy()
+    # Baris insight sejajar dengan baris katalog (merge left mempertahankan urutan)
+    features['umur_hari'] = (reference_date - katalog_df['tanggal_pembelian']).dt.days.to_numpy()
+    
+    return features[['kode_barang'] + FEATURE_COLUMNS]
+
+
+def score_policies(features: pd.DataFrame, policies: Sequence[ScoringParams]) -> np.ndarray:
+    """
+    Kelayakan untuk banyak policy sekaligus via broadcasting.
+    Returns: array (jumlah policy x jumlah barang)
+    """
+    # Satu kolom per policy: setiap field menjadi array (n_policy, 1)
+    params = ScoringParams(*(np.asarray(values, dtype=float)[:, None] for values in zip(*policies)))
+    columns = [features[col].to_numpy(dtype=float)[None, :] for col in FEATURE_COLUMNS]
+    return feasibility_score(*columns, params)
+
+
+def evaluate_scoring_policies(features: pd.DataFrame, policies: Sequence[ScoringParams]) -> pd.DataFrame:
+    """Ringkasan per policy: rata-rata kelayakan dan jumlah barang per label rekomendasi"""
+    if features.empty or len(policies) == 0:
+        return pd.DataFrame()
+    
+    kelayakan = score_policies(features, policies)
+    
+    summary = pd.DataFrame(list(policies), columns=ScoringParams._fields)
+    summary['avg_kelayakan'] = np.nanmean(kelayakan, axis=1)
+    codes = classify_by_thresholds(kelayakan.ravel(), RECOMMENDATION_THRESHOLDS, RECOMMENDATION_LABELS).codes
+    codes = codes.reshape(kelayakan.shape)
+    for idx, label in enumerate(RECOMMENDATION_LABELS):
+        summary[label] = (codes == idx).sum(axis=1)
+    
+    return summary
+
+
 def calculate_maintenance_impact(maintenance_group: pd.DataFrame) -> float:
     """
     Hitung impact dari maintenance
@@ -291,38 +1025,26 @@ def calculate_maintenance_impact(maintenance_group: pd.DataFrame) -> float:
 def determine_recommendation(row: pd.Series) -> str:
     """
     Tentukan rekomendasi berdasarkan persentase kelayakan saja
-    Lebih simpel dan konsisten
+    Lebih simpel dan konsisten. Versi per baris dari classify_recommendation
     """
-    kelayakan = row['kelayakan']
-    
-    # Kategori berdasarkan threshold kelayakan
-    if kelayakan >= 85:
-        return 'KONDISI SANGAT BAIK'
-    elif kelayakan >= 70:
-        return 'LAYAK OPERASIONAL'
-    elif kelayakan >= 40:
-        return 'TINGKATKAN PEMELIHARAAN'
-    else:
-        return 'PERLU PERHATIAN KHUSUS'
+    return classify_by_thresholds([row['kelayakan']], RECOMMENDATION_THRESHOLDS, RECOMMENDATION_LABELS)[0]
 
 
-@st.cache_data
-def get_category_performance(insight_df: pd.DataFrame) -> pd.DataFrame:
-    """Get performance metrics per category"""
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_category_performance(insight_df: pd.DataFrame, cube: pd.DataFrame = None,
+                             categories: Sequence = None) -> pd.DataFrame:
+    """
+    Get performance metrics per category
+    cube: cube dashboard (build_dashboard_cube) untuk insight_df yang sama - jika ada,
+    statistik dijawab dari rollup cube; categories membatasi kategori seperti filter halaman
+    """
     if insight_df.empty:
         return pd.DataFrame()
     
-    category_stats = insight_df.groupby('kategori').agg({
-        'kelayakan': ['mean', 'min', 'max', 'count'],
-        'freq_sewa': 'sum',
-        'jumlah_maintenance': 'sum',
-        'maintenance_ratio': 'mean'
-    }).reset_index()
-    
-    category_stats.columns = [
-        'kategori', 'avg_kelayakan', 'min_kelayakan', 'max_kelayakan', 
-        'jumlah_items', 'total_sewa', 'total_maintenance', 'avg_maintenance_ratio'
-    ]
+    if cube is not None and not cube.empty:
+        category_stats = cube_category_stats(cube, categories)
+    else:
+        category_stats = aggregate_categories(insight_df)
     
     # Calculate ROI indicator (freq_sewa / jumlah_maintenance)
     category_stats['roi_indicator'] = 0.0
@@ -337,71 +1059,139 @@ def get_category_performance(insight_df: pd.DataFrame) -> pd.DataFrame:
     return category_stats
 
 
-@st.cache_data
-def get_strategic_insights(insight_df: pd.DataFrame) -> dict:
-    """Generate strategic insights and recommendations"""
+# Ukuran list top-k dan batas "beban maintenance tinggi" di ringkasan insight
+SUMMARY_TOP_N = 5
+INVESTMENT_PRIORITY_N = 10
+HIGH_MAINTENANCE_RATIO = 0.3
+
+
+def top_k_positions(values, k: int) -> np.ndarray:
+    """
+    Posisi k nilai terbesar, urut menurun (tie: posisi lebih awal dulu). Jika nilai valid
+    kurang dari k, posisi NaN menyusul sesuai urutan - sama dengan DataFrame.nlargest(keep='first'),
+    tapi pakai partial selection O(n) sehingga hanya k kandidat yang diurutkan.
+    """
+    values = np.asarray(values, dtype=float)
+    nan = np.isnan(values)
+    valid = np.flatnonzero(~nan)
+    k = min(k, len(values))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= len(valid):
+        order = np.lexsort((valid, -values[valid]))
+        return np.concatenate([valid[order], np.flatnonzero(nan)[:k - len(valid)]])
+    
+    v = values[valid]
+    # Nilai terbesar ke-k: yang lebih besar pasti masuk, tie di batas diambil dari posisi awal
+    kth = np.partition(v, len(v) - k)[len(v) - k]
+    greater = np.flatnonzero(v > kth)
+    chosen = np.concatenate([greater, np.flatnonzero(v == kth)[:k - len(greater)]])
+    
+    order = np.lexsort((chosen, -v[chosen]))
+    return valid[chosen[order]]
+
+
+def summarize_insight(insight_df: pd.DataFrame, top_n: int = SUMMARY_TOP_N,
+                      priority_n: int = INVESTMENT_PRIORITY_N) -> dict:
+    """
+    Kernel ringkasan insight: statistik global, jumlah per threshold, median dan
+    semua list top-k dalam satu lintasan kolom (tanpa nlargest / filter copy per metrik).
+    Dipakai halaman Overview, Strategic dan Tactical, serta klasifikasi lifecycle.
+    """
     if insight_df.empty:
         return {}
     
-    insights = {}
+    kelayakan = insight_df['kelayakan'].to_numpy(dtype=float)
+    freq = insight_df['freq_sewa'].to_numpy(dtype=float)
+    ratio = insight_df['maintenance_ratio'].to_numpy(dtype=float)
+    
+    summary = {}
     
     # Overall metrics
-    insights['total_items'] = len(insight_df)
-    insights['avg_kelayakan'] = insight_df['kelayakan'].mean()
-    insights['total_sewa'] = insight_df['freq_sewa'].sum()
-    insights['avg_utilization'] = insight_df['freq_sewa'].mean()
-    insights['total_maintenance'] = insight_df['jumlah_maintenance'].sum()
+    summary['total_items'] = len(insight_df)
+    summary['avg_kelayakan'] = insight_df['kelayakan'].mean()
+    summary['total_sewa'] = insight_df['freq_sewa'].sum()
+    summary['avg_utilization'] = insight_df['freq_sewa'].mean()
+    summary['total_maintenance'] = insight_df['jumlah_maintenance'].sum()
+    
+    # Median dipakai bersama oleh threshold count, lifecycle stage dan quadrant chart
+    median_freq = insight_df['freq_sewa'].median()
+    summary['median_freq'] = median_freq
+    summary['median_maintenance_ratio'] = insight_df['maintenance_ratio'].median()
+    
+    # Status distribution - classifier yang sama dengan kolom rekomendasi
+    status_counts = classify_recommendation(insight_df['kelayakan']).value_counts()
+    summary['status_dist'] = status_counts[status_counts > 0].to_dict()
     
-    # Status distribution
-    insights['status_dist'] = insight_df['rekomendasi'].value_counts().to_dict()
+    # Critical items count (kelayakan < 40) dan warning (40-70)
+    summary['critical_count'] = int(np.count_nonzero(kelayakan < 40))
+    summary['warning_count'] = int(np.count_nonzero((kelayakan >= 40) & (kelayakan < 70)))
+    summary['high_maintenance_count'] = int(np.count_nonzero(ratio > HIGH_MAINTENANCE_RATIO))
+    summary['underutilized_count'] = int(np.count_nonzero(freq < median_freq))
     
-    # Critical items count
-    insights['critical_count'] = len(insight_df[insight_df['kelayakan'] < 40])
-    insights['warning_count'] = len(insight_df[(insight_df['kelayakan'] >= 40) & (insight_df['kelayakan'] < 70)])
+    def records(positions: np.ndarray, columns: List[str]) -> List[dict]:
+        return insight_df.iloc[positions][columns].to_dict('records')
     
     # Top performers
-    insights['top_performers'] = insight_df.nlargest(5, 'freq_sewa')[['kode_barang', 'nama_barang', 'freq_sewa', 'kelayakan']].to_dict('records')
+    summary['top_performers'] = records(top_k_positions(freq, top_n),
+                                        ['kode_barang', 'nama_barang', 'freq_sewa', 'kelayakan'])
     
     # High maintenance burden
-    insights['high_maintenance'] = insight_df.nlargest(5, 'maintenance_ratio')[['kode_barang', 'nama_barang', 'maintenance_ratio', 'jumlah_maintenance']].to_dict('records')
+    summary['high_maintenance'] = records(top_k_positions(ratio, top_n),
+                                          ['kode_barang', 'nama_barang', 'maintenance_ratio', 'jumlah_maintenance'])
     
-    # Investment priorities (high freq_sewa but declining kelayakan)
-    investment_priority = insight_df[
-        (insight_df['freq_sewa'] > insight_df['freq_sewa'].median()) & 
-        (insight_df['kelayakan'] < 70)
-    ].nlargest(10, 'freq_sewa')
-    insights['investment_priority'] = investment_priority[['kode_barang', 'nama_barang', 'freq_sewa', 'kelayakan']].to_dict('records')
+    # Investment priorities (high freq_sewa but declining kelayakan) - hanya baris yang memenuhi kriteria
+    candidates = np.flatnonzero((freq > median_freq) & (kelayakan < 70))
+    summary['investment_priority'] = records(candidates[top_k_positions(freq[candidates], priority_n)],
+                                             ['kode_barang', 'nama_barang', 'freq_sewa', 'kelayakan'])
     
-    return insights
+    return summary
+
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def get_strategic_insights(insight_df: pd.DataFrame) -> dict:
+    """Generate strategic insights and recommendations (lihat summarize_insight)"""
+    return summarize_insight(insight_df)
 
 
-@st.cache_data  
-def classify_lifecycle_stage(insight_df: pd.DataFrame) -> pd.DataFrame:
-    """Classify each item into lifecycle stage"""
+# Label lifecycle stage sesuai urutan prioritas klasifikasi
+LIFECYCLE_STAGES = [
+    'PRIME - Kondisi Optimal',
+    'ACTIVE - Produktif',
+    'UNDERUTILIZED - Kurang Digunakan',
+    'AGING - Perlu Perhatian',
+    'MAINTENANCE HEAVY - Beban Tinggi',
+    'END OF LIFE - Pertimbangkan Penggantian'
+]
+
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def classify_lifecycle_stage(insight_df: pd.DataFrame, summary: Dict = None) -> pd.DataFrame:
+    """
+    Classify each item into lifecycle stage
+    summary: hasil get_strategic_insights untuk insight_df yang sama (median dipakai ulang)
+    """
     if insight_df.empty:
         return pd.DataFrame()
     
     result = insight_df.copy()
     
-    def determine_stage(row):
-        kelayakan = row['kelayakan']
-        freq = row['freq_sewa']
-        ratio = row['maintenance_ratio']
-        
-        # Stage classification
-        if kelayakan >= 85 and freq > 0:
-            return 'PRIME - Kondisi Optimal'
-        elif kelayakan >= 70 and freq >= insight_df['freq_sewa'].median():
-            return 'ACTIVE - Produktif'
-        elif kelayakan >= 70 and freq < insight_df['freq_sewa'].median():
-            return 'UNDERUTILIZED - Kurang Digunakan'
-        elif kelayakan >= 40 and ratio < 0.5:
-            return 'AGING - Perlu Perhatian'
-        elif kelayakan >= 40 and ratio >= 0.5:
-            return 'MAINTENANCE HEAVY - Beban Tinggi'
-        else:
-            return 'END OF LIFE - Pertimbangkan Penggantian'
-    
-    result['lifecycle_stage'] = result.apply(determine_stage, axis=1)
+    kelayakan = result['kelayakan'].to_numpy(dtype=float)
+    freq = result['freq_sewa'].to_numpy(dtype=float)
+    ratio = result['maintenance_ratio'].to_numpy(dtype=float)
+    # Median cukup dihitung sekali untuk seluruh katalog
+    median_freq = summary['median_freq'] if summary else insight_df['freq_sewa'].median()
+    
+    # Stage classification - kondisi pertama yang terpenuhi menentukan stage
+    conditions = [
+        (kelayakan >= 85) & (freq > 0),
+        (kelayakan >= 70) & (freq >= median_freq),
+        (kelayakan >= 70) & (freq < median_freq),
+        (kelayakan >= 40) & (ratio < 0.5),
+        (kelayakan >= 40) & (ratio >= 0.5),
+    ]
+    codes = np.select(conditions, list(range(len(conditions))), default=len(conditions))
+    
+    result['lifecycle_stage'] = pd.Categorical.from_codes(codes, categories=LIFECYCLE_STAGES)
     
     return result
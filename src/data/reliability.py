@@ -0,0 +1,233 @@
+"""
+Reliability Analytics
+Interval antar maintenance per barang: MTBF, sebaran interval, jumlah sewa di
+antara dua maintenance, dan kurva survival Kaplan-Meier per kategori.
+Event maintenance di-sort sekali per (barang, tanggal); semua langkah berikutnya
+vectorized di atas array terurut itu.
+"""
+from typing import NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.occupancy import RentalIntervals, _day_number, _day_numbers
+
+
+class MaintenanceEvents(NamedTuple):
+    """Event maintenance terurut per barang lalu tanggal; item = posisi barang di katalog"""
+    item: np.ndarray
+    day: np.ndarray
+
+
+def build_maintenance_events(maintenance_df: pd.DataFrame, katalog_df: pd.DataFrame,
+                             until=None) -> MaintenanceEvents:
+    """
+    Event maintenance per barang katalog, terurut (barang, tanggal).
+    Baris tanpa tanggal, di luar katalog, atau setelah `until` dilewati.
+    Beberapa baris barang yang sama di hari yang sama dihitung satu event, agar
+    tidak menjadi interval 0 hari yang menurunkan MTBF.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if (maintenance_df.empty or katalog_df.empty
+            or not {'kode_barang', 'tanggal_maintenance'} <= set(maintenance_df.columns)):
+        return MaintenanceEvents(empty, empty)
+    
+    item = pd.Index(katalog_df['kode_barang']).get_indexer(maintenance_df['kode_barang'])
+    day, missing = _day_numbers(maintenance_df['tanggal_maintenance'])
+    valid = (item >= 0) & ~missing
+    if until is not None:
+        valid &= day <= _day_number(until)
+    item, day = item[valid].astype(np.int64), day[valid]
+    if not len(item):
+        return MaintenanceEvents(empty, empty)
+    
+    # Satu sort + dedup atas key (barang, hari) yang dikodekan dalam satu integer
+    first = int(day.min())
+    span = int(day.max()) - first + 1
+    item, day = np.divmod(np.unique(item * span + day - first), span)
+    return MaintenanceEvents(item, day + first)
+
+
+def _rentals_per_interval(events: MaintenanceEvents, rentals: RentalIntervals) -> np.ndarray:
+    """
+    Jumlah sewa yang dimulai di antara event i dan event berikutnya barang yang sama
+    (indeks = posisi event awal; sewa sebelum event pertama / setelah event terakhir tidak dihitung)
+    """
+    n_events = len(events.item)
+    if not n_events or not len(rentals.item):
+        return np.zeros(n_events, dtype=np.int64)
+    
+    first = min(int(events.day.min()), int(rentals.start.min()))
+    span = max(int(events.day.max()), int(rentals.start.max())) - first + 1
+    event_keys = events.item * span + events.day - first
+    # Event terakhir pada atau sebelum hari mulai sewa (event di hari yang sama mendahului sewa)
+    pos = np.searchsorted(event_keys, rentals.item * span + rentals.start - first, side='right') - 1
+    
+    closed = np.append(events.item[1:] == events.item[:-1], False)
+    inside = (pos >= 0) & (events.item[np.maximum(pos, 0)] == rentals.item)
+    inside &= closed[np.maximum(pos, 0)]
+    return np.bincount(pos[inside], minlength=n_events)
+
+
+def maintenance_intervals(events: MaintenanceEvents, katalog_df: pd.DataFrame,
+                          rentals: RentalIntervals = None) -> pd.DataFrame:
+    """
+    Satu baris per interval antar dua maintenance berurutan pada barang yang sama.
+    Returns: kode_barang, kategori, mulai, selesai, interval_hari, sewa_di_antara
+    """
+    columns = ['kode_barang', 'kategori', 'mulai', 'selesai', 'interval_hari', 'sewa_di_antara']
+    start_idx = np.flatnonzero(events.item[1:] == events.item[:-1])
+    if not len(start_idx):
+        return pd.DataFrame(columns=columns)
+    
+    item = events.item[start_idx]
+    start, end = events.day[start_idx], events.day[start_idx + 1]
+    if rentals is None:
+        rentals = RentalIntervals(*(np.empty(0, dtype=np.int64),) * 3)
+    between = _rentals_per_interval(events, rentals)[start_idx]
+    
+    return pd.DataFrame({
+        'kode_barang': katalog_df['kode_barang'].to_numpy()[item],
+        'kategori': katalog_df['kategori'].to_numpy()[item] if 'kategori' in katalog_df else None,
+        'mulai': start.astype('datetime64[D]').astype('datetime64[ns]'),
+        'selesai': end.astype('datetime64[D]').astype('datetime64[ns]'),
+        'interval_hari': end - start,
+        'sewa_di_antara': between,
+    })[columns]
+
+
+def item_reliability(events: MaintenanceEvents, katalog_df: pd.DataFrame, as_of,
+                     rentals: RentalIntervals = None) -> pd.DataFrame:
+    """
+    Ringkasan reliability per barang katalog.
+    Returns: kode_barang, jumlah_maintenance (event = hari dengan maintenance), jumlah_interval,
+    mtbf_hari (rata-rata interval), interval_terpendek, interval_terpanjang, hari_sejak_maintenance,
+    sewa_antar_maintenance (rata-rata sewa per interval). Barang dengan < 2 maintenance mendapat
+    NaN pada statistik interval.
+    """
+    n_items = len(katalog_df)
+    if rentals is None:
+        rentals = RentalIntervals(*(np.empty(0, dtype=np.int64),) * 3)
+    
+    jumlah = np.bincount(events.item, minlength=n_items)
+    start_idx = np.flatnonzero(events.item[1:] == events.item[:-1])
+    gap = (events.day[start_idx + 1] - events.day[start_idx]).astype(np.float64)
+    gap_item = events.item[start_idx]
+    between = _rentals_per_interval(events, rentals)[start_idx]
+    
+    n_interval = np.bincount(gap_item, minlength=n_items)
+    has_interval = n_interval > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mtbf = np.bincount(gap_item, weights=gap, minlength=n_items) / n_interval
+        sewa = np.bincount(gap_item, weights=between, minlength=n_items) / n_interval
+    
+    # Interval sudah terkelompok per barang (event terurut), jadi cukup reduceat per segmen
+    shortest = np.full(n_items, np.nan)
+    longest = np.full(n_items, np.nan)
+    if len(gap_item):
+        seg = np.flatnonzero(np.append(True, gap_item[1:] != gap_item[:-1]))
+        shortest[gap_item[seg]] = np.minimum.reduceat(gap, seg)
+        longest[gap_item[seg]] = np.maximum.reduceat(gap, seg)
+    
+    since = np.full(n_items, np.nan)
+    if len(events.item):
+        last = np.append(events.item[1:] != events.item[:-1], True)
+        since[events.item[last]] = _day_number(as_of) - events.day[last]
+    
+    return pd.DataFrame({
+        'kode_barang': katalog_df['kode_barang'].to_numpy(),
+        'jumlah_maintenance': jumlah,
+        'jumlah_interval': n_interval,
+        'mtbf_hari': np.where(has_interval, mtbf, np.nan),
+        'interval_terpendek': shortest,
+        'interval_terpanjang': longest,
+        'hari_sejak_maintenance': since,
+        'sewa_antar_maintenance': np.where(has_interval, sewa, np.nan),
+    })
+
+
+def category_reliability(intervals_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sebaran interval maintenance per kategori (input: maintenance_intervals).
+    Returns: kategori, jumlah_interval, mtbf_hari, p25_hari, median_hari, p75_hari, sewa_antar_maintenance
+    """
+    if intervals_df.empty:
+        return pd.DataFrame(columns=['kategori', 'jumlah_interval', 'mtbf_hari', 'p25_hari',
+                                     'median_hari', 'p75_hari', 'sewa_antar_maintenance'])
+    
+    grouped = intervals_df.groupby('kategori', observed=True)
+    stats = grouped.agg(
+        jumlah_interval=('interval_hari', 'size'),
+        mtbf_hari=('interval_hari', 'mean'),
+        median_hari=('interval_hari', 'median'),
+        sewa_antar_maintenance=('sewa_di_antara', 'mean'),
+    )
+    quartiles = grouped['interval_hari'].quantile([0.25, 0.75]).unstack()
+    stats['p25_hari'] = quartiles[0.25]
+    stats['p75_hari'] = quartiles[0.75]
+    
+    return stats.reset_index()[['kategori', 'jumlah_interval', 'mtbf_hari', 'p25_hari',
+                                'median_hari', 'p75_hari', 'sewa_antar_maintenance']]
+
+
+def _survival_durations(events: MaintenanceEvents, katalog_df: pd.DataFrame,
+                        as_of) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Durasi sampai maintenance berikutnya: (item, hari, event_terjadi).
+    Interval antar maintenance = teramati; sejak maintenance terakhir (atau sejak
+    pembelian bila belum pernah maintenance) sampai as_of = tersensor.
+    """
+    today = _day_number(as_of)
+    start_idx = np.flatnonzero(events.item[1:] == events.item[:-1])
+    observed_item = events.item[start_idx]
+    observed = events.day[start_idx + 1] - events.day[start_idx]
+    
+    last = np.append(events.item[1:] != events.item[:-1], True) if len(events.item) else np.empty(0, bool)
+    censored_item = events.item[last]
+    censored = today - events.day[last]
+    
+    if 'tanggal_pembelian' in katalog_df.columns:
+        purchase, missing = _day_numbers(katalog_df['tanggal_pembelian'])
+        never = (np.bincount(events.item, minlength=len(katalog_df)) == 0) & ~missing
+        censored_item = np.concatenate([censored_item, np.flatnonzero(never)])
+        censored = np.concatenate([censored, today - purchase[never]])
+    
+    item = np.concatenate([observed_item, censored_item])
+    duration = np.concatenate([observed, censored])
+    happened = np.concatenate([np.ones(len(observed), bool), np.zeros(len(censored), bool)])
+    keep = duration >= 0
+    return item[keep], duration[keep], happened[keep]
+
+
+def survival_curves(events: MaintenanceEvents, katalog_df: pd.DataFrame, as_of,
+                    by: str = 'kategori') -> pd.DataFrame:
+    """
+    Kurva survival Kaplan-Meier "belum perlu maintenance lagi setelah h hari" per grup
+    (kolom katalog `by`). Returns: <by>, hari, at_risk, maintenance, tersensor, survival
+    - satu baris per hari dengan event/sensor, diawali hari 0 dengan survival 1.
+    """
+    columns = [by, 'hari', 'at_risk', 'maintenance', 'tersensor', 'survival']
+    item, duration, happened = _survival_durations(events, katalog_df, as_of)
+    if not len(item):
+        return pd.DataFrame(columns=columns)
+    
+    durations = pd.DataFrame({
+        by: katalog_df[by].to_numpy()[item],
+        'hari': duration,
+        'maintenance': happened.astype(np.int64),
+    })
+    table = durations.groupby([by, 'hari'], observed=True, sort=True).agg(
+        maintenance=('maintenance', 'sum'), total=('maintenance', 'size')
+    ).reset_index()
+    
+    # At risk = jumlah durasi grup dikurangi yang sudah keluar sebelum hari ini
+    group = table.groupby(by, observed=True, sort=False)
+    table['at_risk'] = group['total'].transform('sum') - (group['total'].cumsum() - table['total'])
+    table['tersensor'] = table['total'] - table['maintenance']
+    table['survival'] = (1 - table['maintenance'] / table['at_risk']).groupby(
+        table[by], observed=True, sort=False).cumprod()
+    
+    origin = group['total'].sum().rename('at_risk').reset_index()
+    origin = origin.assign(hari=0, maintenance=0, tersensor=0, survival=1.0)
+    curves = pd.concat([origin[columns], table[columns]], ignore_index=True)
+    return curves.sort_values([by, 'hari'], kind='stable', ignore_index=True)
@@ -0,0 +1,257 @@
+"""
+Storage Backend Module
+Backend SQL embedded (SQLite) opsional untuk data layer.
+History CSV di-ingest per chunk ke satu file database ber-index, lalu agregasi
+berat di-push down ke SQL sehingga hanya frame hasil kecil yang dikembalikan.
+Setiap query dijawab hanya jika database berisi versi (fingerprint) yang diminta.
+"""
+import sqlite3
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+import sys
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config import SQLITE_DB_FILE
+
+
+# Nama tabel per source dan index yang dibuat setelah ingest
+TABLES = {
+    'penyewaan': 'penyewaan',
+    'maintenance': 'maintenance',
+}
+
+INDEXES = {
+    'penyewaan': ['kode_barang', 'tanggal_sewa'],
+    'maintenance': ['kode_barang', 'tanggal_maintenance'],
+}
+
+# Kolom _source_meta: versi yang ada di database beserta posisi ingest di file source
+# (byte_offset & probe = byte terakhir sebelum offset, untuk verifikasi append-only)
+META_COLUMNS = {
+    'fingerprint': 'TEXT',
+    'rows': 'INTEGER',
+    'byte_offset': 'INTEGER',
+    'probe': 'BLOB',
+}
+
+
+def get_connection(db_file: Path = None) -> sqlite3.Connection:
+    """Buka koneksi ke file database (dibuat jika belum ada)"""
+    db_file = db_file or SQLITE_DB_FILE
+    db_file.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_file, timeout=60)
+    # WAL: pembaca melihat snapshot konsisten dan tidak menahan ingest proses lain
+    conn.execute("PRAGMA journal_mode=WAL")
+    columns = ', '.join(f"{col} {sql_type}" for col, sql_type in META_COLUMNS.items())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS _source_meta (source TEXT PRIMARY KEY, {columns})")
+    # Database dari versi sebelumnya belum punya semua kolom meta
+    for col, sql_type in META_COLUMNS.items():
+        if col not in _table_columns(conn, '_source_meta'):
+            try:
+                conn.execute(f"ALTER TABLE _source_meta ADD COLUMN {col} {sql_type}")
+            except sqlite3.OperationalError:
+                # Koneksi lain (thread ingest paralel) baru saja menambahkannya
+                pass
+    return conn
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> list:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def source_state(conn: sqlite3.Connection, source: str) -> Optional[dict]:
+    """Versi source yang ada di database (kolom META_COLUMNS), None jika belum pernah di-ingest"""
+    row = conn.execute(
+        f"SELECT {', '.join(META_COLUMNS)} FROM _source_meta WHERE source = ?", (source,)
+    ).fetchone()
+    return dict(zip(META_COLUMNS, row)) if row is not None else None
+
+
+@contextmanager
+def ingest_transaction(db_file: Path = None) -> Iterator[sqlite3.Connection]:
+    """
+    Satu transaksi tulis (BEGIN IMMEDIATE): cek versi dan ingest terjadi atomik,
+    thread / proses lain yang meng-ingest menunggu sampai commit
+    """
+    with closing(get_connection(db_file)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def _sql_rows(chunk: pd.DataFrame) -> Iterable[tuple]:
+    """Baris chunk sebagai tuple nilai Python (NaN/NaT -> NULL, tanggal -> teks ISO)"""
+    values = chunk.copy()
+    for col in values.columns:
+        if pd.api.types.is_datetime64_any_dtype(values[col]):
+            values[col] = values[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+    values = values.astype(object)
+    return values.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def write_source(conn: sqlite3.Connection, source: str, chunks: Iterable[pd.DataFrame],
+                 fingerprint: Tuple, replace: bool, byte_offset: int, probe: bytes) -> None:
+    """
+    Tulis chunk ke tabel source di dalam ingest_transaction dan catat versinya.
+    replace=False: chunk adalah baris baru yang di-append ke versi yang sudah ada.
+    INSERT dilakukan sendiri (bukan DataFrame.to_sql yang commit di tengah transaksi).
+    """
+    table = TABLES[source]
+    rows = 0
+    if replace:
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    else:
+        rows = (source_state(conn, source) or {}).get('rows') or 0
+    
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if not _table_columns(conn, table):
+            conn.execute(pd.io.sql.get_schema(chunk, table))
+        columns = ', '.join(f'"{col}"' for col in chunk.columns)
+        placeholders = ', '.join('?' for _ in chunk.columns)
+        conn.executemany(f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})', _sql_rows(chunk))
+        rows += len(chunk)
+    
+    existing = _table_columns(conn, table)
+    for col in INDEXES[source]:
+        if col in existing:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}_{col}" ON "{table}" ("{col}")')
+    conn.execute(
+        "INSERT OR REPLACE INTO _source_meta (source, fingerprint, rows, byte_offset, probe) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (source, repr(fingerprint), rows, byte_offset, probe)
+    )
+
+
+@contextmanager
+def _versioned(source: str, fingerprint: Tuple, db_file: Path = None) -> Iterator[Optional[sqlite3.Connection]]:
+    """
+    Transaksi baca untuk versi `fingerprint` dari source: yield koneksi jika database
+    berisi versi itu, None jika tidak (belum di-ingest, atau sudah berisi versi lain).
+    Cek versi dan query berada dalam satu snapshot baca, jadi ingest proses lain di antaranya tidak terlihat.
+    """
+    with closing(get_connection(db_file)) as conn:
+        conn.execute("BEGIN")
+        try:
+            state = source_state(conn, source)
+            yield conn if state is not None and state['fingerprint'] == repr(fingerprint) else None
+        finally:
+            conn.rollback()
+
+
+def read_source(source: str, fingerprint: Tuple, limit: int = None,
+                db_file: Path = None) -> Optional[pd.DataFrame]:
+    """
+    Baris source versi `fingerprint` sesuai urutan file (limit: hanya baris terakhir).
+    Kolom tanggal berupa teks - dtype dipasang pemanggil. None jika versi tidak ada di database.
+    """
+    table = TABLES[source]
+    with _versioned(source, fingerprint, db_file) as conn:
+        if conn is None:
+            return None
+        if not _table_columns(conn, table):
+            return pd.DataFrame()
+        if limit is None:
+            return pd.read_sql_query(f'SELECT * FROM "{table}" ORDER BY rowid', conn)
+        
+        df = pd.read_sql_query(
+            f'SELECT * FROM (SELECT rowid AS _row, * FROM "{table}" ORDER BY rowid DESC LIMIT ?) ORDER BY _row',
+            conn,
+            params=(limit,)
+        )
+        return df.drop(columns='_row')
+
+
+def query_rental_aggregates(fingerprint: Tuple, db_file: Path = None) -> Optional[pd.DataFrame]:
+    """Agregasi penyewaan per barang (freq_sewa, total_hari_sewa) via SQL, None jika versi tidak ada"""
+    with _versioned('penyewaan', fingerprint, db_file) as conn:
+        if conn is None:
+            return None
+        columns = _table_columns(conn, TABLES['penyewaan'])
+        if 'kode_barang' not in columns:
+            return pd.DataFrame(columns=['kode_barang', 'freq_sewa', 'total_hari_sewa'])
+        
+        # Sama seperti versi pandas: hitung kolom ID pertama yang tersedia
+        id_col = next((col for col in ['id_penyewaan', 'no', 'id'] if col in columns), 'durasi_sewa')
+        return pd.read_sql_query(
+            f'''
+            SELECT kode_barang,
+                   COUNT("{id_col}") AS freq_sewa,
+                   COALESCE(SUM(durasi_sewa), 0) AS total_hari_sewa
+            FROM "{TABLES['penyewaan']}"
+            WHERE kode_barang IS NOT NULL
+            GROUP BY kode_barang
+            ''',
+            conn
+        )
+
+
+def query_rental_cube(fingerprint: Tuple, grain: str = 'D', db_file: Path = None) -> Optional[pd.DataFrame]:
+    """
+    Agregasi penyewaan per barang x hari / bulan (cube seperti processor.aggregate_rental_cube)
+    via SQL, None jika versi tidak ada
+    """
+    with _versioned('penyewaan', fingerprint, db_file) as conn:
+        if conn is None:
+            return None
+        columns = _table_columns(conn, TABLES['penyewaan'])
+        if 'kode_barang' not in columns:
+            return pd.DataFrame(columns=['kode_barang', 'tanggal_sewa', 'freq_sewa', 'total_hari_sewa',
+                                         'pendapatan'])
+        
+        id_col = next((col for col in ['id_penyewaan', 'no', 'id'] if col in columns), 'durasi_sewa')
+        period = "date(tanggal_sewa)" if grain == 'D' else "date(tanggal_sewa, 'start of month')"
+        period = period if 'tanggal_sewa' in columns else 'NULL'
+        # Pendapatan tercatat seperti processor._rental_revenue: harga_satuan (Rupiah) x jumlah
+        revenue = '0'
+        if {'harga_satuan', 'jumlah'} <= set(columns):
+            harga = "REPLACE(REPLACE(REPLACE(REPLACE(harga_satuan, 'Rp.', ''), 'RP.', ''), '.', ''), ',', '')"
+            revenue = f"CAST(TRIM({harga}) AS REAL) * jumlah"
+        cube = pd.read_sql_query(
+            f'''
+            SELECT kode_barang,
+                   {period} AS tanggal_sewa,
+                   COUNT("{id_col}") AS freq_sewa,
+                   COALESCE(SUM(durasi_sewa), 0) AS total_hari_sewa,
+                   COALESCE(SUM({revenue}), 0) AS pendapatan
+            FROM "{TABLES['penyewaan']}"
+            WHERE kode_barang IS NOT NULL
+            GROUP BY 1, 2
+            ''',
+            conn
+        )
+        cube['tanggal_sewa'] = pd.to_datetime(cube['tanggal_sewa'])
+        return cube
+
+
+def query_maintenance_aggregates(fingerprint: Tuple, db_file: Path = None) -> Optional[pd.DataFrame]:
+    """
+    Agregasi maintenance per barang x dimensi (cube seperti processor.aggregate_maintenance)
+    via SQL, None jika versi tidak ada
+    """
+    from src.data.processor import MAINTENANCE_DIMENSIONS
+    
+    with _versioned('maintenance', fingerprint, db_file) as conn:
+        if conn is None:
+            return None
+        columns = _table_columns(conn, TABLES['maintenance'])
+        if 'kode_barang' not in columns:
+            return pd.DataFrame(columns=['kode_barang', 'jumlah_maintenance', 'events'])
+        
+        keys = ', '.join(f'"{col}"' for col in ['kode_barang'] + MAINTENANCE_DIMENSIONS if col in columns)
+        return pd.read_sql_query(
+            f'''
+            SELECT {keys}, COUNT(id_maintenance) AS jumlah_maintenance, COUNT(*) AS events
+            FROM "{TABLES['maintenance']}"
+            GROUP BY {keys}
+            ''',
+            conn
+        )
@@ -0,0 +1,53 @@
+"""
+Cache Helpers
+Token versi dataset untuk key st.cache_data. Data layer memberi token murah
+(fingerprint source) pada frame yang dikembalikan, sehingga cache hit di
+processor & charts tidak perlu meng-hash seluruh isi DataFrame.
+"""
+import pickle
+import weakref
+from typing import Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+
+# id(frame) -> (weakref ke frame, token). Token hanya berlaku untuk objek yang
+# diberi token; frame turunan (filter, copy, kolom baru) di-hash dari isinya.
+_TOKENS: Dict[int, Tuple[weakref.ref, Hashable]] = {}
+
+
+def stamp_version(df: pd.DataFrame, token: Hashable) -> pd.DataFrame:
+    """
+    Tandai frame dengan token versi datanya (mis. fingerprint source).
+    Frame yang sudah diberi token tidak boleh diubah in-place.
+    """
+    key = id(df)
+    # Entry dibuang saat frame di-garbage-collect, sebelum id bisa dipakai objek lain
+    _TOKENS[key] = (weakref.ref(df, lambda _ref, key=key: _TOKENS.pop(key, None)), token)
+    return df
+
+
+def frame_version(df: pd.DataFrame) -> Optional[Hashable]:
+    """Token versi frame, atau None jika frame tidak diberi token"""
+    entry = _TOKENS.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return None
+
+
+def frame_cache_key(df: pd.DataFrame) -> Hashable:
+    """hash_funcs untuk DataFrame: token versi (O(1)) atau hash isi lengkap"""
+    version = frame_version(df)
+    if version is not None:
+        return ('version', version)
+    
+    try:
+        content = pd.util.hash_pandas_object(df).to_numpy().tobytes()
+    except TypeError:
+        # Kolom berisi objek yang tidak bisa di-hash pandas
+        content = pickle.dumps(df)
+    return ('content', df.shape, tuple(df.columns), tuple(map(str, df.dtypes)), content)
+
+
+# Dipakai sebagai @st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+FRAME_HASH_FUNCS = {pd.DataFrame: frame_cache_key}
@@ -0,0 +1,200 @@
+"""
+Synthetic Data Generator
+Generate katalog / penyewaan / maintenance dengan schema yang sama seperti
+dataset asli, pada skala yang bisa diatur (mis. 100k item, 10M penyewaan).
+Hasilnya reproducible (seed) dan menjadi dasar benchmark processor & charts.
+
+Contoh:
+    python -m src.utils.synthetic --items 100000 --rentals 10000000 --out /tmp/dataset_besar
+    DASHBOARD_DATA_DIR=/tmp/dataset_besar streamlit run app.py
+"""
+import argparse
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Proporsi kategori mengikuti dataset asli: (bobot, prefix kode, nama barang, harga sewa)
+CATEGORIES = {
+    'tidur': (0.37, 'SB', ['Sleeping Bag', 'Matras', 'Bantal Tiup'], [10000, 15000, 20000]),
+    'pendukung': (0.17, 'PD', ['Kursi Lipat', 'Meja Lipat', 'Flysheet'], [10000, 15000, 25000]),
+    'penerangan': (0.14, 'PT', ['Headlamp', 'Lampu Tenda', 'Senter'], [5000, 10000, 15000]),
+    'hiking': (0.13, 'C', ['Carrier 60L', 'Trekking Pole', 'Daypack'], [25000, 35000, 15000]),
+    'masak': (0.10, 'M', ['Kompor Portable', 'Nesting', 'Gas Kaleng'], [15000, 10000, 20000]),
+    'tenda': (0.08, 'T', ['Tenda Kap. 2', 'Tenda Kap. 4', 'Tenda Kap. 6'], [20000, 30000, 50000]),
+}
+
+CUSTOMERS = ['Ahmad', 'Budi', 'Cindy', 'Deni', 'Eka', 'Fajar', 'Gita', 'Hendra', 'Indah', 'Joko']
+JENIS_MAINTENANCE = ['Pembersihan', 'Servis Rutin', 'Perbaikan', 'Penggantian Part']
+JENIS_WEIGHTS = [0.35, 0.30, 0.22, 0.13]
+TEKNISI = ['Pak Andi', 'Pak Budi', 'Pak Deni']
+
+# Musim camping: libur sekolah (Jun-Jul) dan akhir tahun lebih ramai
+MONTH_WEIGHTS = np.array([0.8, 0.7, 0.8, 0.9, 1.0, 1.4, 1.5, 1.1, 0.9, 0.9, 1.0, 1.3])
+
+CHUNK_ROWS = 1_000_000
+
+
+def generate_katalog(n_items: int, rng: np.random.Generator,
+                     start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """Katalog dengan distribusi kategori seperti dataset asli"""
+    names = list(CATEGORIES)
+    weights = np.array([CATEGORIES[name][0] for name in names])
+    cat_idx = rng.choice(len(names), size=n_items, p=weights / weights.sum())
+    variant = rng.integers(0, 3, size=n_items)
+    
+    prefixes = np.array([CATEGORIES[name][1] for name in names])[cat_idx]
+    kode = pd.Series(prefixes) + pd.Series(np.arange(1, n_items + 1)).astype(str).str.zfill(6)
+    nama = [CATEGORIES[names[c]][2][v] for c, v in zip(cat_idx, variant)]
+    harga = np.array([CATEGORIES[names[c]][3][v] for c, v in zip(cat_idx, variant)])
+    
+    span_days = (end - start).days
+    purchase = start + pd.to_timedelta(rng.integers(0, span_days, size=n_items), unit='D')
+    
+    return pd.DataFrame({
+        'kode_barang': kode,
+        'nama_barang': nama,
+        'kategori': np.array(names)[cat_idx],
+        'keterangan': pd.Series(pd.NA, index=range(n_items), dtype='string'),
+        'tanggal_pembelian': purchase,
+        'harga_sewa': [f"Rp. {value:,.0f}".replace(',', '.') for value in harga],
+    })
+
+
+def _item_popularity(n_items: int, rng: np.random.Generator, skew: float) -> np.ndarray:
+    """Bobot popularitas Zipf-like: sedikit item sangat sering disewa, banyak yang jarang"""
+    weights = 1.0 / np.arange(1, n_items + 1) ** skew
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _event_dates(purchase: np.ndarray, end: pd.Timestamp, rng: np.random.Generator) -> np.ndarray:
+    """Tanggal event setelah tanggal pembelian, dengan bobot musiman per bulan"""
+    purchase_days = purchase.astype('datetime64[D]').astype(np.int64)
+    end_day = np.datetime64(end.date(), 'D').astype(np.int64)
+    span = np.maximum(end_day - purchase_days, 1)
+    
+    result = np.empty(len(purchase), dtype=np.int64)
+    pending = np.arange(len(purchase))
+    accept_scale = MONTH_WEIGHTS.max()
+    # Rejection sampling vectorized: ulangi hanya untuk baris yang ditolak
+    while len(pending):
+        days = purchase_days[pending] + (rng.random(len(pending)) * span[pending]).astype(np.int64)
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12
+        accepted = rng.random(len(pending)) < MONTH_WEIGHTS[months] / accept_scale
+        result[pending[accepted]] = days[accepted]
+        pending = pending[~accepted]
+    
+    return result.astype('datetime64[D]')
+
+
+def iter_penyewaan(katalog: pd.DataFrame, n_rentals: int, rng: np.random.Generator,
+                   end: pd.Timestamp, skew: float = 0.8,
+                   chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Generate riwayat penyewaan per chunk agar skala jutaan baris tetap hemat memori"""
+    popularity = _item_popularity(len(katalog), rng, skew)
+    kode = katalog['kode_barang'].to_numpy()
+    purchase = katalog['tanggal_pembelian'].to_numpy()
+    
+    # max(..., 1): tetap yield satu chunk (kosong) agar file selalu punya header
+    for offset in range(0, max(n_rentals, 1), chunk_rows):
+        size = min(chunk_rows, n_rentals - offset)
+        item_idx = rng.choice(len(katalog), size=size, p=popularity)
+        
+        yield pd.DataFrame({
+            'id_penyewaan': 'R' + pd.Series(np.arange(offset + 1, offset + size + 1)).astype(str).str.zfill(8),
+            'kode_barang': kode[item_idx],
+            'nama_pelanggan': np.array(CUSTOMERS)[rng.integers(0, len(CUSTOMERS), size=size)],
+            'tanggal_sewa': _event_dates(purchase[item_idx], end, rng),
+            'durasi_sewa': np.minimum(rng.geometric(0.3, size=size), 14),
+        })
+
+
+def iter_maintenance(katalog: pd.DataFrame, n_events: int, rng: np.random.Generator,
+                     end: pd.Timestamp, skew: float = 1.0,
+                     chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Generate riwayat maintenance per chunk; sebagian kecil item sangat sering diperbaiki"""
+    burden = _item_popularity(len(katalog), rng, skew)
+    kode = katalog['kode_barang'].to_numpy()
+    purchase = katalog['tanggal_pembelian'].to_numpy()
+    
+    for offset in range(0, max(n_events, 1), chunk_rows):
+        size = min(chunk_rows, n_events - offset)
+        item_idx = rng.choice(len(katalog), size=size, p=burden)
+        
+        yield pd.DataFrame({
+            'id_maintenance': 'M' + pd.Series(np.arange(offset + 1, offset + size + 1)).astype(str).str.zfill(7),
+            'kode_barang': kode[item_idx],
+            'tanggal_maintenance': _event_dates(purchase[item_idx], end, rng),
+            'jenis_maintenance': rng.choice(JENIS_MAINTENANCE, size=size, p=JENIS_WEIGHTS),
+            'teknisi': np.array(TEKNISI)[rng.integers(0, len(TEKNISI), size=size)],
+            'catatan': 'Maintenance',
+        })
+
+
+def generate_dataset(n_items: int = 500, n_rentals: int = 1000, n_maintenance: int = 800,
+                     seed: int = 42, start: str = '2022-01-01',
+                     end: str = '2025-12-31') -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Generate dataset lengkap di memori
+    Returns: (katalog, penyewaan, maintenance) dengan dtype seperti hasil loader
+    """
+    rng = np.random.default_rng(seed)
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+    
+    katalog = generate_katalog(n_items, rng, start_ts, end_ts)
+    katalog['kategori'] = katalog['kategori'].astype('category')
+    
+    penyewaan = pd.concat(list(iter_penyewaan(katalog, n_rentals, rng, end_ts)), ignore_index=True)
+    maintenance = pd.concat(list(iter_maintenance(katalog, n_maintenance, rng, end_ts)), ignore_index=True)
+    maintenance = maintenance.drop(columns=['teknisi'])
+    
+    for df, columns in [(penyewaan, ['kode_barang', 'nama_pelanggan']),
+                        (maintenance, ['kode_barang', 'jenis_maintenance', 'catatan'])]:
+        for col in columns:
+            df[col] = df[col].astype('category')
+    penyewaan['durasi_sewa'] = penyewaan['durasi_sewa'].astype('Int16')
+    
+    return katalog, penyewaan, maintenance
+
+
+def write_dataset(out_dir: Path, n_items: int, n_rentals: int, n_maintenance: int,
+                  seed: int = 42, start: str = '2022-01-01', end: str = '2025-12-31') -> None:
+    """Tulis katalog_barang.xlsx, riwayat_penyewaan.csv, riwayat_maintenance.csv ke out_dir"""
+    rng = np.random.default_rng(seed)
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    
+    katalog = generate_katalog(n_items, rng, start_ts, end_ts)
+    katalog.to_excel(out_dir / "katalog_barang.xlsx", index=False)
+    
+    for filename, chunks in [
+        ("riwayat_penyewaan.csv", iter_penyewaan(katalog, n_rentals, rng, end_ts)),
+        ("riwayat_maintenance.csv", iter_maintenance(katalog, n_maintenance, rng, end_ts)),
+    ]:
+        path = out_dir / filename
+        for idx, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if idx == 0 else 'a', header=idx == 0,
+                         index=False, date_format='%Y-%m-%d')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate dataset sintetis untuk scale testing")
+    parser.add_argument('--items', type=int, default=500, help="Jumlah item katalog")
+    parser.add_argument('--rentals', type=int, default=1000, help="Jumlah baris penyewaan")
+    parser.add_argument('--maintenance', type=int, default=800, help="Jumlah baris maintenance")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', default='2022-01-01', help="Tanggal awal pembelian/event")
+    parser.add_argument('--end', default='2025-12-31', help="Tanggal akhir event")
+    parser.add_argument('--out', type=Path, required=True, help="Direktori output")
+    args = parser.parse_args()
+    
+    write_dataset(args.out, args.items, args.rentals, args.maintenance,
+                  seed=args.seed, start=args.start, end=args.end)
+    print(f"Dataset sintetis ditulis ke {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Background Compute Worker
+Stale-while-revalidate untuk hasil mahal yang di-key versi data: selama versi
+baru dihitung di thread background, semua session tetap menerima versi lama.
+Versi baru dipasang dengan satu swap atomik setelah selesai dihitung.
+Satu instance dibagi semua session (lihat loader._compute_worker).
+"""
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+class ComputeWorker:
+    """Satu hasil bersama per versi; recompute tidak pernah berjalan di script thread"""
+    
+    def __init__(self, compute: Callable[[Hashable], object], retry_after: float = 60):
+        self._compute = compute
+        self._lock = threading.Lock()
+        # (key, hasil) yang sedang disajikan - selalu diganti utuh, tidak pernah diubah in-place
+        self._current: Optional[Tuple[Hashable, object]] = None
+        self._pending: Dict[Hashable, Future] = {}
+        # Naik setiap reset: hasil run dari generasi sebelumnya tidak pernah dipasang
+        self._generation = 0
+        # (key, waktu) versi yang terakhir gagal: tidak dijadwalkan ulang sebelum key
+        # berubah atau retry_after detik berlalu
+        self._failed: Optional[Tuple[Hashable, float]] = None
+        self._retry_after = retry_after
+        # Satu thread: versi dihitung berurutan, tidak ada dua recompute yang saling berebut
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='compute-worker')
+        self.last_error: Optional[BaseException] = None
+    
+    def get(self, key: Hashable) -> Tuple[Hashable, object]:
+        """
+        (key yang disajikan, hasil) untuk versi `key`.
+        Jika versi ini belum siap, versi sebelumnya dikembalikan dan versi baru dijadwalkan;
+        hanya cold start (belum ada hasil sama sekali) yang menunggu worker.
+        """
+        while True:
+            current = self._current
+            if current is not None and current[0] == key:
+                return current
+            
+            future = self._submit(key)
+            if current is not None:
+                return current
+            
+            if future is None:
+                # Cold start untuk versi yang baru gagal: error-nya diteruskan tanpa menghitung ulang
+                error = self.last_error
+                if error is not None:
+                    raise error
+                continue
+            try:
+                result = future.result()
+            except CancelledError:
+                # Di-reset sebelum sempat berjalan: jadwalkan ulang di generasi baru
+                continue
+            if result is not None:
+                return result
+    
+    @property
+    def refreshing(self) -> bool:
+        """True selama ada versi baru yang sedang / akan dihitung"""
+        with self._lock:
+            return bool(self._pending)
+    
+    def reset(self) -> None:
+        """
+        Lupakan hasil yang disajikan, versi yang dijadwalkan dan versi yang gagal
+        (mis. setelah cache di-clear); request berikutnya = cold start.
+        Run yang sedang berjalan diselesaikan worker tapi hasilnya dibuang.
+        """
+        with self._lock:
+            self._generation += 1
+            self._current = None
+            self._failed = None
+            self.last_error = None
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.cancel()
+    
+    def _submit(self, key: Hashable) -> Optional[Future]:
+        """Future untuk versi `key`, None jika versi ini baru gagal dan belum boleh dicoba ulang"""
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                if (self._failed is not None and self._failed[0] == key
+                        and time.monotonic() - self._failed[1] < self._retry_after):
+                    return None
+                future = self._executor.submit(self._run, key, self._generation)
+                self._pending[key] = future
+            return future
+    
+    def _run(self, key: Hashable, generation: int) -> Optional[Tuple[Hashable, object]]:
+        """Hitung versi `key`; None jika worker di-reset sebelum / selama perhitungan"""
+        if generation != self._generation:
+            return None
+        
+        try:
+            result = (key, self._compute(key))
+        except BaseException as e:
+            # Versi lama tetap disajikan; versi ini baru dijadwalkan ulang setelah key berubah / retry_after
+            with self._lock:
+                if generation == self._generation:
+                    self._pending.pop(key, None)
+                    self._failed = (key, time.monotonic())
+                    self.last_error = e
+            raise
+        
+        # Swap dan hapus pending dalam satu lock, agar request di antaranya tidak menjadwalkan ulang
+        with self._lock:
+            if generation != self._generation:
+                return None
+            self._current = result
+            self._pending.pop(key, None)
+            self._failed = None
+            self.last_error = None
+        return result
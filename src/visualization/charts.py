@@ -4,6 +4,7 @@ Komponen chart reusable untuk dashboard
 """
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
 import streamlit as st
 from typing import Dict, List
@@ -12,6 +13,8 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from config import STATUS_COLORS, SEVERITY_COLORS, CONDITION_COLORS, COLORS
+from src.data.processor import aggregate_categories, classify_by_thresholds, TREND_GRANULARITIES
+from src.utils.cache import FRAME_HASH_FUNCS
 
 
 def create_recommendation_pie_chart(dist_df: pd.DataFrame) -> go.Figure:
@@ -134,23 +137,25 @@ def create_top_maintenance_chart(top_items_df: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_rental_trend_chart(trends_df: pd.DataFrame) -> go.Figure:
-    """Line chart trend penyewaan"""
+def create_rental_trend_chart(trends_df: pd.DataFrame, granularity: str = 'M') -> go.Figure:
+    """Line chart trend penyewaan (output get_rental_trends, granularity D/W/M/Q)"""
     if trends_df.empty:
         return go.Figure()
     
+    label = TREND_GRANULARITIES.get(granularity, 'Bulanan')
     fig = go.Figure(data=[go.Scatter(
-        x=trends_df['Bulan'],
+        x=trends_df['Periode'],
         y=trends_df['Jumlah Transaksi'],
-        mode='lines+markers',
+        mode='lines+markers' if len(trends_df) <= 60 else 'lines',
         line=dict(color=COLORS['primary'], width=3),
         marker=dict(size=8),
-        hovertemplate='<b>%{x}</b><br>Transaksi: %{y}<extra></extra>'
+        customdata=trends_df['Hari Sewa'],
+        hovertemplate='<b>%{x}</b><br>Transaksi: %{y}<br>Hari sewa: %{customdata}<extra></extra>'
     )])
     
     fig.update_layout(
-        title="Trend Penyewaan Bulanan",
-        xaxis_title="Bulan",
+        title=f"Trend Penyewaan {label}",
+        xaxis_title="Periode",
         yaxis_title="Jumlah Transaksi",
         height=350
     )
@@ -158,6 +163,108 @@ def create_rental_trend_chart(trends_df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+def create_maintenance_mix_chart(mix_df: pd.DataFrame) -> go.Figure:
+    """Stacked bar event maintenance per bulan x jenis_maintenance (output get_maintenance_mix)"""
+    if mix_df.empty:
+        return go.Figure()
+    
+    fig = px.bar(
+        mix_df,
+        x='bulan',
+        y='events',
+        color='jenis_maintenance',
+        title="Komposisi Jenis Maintenance per Bulan",
+        labels={'bulan': 'Bulan', 'events': 'Jumlah Event', 'jenis_maintenance': 'Jenis'}
+    )
+    fig.update_layout(barmode='stack', height=350)
+    
+    return fig
+
+
+def create_demand_forecast_chart(forecast_df: pd.DataFrame, key: str, series: str) -> go.Figure:
+    """Aktual vs forecast satu series beserta band interval (output forecast.forecast_demand)"""
+    data = forecast_df[forecast_df[key] == series]
+    if data.empty:
+        return go.Figure()
+    
+    history = data[data['aktual'].notna()]
+    ahead = data[data['aktual'].isna()]
+    # Forecast disambung dari bulan aktual terakhir agar garis tidak terputus
+    bridge = pd.concat([history.tail(1).assign(forecast=history['aktual'].tail(1)), ahead])
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=list(ahead['Periode']) + list(ahead['Periode'][::-1]),
+        y=list(ahead['upper']) + list(ahead['lower'][::-1]),
+        fill='toself',
+        fillcolor='rgba(31, 119, 180, 0.2)',
+        line=dict(width=0),
+        name='Interval',
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=history['Periode'], y=history['aktual'],
+        mode='lines+markers', name='Aktual',
+        line=dict(color=COLORS['primary'], width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        x=bridge['Periode'], y=bridge['forecast'],
+        mode='lines+markers', name='Forecast',
+        line=dict(color=COLORS['warning'], width=2, dash='dash')
+    ))
+    
+    fig.update_layout(
+        title=f"Forecast Penyewaan Bulanan: {series}",
+        xaxis_title="Periode",
+        yaxis_title="Jumlah Transaksi",
+        height=350,
+        hovermode='x unified'
+    )
+    
+    return fig
+
+
+def create_fleet_health_trend_chart(trend_df: pd.DataFrame) -> go.Figure:
+    """Stacked area jumlah alat per status + garis rata-rata kelayakan per tanggal"""
+    if trend_df.empty:
+        return go.Figure()
+    
+    fig = go.Figure()
+    for label, color in STATUS_COLORS.items():
+        if label not in trend_df:
+            continue
+        fig.add_trace(go.Scatter(
+            x=trend_df['tanggal'],
+            y=trend_df[label],
+            name=label,
+            mode='lines',
+            stackgroup='status',
+            line=dict(width=0.5, color=color),
+            hovertemplate='%{x|%d %b %Y}<br>' + label + ': %{y}<extra></extra>'
+        ))
+    
+    fig.add_trace(go.Scatter(
+        x=trend_df['tanggal'],
+        y=trend_df['avg_kelayakan'],
+        name='Avg Kelayakan',
+        mode='lines',
+        yaxis='y2',
+        line=dict(color='black', width=2, dash='dot'),
+        hovertemplate='%{x|%d %b %Y}<br>Avg Kelayakan: %{y:.1f}%<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title="Trend Kesehatan Armada",
+        xaxis_title="Tanggal",
+        yaxis_title="Jumlah Alat",
+        yaxis2=dict(title="Avg Kelayakan (%)", overlaying='y', side='right', range=[0, 100]),
+        height=400,
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, x=0)
+    )
+    
+    return fig
+
+
 def create_maintenance_ratio_chart(critical_df: pd.DataFrame, top_n: int = 15) -> go.Figure:
     """Bar chart maintenance ratio untuk critical items"""
     if critical_df.empty:
@@ -225,12 +332,40 @@ def create_revenue_by_category_chart(revenue_df: pd.DataFrame) -> go.Figure:
 
 
 def create_utilization_chart(util_df: pd.DataFrame, top_n: int = 15) -> go.Figure:
-    """Bar chart utilisasi alat"""
+    """Bar chart utilisasi alat (okupansi % jika util_df membawa kolom occupancy_pct)"""
     if util_df.empty:
         return go.Figure()
     
     data = util_df.head(top_n)
     
+    if 'occupancy_pct' in data.columns:
+        fig = go.Figure(data=[go.Bar(
+            y=data['nama_barang'] + ' (' + data['kode_barang'] + ')',
+            x=data['occupancy_pct'],
+            orientation='h',
+            marker_color=COLORS['info'],
+            text=data['occupancy_pct'].map(lambda x: f"{x:.0f}%"),
+            textposition='auto',
+            customdata=data[['hari_terpakai', 'hari_tersedia', 'idle_terpanjang',
+                             'puncak_bersamaan', 'freq_sewa']],
+            hovertemplate='<b>%{y}</b><br>Okupansi: %{x:.1f}%<br>' +
+                          'Hari terpakai: %{customdata[0]} / %{customdata[1]}<br>' +
+                          'Idle terpanjang: %{customdata[2]} hari<br>' +
+                          'Sewa bersamaan (puncak): %{customdata[3]}<br>' +
+                          'Freq: %{customdata[4]}x<extra></extra>'
+        )])
+        
+        fig.update_layout(
+            title=f"Top {top_n} Okupansi Alat",
+            xaxis_title="Okupansi (% hari terpakai)",
+            yaxis_title="",
+            height=500,
+            xaxis={'range': [0, 100]},
+            yaxis={'categoryorder': 'total ascending'}
+        )
+        
+        return fig
+    
     fig = go.Figure(data=[go.Bar(
         y=data['nama_barang'],
         x=data['freq_sewa'],
@@ -254,6 +389,52 @@ def create_utilization_chart(util_df: pd.DataFrame, top_n: int = 15) -> go.Figur
     return fig
 
 
+def create_category_occupancy_chart(daily_df: pd.DataFrame) -> go.Figure:
+    """Line chart okupansi harian per kategori (output occupancy.daily_occupancy)"""
+    if daily_df.empty:
+        return go.Figure()
+    
+    fig = px.line(
+        daily_df,
+        x='tanggal',
+        y='occupancy_pct',
+        color='kategori',
+        custom_data=['unit_keluar', 'unit_tersedia'],
+        title="Okupansi Harian per Kategori",
+        labels={'tanggal': 'Tanggal', 'occupancy_pct': 'Okupansi (%)', 'kategori': 'Kategori'}
+    )
+    fig.update_traces(
+        hovertemplate='%{x|%d %b %Y}<br>Okupansi: %{y:.1f}%<br>' +
+                      'Unit keluar: %{customdata[0]} / %{customdata[1]}<extra></extra>'
+    )
+    fig.update_layout(height=350, hovermode='x unified')
+    
+    return fig
+
+
+def create_survival_curve_chart(survival_df: pd.DataFrame) -> go.Figure:
+    """Step chart Kaplan-Meier per kategori (output reliability.survival_curves)"""
+    if survival_df.empty:
+        return go.Figure()
+    
+    fig = px.line(
+        survival_df.assign(survival=survival_df['survival'] * 100),
+        x='hari',
+        y='survival',
+        color='kategori',
+        line_shape='hv',
+        custom_data=['at_risk'],
+        title="Survival Curve: Peluang Belum Perlu Maintenance Lagi",
+        labels={'hari': 'Hari sejak maintenance', 'survival': 'Survival (%)', 'kategori': 'Kategori'}
+    )
+    fig.update_traces(hovertemplate='Hari %{x}<br>Survival: %{y:.1f}%<br>At risk: %{customdata[0]}<extra></extra>')
+    fig.add_hline(y=50, line_dash="dash", line_color="gray", annotation_text="Median")
+    fig.update_layout(height=350, yaxis_range=[0, 105])
+    
+    return fig
+
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
 def create_scatter_feasibility_utilization(insight_df: pd.DataFrame) -> go.Figure:
     """Scatter plot freq_sewa vs kelayakan colored by kategori"""
     if insight_df.empty:
@@ -292,6 +473,7 @@ def create_scatter_feasibility_utilization(insight_df: pd.DataFrame) -> go.Figur
     return fig
 
 
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
 def create_box_feasibility_by_category(insight_df: pd.DataFrame) -> go.Figure:
     """Box plot distribusi kelayakan per kategori"""
     if insight_df.empty:
@@ -321,17 +503,21 @@ def create_box_feasibility_by_category(insight_df: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_heatmap_maintenance_burden(insight_df: pd.DataFrame) -> go.Figure:
-    """Heatmap maintenance_ratio per kategori"""
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def create_heatmap_maintenance_burden(insight_df: pd.DataFrame,
+                                      category_stats: pd.DataFrame = None) -> go.Figure:
+    """Heatmap maintenance_ratio per kategori (category_stats: hasil aggregate_categories jika sudah ada)"""
     if insight_df.empty:
         return go.Figure()
     
-    # Aggregate by category
-    heatmap_data = insight_df.groupby('kategori').agg({
-        'maintenance_ratio': 'mean',
-        'jumlah_maintenance': 'sum',
-        'freq_sewa': 'sum'
-    }).reset_index()
+    # Statistik per kategori dari agregasi bersama (sama dengan Category Performance)
+    if category_stats is None:
+        category_stats = aggregate_categories(insight_df)
+    heatmap_data = category_stats.sort_values('kategori').rename(columns={
+        'avg_maintenance_ratio': 'maintenance_ratio',
+        'total_maintenance': 'jumlah_maintenance',
+        'total_sewa': 'freq_sewa'
+    })
     
     # Create pivot for heatmap
     heatmap_data['avg_ratio_pct'] = heatmap_data['maintenance_ratio'] * 100
@@ -363,33 +549,34 @@ def create_heatmap_maintenance_burden(insight_df: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_quadrant_lifecycle(insight_df: pd.DataFrame) -> go.Figure:
-    """Quadrant chart: freq_sewa vs maintenance_ratio"""
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def create_quadrant_lifecycle(insight_df: pd.DataFrame, summary: Dict = None) -> go.Figure:
+    """
+    Quadrant chart: freq_sewa vs maintenance_ratio
+    summary: hasil get_strategic_insights - garis quadrant memakai median seluruh katalog
+    """
     if insight_df.empty:
         return go.Figure()
     
+    if summary:
+        median_freq, median_ratio = summary['median_freq'], summary['median_maintenance_ratio']
+    else:
+        median_freq, median_ratio = insight_df['freq_sewa'].median(), insight_df['maintenance_ratio'].median()
+    
     # Sample data if too large for performance
     if len(insight_df) > 150:
         plot_df = insight_df.sample(n=150, random_state=42)
     else:
         plot_df = insight_df.copy()
     
-    # Calculate medians for quadrant lines
-    median_freq = plot_df['freq_sewa'].median()
-    median_ratio = plot_df['maintenance_ratio'].median()
-    
-    # Determine quadrant for each item
-    def get_quadrant(row):
-        if row['freq_sewa'] >= median_freq and row['maintenance_ratio'] < median_ratio:
-            return 'High Value / Low Maintenance'
-        elif row['freq_sewa'] >= median_freq and row['maintenance_ratio'] >= median_ratio:
-            return 'High Value / High Maintenance'
-        elif row['freq_sewa'] < median_freq and row['maintenance_ratio'] < median_ratio:
-            return 'Low Value / Low Maintenance'
-        else:
-            return 'Low Value / High Maintenance'
-    
-    plot_df['quadrant'] = plot_df.apply(get_quadrant, axis=1)
+    # Determine quadrant for each item (vectorized)
+    high_value = plot_df['freq_sewa'] >= median_freq
+    high_maintenance = plot_df['maintenance_ratio'] >= median_ratio
+    plot_df['quadrant'] = np.where(
+        high_value,
+        np.where(high_maintenance, 'High Value / High Maintenance', 'High Value / Low Maintenance'),
+        np.where(high_maintenance, 'Low Value / High Maintenance', 'Low Value / Low Maintenance')
+    )
     
     fig = px.scatter(
         plot_df,
@@ -445,14 +632,11 @@ def create_gauge_chart(value: float, title: str, max_value: float = 100,
         thresholds = {'low': 40, 'medium': 70, 'high': 85}
     
     # Determine color based on value
-    if value >= thresholds['high']:
-        color = '#2ecc71'
-    elif value >= thresholds['medium']:
-        color = '#f39c12'
-    elif value >= thresholds['low']:
-        color = '#e67e22'
-    else:
-        color = '#e74c3c'
+    color = classify_by_thresholds(
+        [value],
+        [thresholds['high'], thresholds['medium'], thresholds['low']],
+        ['#2ecc71', '#f39c12', '#e67e22', '#e74c3c']
+    )[0]
     
     # Determine threshold line position based on value
     if value >= thresholds['medium']:
@@ -0,0 +1,11 @@
+"""Konfigurasi pytest: root repo di sys.path (seperti app.py) dan log Streamlit dimatikan"""
+import logging
+import sys
+from pathlib import Path
+
+from streamlit import logger as streamlit_logger
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Fungsi ber-@st.cache_data mengeluarkan warning "No runtime found" di luar `streamlit run`
+streamlit_logger.set_log_level(logging.ERROR)
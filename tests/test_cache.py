@@ -0,0 +1,103 @@
+"""Test key cache berbasis token versi (src.utils.cache) pada fungsi processor & charts"""
+import gc
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+from src.data.processor import calculate_equipment_feasibility, get_recommendation_distribution
+from src.utils import cache
+from src.utils.cache import frame_cache_key, frame_version, stamp_version
+from src.utils.synthetic import generate_dataset
+from src.visualization.charts import create_box_feasibility_by_category
+
+REFERENCE_DATE = pd.Timestamp('2026-01-15')
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    st.cache_data.clear()
+    yield
+    st.cache_data.clear()
+
+
+def _insight(n_rentals: int) -> pd.DataFrame:
+    katalog, penyewaan, maintenance = generate_dataset(n_items=80, n_rentals=n_rentals, n_maintenance=300)
+    return calculate_equipment_feasibility(katalog, penyewaan, maintenance, REFERENCE_DATE)
+
+
+def _distribution(insight_df: pd.DataFrame) -> dict:
+    return get_recommendation_distribution(insight_df).set_index('Rekomendasi')['Jumlah'].to_dict()
+
+
+def _box(insight_df: pd.DataFrame) -> str:
+    return create_box_feasibility_by_category(insight_df).to_json()
+
+
+def _expected_box(insight_df: pd.DataFrame) -> str:
+    """Chart yang dibangun tanpa cache dari isi frame"""
+    return create_box_feasibility_by_category.__wrapped__(insight_df).to_json()
+
+
+def _expected_distribution(insight_df: pd.DataFrame) -> dict:
+    counts = insight_df['rekomendasi'].value_counts()
+    return counts[counts > 0].to_dict()
+
+
+def test_new_token_misses_cache():
+    old, new = _insight(200), _insight(4000)
+    assert _distribution(old) != _distribution(new)
+    
+    stamp_version(old, ('insight', 'v1'))
+    stamp_version(new, ('insight', 'v2'))
+    old_dist, old_box = _distribution(old), _box(old)
+    # Versi baru -> key baru: hasil dihitung dari isi frame baru, bukan cache versi lama
+    assert _distribution(new) == _expected_distribution(new)
+    assert _box(new) == _expected_box(new)
+    assert _distribution(new) != old_dist
+    assert _box(new) != old_box
+
+
+def test_untokenized_frame_changed_content_misses_cache():
+    insight = _insight(1000)
+    before = _distribution(insight)
+    
+    changed = insight.copy()
+    changed['rekomendasi'] = 'PERLU PERHATIAN KHUSUS'
+    changed['kelayakan'] = changed['kelayakan'] / 2
+    assert frame_version(changed) is None
+    assert _distribution(changed) == {'PERLU PERHATIAN KHUSUS': len(changed)}
+    assert _box(changed) == _expected_box(changed)
+    assert _distribution(insight) == before
+
+
+def test_derived_frame_is_keyed_by_own_token_or_content():
+    insight = stamp_version(_insight(1000), ('insight', 'v1'))
+    categories = insight['kategori'].dropna().unique()
+    _distribution(insight)
+    
+    # Frame turunan tanpa token tidak mewarisi token induknya -> di-hash dari isinya
+    subset = insight[insight['kategori'] == categories[0]].copy()
+    assert frame_version(subset) is None
+    assert _distribution(subset) == _expected_distribution(subset)
+    
+    # Seperti filtered_df di app.py: token turunan per pilihan kategori
+    for selected in [categories[:1], categories[1:3]]:
+        filtered = insight[insight['kategori'].isin(selected)].copy()
+        stamp_version(filtered, (frame_version(insight), 'kategori', tuple(sorted(selected))))
+        assert _distribution(filtered) == _expected_distribution(filtered)
+        assert _box(filtered) == _expected_box(filtered)
+
+
+def test_token_is_dropped_when_frame_is_collected():
+    frame = stamp_version(pd.DataFrame({'a': [1, 2]}), ('versi', 1))
+    assert frame_cache_key(frame) == ('version', ('versi', 1))
+    
+    key = id(frame)
+    del frame
+    gc.collect()
+    # Objek baru yang kebetulan mendapat id yang sama tidak mewarisi token
+    reused = pd.DataFrame({'a': [3, 4]})
+    assert frame_version(reused) is None
+    assert frame_cache_key(reused)[0] == 'content'
+    assert key not in cache._TOKENS
@@ -0,0 +1,63 @@
+"""Test forecast demand bulanan (src.data.forecast)"""
+import numpy as np
+import pandas as pd
+
+from src.data import forecast
+
+
+def _trends(months: pd.DatetimeIndex, categories=('tenda', 'tidur')) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Periode': np.repeat(months, len(categories)),
+        'kategori': np.tile(categories, len(months)),
+        'Jumlah Transaksi': rng.integers(5, 20, len(months) * len(categories)),
+    })
+
+
+def test_gap_before_as_of_is_zero_filled_and_horizon_starts_at_as_of():
+    # Transaksi terakhir Januari 2026, as_of pertengahan Oktober 2026
+    trends = _trends(pd.date_range('2023-03-01', '2026-01-01', freq='MS'))
+    result = forecast.forecast_demand(trends, 'kategori', as_of=pd.Timestamp('2026-10-18'))
+    
+    history = result[result['aktual'].notna()]
+    ahead = result[result['aktual'].isna()]
+    assert history['Periode'].max() == pd.Timestamp('2026-09-01')
+    gap = history[history['Periode'] > pd.Timestamp('2026-01-01')]
+    assert len(gap) == 8 * 2 and (gap['aktual'] == 0).all()
+    assert sorted(ahead['Periode'].unique()) == list(pd.date_range('2026-10-01', periods=3, freq='MS'))
+
+
+def test_current_month_is_excluded():
+    trends = _trends(pd.date_range('2024-01-01', '2026-10-01', freq='MS'))
+    matrix, labels, periods = forecast.demand_matrix(trends, 'kategori', as_of=pd.Timestamp('2026-10-18'))
+    assert periods[-1] == pd.Timestamp('2026-09-01')
+    assert matrix.shape == (2, len(periods))
+
+
+def _reference(y, alpha, beta, gamma, m=12, horizon=3):
+    """Holt-Winters aditif satu series dengan loop Python biasa"""
+    level = y[:m].mean()
+    trend = (y[m:2 * m].mean() - level) / m
+    season = list(y[:m] - level)
+    sse = 0.0
+    for t in range(m, len(y)):
+        sse += (y[t] - (level + trend + season[t % m])) ** 2
+        prev = level
+        level = alpha * (y[t] - season[t % m]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev) + (1 - beta) * trend
+        season[t % m] = gamma * (y[t] - level) + (1 - gamma) * season[t % m]
+    ahead = [level + h * trend + season[(len(y) + h - 1) % m] for h in range(1, horizon + 1)]
+    return sse, np.maximum(ahead, 0)
+
+
+def test_batched_fit_matches_per_series_reference():
+    rng = np.random.default_rng(1)
+    t = np.arange(34)
+    matrix = 20 + 0.3 * t + 5 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 1, (6, len(t)))
+    result = forecast.fit_holt_winters(matrix)
+    
+    for i, y in enumerate(matrix):
+        best = min(forecast.SMOOTHING_GRID, key=lambda p: _reference(y, *p)[0])
+        np.testing.assert_allclose(result.params[i], best)
+        np.testing.assert_allclose(result.forecast[i], _reference(y, *best)[1])
+    assert (result.lower <= result.forecast).all() and (result.forecast <= result.upper).all()
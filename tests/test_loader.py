@@ -0,0 +1,142 @@
+"""Test ingest history inkremental (src.data.loader)"""
+import pandas as pd
+import pytest
+
+from src.data import loader
+from src.data.processor import aggregate_rentals
+
+HEADER = "id_penyewaan,kode_barang,nama_pelanggan,tanggal_sewa,durasi_sewa\n"
+ROWS = [
+    "R0001,T201,Joko,2025-11-14,1\n",
+    "R0002,T202,Budi,2025-11-19,4\n",
+    "R0003,T202,Gita,2023-07-09,3\n",
+]
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, 'ENABLE_SNAPSHOT_CACHE', False)
+    path = tmp_path / "riwayat_penyewaan.csv"
+    path.write_text(HEADER + "".join(ROWS))
+    yield path
+    loader._INCREMENTAL_STATE.pop(str(path), None)
+
+
+def _ingest(path):
+    return loader._ingest_history(path, loader.get_file_fingerprint(path),
+                                  loader.PENYEWAAN_SCHEMA, aggregate_rentals)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_append_after_fingerprint_is_ingested_once(history, monkeypatch, streaming):
+    monkeypatch.setattr(loader, 'STREAMING_MODE', streaming)
+    fingerprint = loader.get_file_fingerprint(history)
+    # Baris di-append di antara stat (fingerprint) dan read
+    with open(history, 'a') as f:
+        f.write("R9001,T202,Zed,2025-12-30,2\n")
+    
+    df, agg = loader._ingest_history(history, fingerprint, loader.PENYEWAAN_SCHEMA, aggregate_rentals)
+    assert agg.set_index('kode_barang').loc['T202', 'freq_sewa'] == 2
+    
+    df, agg = _ingest(history)
+    assert agg.set_index('kode_barang').loc['T202', 'freq_sewa'] == 3
+    assert df['id_penyewaan'].tolist().count('R9001') == 1
+
+
+def test_incremental_append_matches_full_read(history):
+    _ingest(history)
+    with open(history, 'a') as f:
+        f.write("R0004,T201,Gita,2025-11-07,8\n")
+    df, agg = _ingest(history)
+    
+    loader._INCREMENTAL_STATE.pop(str(history))
+    full_df, full_agg = _ingest(history)
+    assert df['id_penyewaan'].tolist() == full_df['id_penyewaan'].tolist()
+    assert agg.sort_values('kode_barang').to_dict('list') == full_agg.sort_values('kode_barang').to_dict('list')
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_penyewaan_ingest_state_is_per_item(history, monkeypatch, streaming):
+    monkeypatch.setattr(loader, 'STREAMING_MODE', streaming)
+    monkeypatch.setattr(loader, 'RIWAYAT_PENYEWAAN_FILE', history)
+    loader._ingest_penyewaan(loader.get_file_fingerprint(history))
+    with open(history, 'a') as f:
+        f.write("R0004,T201,Gita,2025-11-07,8\n")
+    _, agg = loader._ingest_penyewaan(loader.get_file_fingerprint(history))
+    
+    # Satu baris per barang (bukan barang x hari), juga setelah append
+    assert list(agg.columns) == ['kode_barang', 'freq_sewa', 'total_hari_sewa']
+    assert agg.set_index('kode_barang')['freq_sewa'].to_dict() == {'T201': 2, 'T202': 2}
+
+
+def test_failed_load_is_not_cached(monkeypatch):
+    monkeypatch.setattr(loader, 'ENABLE_SNAPSHOT_CACHE', False)
+    real = loader._ingest_maintenance
+    calls = []
+    
+    def flaky(fingerprint):
+        calls.append(fingerprint)
+        if len(calls) == 1:
+            raise OSError("file sedang ditulis")
+        return real(fingerprint)
+    
+    monkeypatch.setattr(loader, '_ingest_maintenance', flaky)
+    key = loader._current_load_key()
+    loader._load_all_data.clear()
+    try:
+        with pytest.raises(loader.SourceLoadError) as error:
+            loader._load_all_data(*key)
+        assert list(error.value.errors) == ['maintenance']
+        
+        # Fingerprint sama, tetapi load berikutnya mencoba lagi (bukan frame kosong dari cache)
+        assert not loader._load_all_data(*key)[2].empty
+        assert len(calls) == 2
+    finally:
+        loader._load_all_data.clear()
+        loader._INCREMENTAL_STATE.clear()
+
+
+def test_state_holds_no_frame_and_append_reads_snapshot(history, monkeypatch, tmp_path):
+    monkeypatch.setattr(loader, 'ENABLE_SNAPSHOT_CACHE', True)
+    monkeypatch.setattr(loader, 'SNAPSHOT_DIR', tmp_path / ".snapshot")
+    _ingest(history)
+    assert loader._INCREMENTAL_STATE[str(history)]['df'] is None
+    
+    with open(history, 'a') as f:
+        f.write("R0004,T201,Gita,2025-11-07,8\n")
+    parsed = []
+    read_csv_typed = loader._read_csv_typed
+    
+    def spy(source, *args, **kwargs):
+        df = read_csv_typed(source, *args, **kwargs)
+        parsed.append(len(df))
+        return df
+    
+    monkeypatch.setattr(loader, '_read_csv_typed', spy)
+    df, agg = _ingest(history)
+    # Hanya baris baru yang di-parse; sisanya dari snapshot versi sebelumnya
+    assert parsed == [1]
+    assert loader._INCREMENTAL_STATE[str(history)]['df'] is None
+    
+    loader._INCREMENTAL_STATE.pop(str(history))
+    monkeypatch.setattr(loader, 'ENABLE_SNAPSHOT_CACHE', False)
+    full_df, full_agg = _ingest(history)
+    pd.testing.assert_frame_equal(df, full_df)
+    assert agg.sort_values('kode_barang').to_dict('list') == full_agg.sort_values('kode_barang').to_dict('list')
+
+
+def test_insight_is_computed_as_of_key_date(monkeypatch):
+    from src.data.processor import calculate_equipment_feasibility
+    
+    monkeypatch.setattr(loader, 'ENABLE_SNAPSHOT_CACHE', False)
+    fingerprints, _ = loader._current_load_key()
+    # Versi dengan tanggal lain di key (mis. versi stale yang dihitung worker setelah tengah malam)
+    today = pd.Timestamp('2025-06-30')
+    loader._load_all_data.clear()
+    try:
+        katalog, penyewaan, maintenance, insight, _ = loader._load_all_data(fingerprints, today)
+        expected = calculate_equipment_feasibility.__wrapped__(katalog, penyewaan, maintenance, today)
+        pd.testing.assert_frame_equal(insight, expected, check_exact=True)
+    finally:
+        loader._load_all_data.clear()
+        loader._INCREMENTAL_STATE.clear()
@@ -0,0 +1,96 @@
+"""Test okupansi sweep-line (src.data.occupancy) terhadap perhitungan brute-force per hari"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.occupancy import build_rental_intervals, daily_occupancy, item_occupancy
+
+START, END = pd.Timestamp('2025-01-01'), pd.Timestamp('2025-02-15')
+
+
+def _dataset(seed: int):
+    rng = np.random.default_rng(seed)
+    kode = [f"T{i}" for i in range(8)]
+    katalog = pd.DataFrame({
+        'kode_barang': kode,
+        'kategori': rng.choice(['Tenda', 'Carrier', 'Kompor'], size=len(kode)),
+        # Sebagian dibeli setelah awal rentang, satu setelah akhir rentang, satu tanpa tanggal
+        'tanggal_pembelian': pd.to_datetime(['2024-06-01', '2025-01-10', '2025-01-20', None,
+                                             '2025-03-01', '2024-12-31', '2025-02-15', '2025-01-01']),
+    })
+    n = 60
+    penyewaan = pd.DataFrame({
+        # Termasuk kode di luar katalog
+        'kode_barang': rng.choice(kode + ['X9'], size=n),
+        'tanggal_sewa': START + pd.to_timedelta(rng.integers(-15, 50, size=n), unit='D'),
+        # Durasi <= 0 dan kosong dihitung satu hari
+        'durasi_sewa': pd.array(rng.choice([-2, 0, 1, 2, 3, 5, 8, 13, None], size=n), dtype='Int64'),
+    })
+    penyewaan.loc[penyewaan.index[::9], 'tanggal_sewa'] = pd.NaT
+    return katalog, penyewaan
+
+
+def _brute_force_counts(katalog: pd.DataFrame, penyewaan: pd.DataFrame) -> pd.DataFrame:
+    """Jumlah sewa berjalan per barang x hari dalam rentang; NaN sebelum barang dibeli"""
+    days = pd.date_range(START, END, freq='D')
+    counts = pd.DataFrame(0.0, index=katalog['kode_barang'], columns=days)
+    for row in penyewaan.itertuples():
+        if row.kode_barang not in counts.index or pd.isna(row.tanggal_sewa):
+            continue
+        durasi = 1 if pd.isna(row.durasi_sewa) else max(int(row.durasi_sewa), 1)
+        for offset in range(durasi):
+            day = row.tanggal_sewa + pd.Timedelta(days=offset)
+            if START <= day <= END:
+                counts.loc[row.kode_barang, day] += 1
+    
+    for item in katalog.itertuples():
+        if pd.notna(item.tanggal_pembelian):
+            counts.loc[item.kode_barang, days < item.tanggal_pembelian] = np.nan
+    return counts
+
+
+def _longest_idle(values: np.ndarray) -> int:
+    longest = run = 0
+    for value in values:
+        run = run + 1 if value == 0 else 0
+        longest = max(longest, run)
+    return longest
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_item_occupancy_matches_brute_force(seed):
+    katalog, penyewaan = _dataset(seed)
+    actual = item_occupancy(build_rental_intervals(penyewaan, katalog), katalog, START, END)
+    
+    counts = _brute_force_counts(katalog, penyewaan)
+    for row in actual.itertuples():
+        kode = row.kode_barang
+        values = counts.loc[kode].dropna().to_numpy()
+        assert row.hari_tersedia == len(values), kode
+        assert row.hari_terpakai == np.count_nonzero(values > 0), kode
+        assert row.hari_idle == np.count_nonzero(values == 0), kode
+        assert row.idle_terpanjang == _longest_idle(values), kode
+        assert row.hari_sewa == values.sum(), kode
+        assert row.puncak_bersamaan == values.max(initial=0), kode
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_daily_occupancy_matches_brute_force(seed):
+    katalog, penyewaan = _dataset(seed)
+    actual = daily_occupancy(build_rental_intervals(penyewaan, katalog), katalog, START, END)
+    
+    counts = _brute_force_counts(katalog, penyewaan)
+    kategori = katalog.set_index('kode_barang')['kategori']
+    expected = pd.DataFrame({
+        'unit_keluar': counts.groupby(kategori).sum().stack(),
+        'unit_tersedia': counts.notna().groupby(kategori).sum().stack(),
+    })
+    expected.index.names = ['kategori', 'tanggal']
+    
+    actual = actual.set_index(['kategori', 'tanggal'])
+    assert len(actual) == len(expected)
+    expected = expected.loc[actual.index]
+    np.testing.assert_array_equal(actual['unit_keluar'], expected['unit_keluar'])
+    np.testing.assert_array_equal(actual['unit_tersedia'], expected['unit_tersedia'])
+    pct = np.where(expected['unit_tersedia'] > 0, expected['unit_keluar'] / expected['unit_tersedia'] * 100, 0)
+    np.testing.assert_allclose(actual['occupancy_pct'], pct)
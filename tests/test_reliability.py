@@ -0,0 +1,124 @@
+"""Test reliability analytics (src.data.reliability) terhadap groupby/diff naif dan kurva hitungan tangan"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.occupancy import build_rental_intervals
+from src.data.reliability import (
+    build_maintenance_events, item_reliability, maintenance_intervals, survival_curves
+)
+
+AS_OF = pd.Timestamp('2025-06-30')
+
+
+def _dataset(seed: int):
+    rng = np.random.default_rng(seed)
+    kode = [f"T{i}" for i in range(10)]
+    katalog = pd.DataFrame({
+        'kode_barang': kode,
+        'kategori': rng.choice(['Tenda', 'Carrier'], size=len(kode)),
+        'tanggal_pembelian': pd.Timestamp('2024-01-01'),
+    })
+    n = 80
+    maintenance = pd.DataFrame({
+        'id_maintenance': [f"M{i}" for i in range(n)],
+        'kode_barang': rng.choice(kode + ['X9'], size=n),
+        'tanggal_maintenance': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 200, size=n), unit='D'),
+    })
+    # Duplikat di hari yang sama (mis. dua komponen diperbaiki sekaligus) dan tanggal kosong
+    maintenance = pd.concat([maintenance, maintenance.iloc[::7]], ignore_index=True)
+    maintenance.loc[maintenance.index[::11], 'tanggal_maintenance'] = pd.NaT
+    penyewaan = pd.DataFrame({
+        'kode_barang': rng.choice(kode, size=150),
+        'tanggal_sewa': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 200, size=150), unit='D'),
+        'durasi_sewa': rng.integers(1, 5, size=150),
+    })
+    return katalog, maintenance, penyewaan
+
+
+def _naive_events(maintenance: pd.DataFrame, katalog: pd.DataFrame) -> pd.DataFrame:
+    """Satu baris per (barang, hari maintenance) sampai AS_OF, terurut"""
+    events = maintenance.dropna(subset=['tanggal_maintenance'])
+    events = events[events['kode_barang'].isin(katalog['kode_barang']) & (events['tanggal_maintenance'] <= AS_OF)]
+    events = events[['kode_barang', 'tanggal_maintenance']].drop_duplicates()
+    return events.sort_values(['kode_barang', 'tanggal_maintenance'], ignore_index=True)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_item_reliability_matches_naive_groupby_diff(seed):
+    katalog, maintenance, penyewaan = _dataset(seed)
+    events = build_maintenance_events(maintenance, katalog, until=AS_OF)
+    actual = item_reliability(events, katalog, AS_OF).set_index('kode_barang')
+    
+    naive = _naive_events(maintenance, katalog)
+    naive['interval'] = naive.groupby('kode_barang')['tanggal_maintenance'].diff().dt.days
+    grouped = naive.groupby('kode_barang')
+    expected = pd.DataFrame({
+        'jumlah_maintenance': grouped.size(),
+        'jumlah_interval': grouped['interval'].count(),
+        'mtbf_hari': grouped['interval'].mean(),
+        'interval_terpendek': grouped['interval'].min(),
+        'interval_terpanjang': grouped['interval'].max(),
+        'hari_sejak_maintenance': (AS_OF - grouped['tanggal_maintenance'].max()).dt.days.astype(float),
+    }).reindex(katalog['kode_barang'])
+    expected[['jumlah_maintenance', 'jumlah_interval']] = expected[['jumlah_maintenance', 'jumlah_interval']].fillna(0)
+    
+    # Tidak ada interval 0 hari dari duplikat di hari yang sama
+    assert (actual['interval_terpendek'].dropna() > 0).all()
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False, check_names=False)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_rentals_between_maintenance_matches_naive_count(seed):
+    katalog, maintenance, penyewaan = _dataset(seed)
+    events = build_maintenance_events(maintenance, katalog, until=AS_OF)
+    rentals = build_rental_intervals(penyewaan, katalog)
+    actual = maintenance_intervals(events, katalog, rentals)
+    
+    naive = _naive_events(maintenance, katalog)
+    naive['selesai'] = naive.groupby('kode_barang')['tanggal_maintenance'].shift(-1)
+    naive = naive.dropna(subset=['selesai'])
+    # Sewa yang mulai pada hari maintenance dihitung ke interval yang dimulai hari itu
+    expected = [
+        int(((penyewaan['kode_barang'] == row.kode_barang)
+             & (penyewaan['tanggal_sewa'] >= row.tanggal_maintenance)
+             & (penyewaan['tanggal_sewa'] < row.selesai)).sum())
+        for row in naive.itertuples()
+    ]
+    assert actual['kode_barang'].tolist() == naive['kode_barang'].tolist()
+    assert actual['interval_hari'].tolist() == (naive['selesai'] - naive['tanggal_maintenance']).dt.days.tolist()
+    assert actual['sewa_di_antara'].tolist() == expected
+    
+    reliability = item_reliability(events, katalog, AS_OF, rentals).set_index('kode_barang')
+    per_item = actual.groupby('kode_barang')['sewa_di_antara'].mean()
+    pd.testing.assert_series_equal(reliability['sewa_antar_maintenance'].dropna(), per_item,
+                                   check_names=False, check_index_type=False)
+
+
+def test_survival_curve_matches_hand_computed_kaplan_meier():
+    day = lambda n: pd.Timestamp('2025-01-01') + pd.Timedelta(days=n)
+    as_of = day(40)
+    katalog = pd.DataFrame({
+        'kode_barang': ['T1', 'T2', 'T3', 'T4'],
+        'kategori': ['A', 'A', 'A', 'B'],
+        'tanggal_pembelian': [day(-100), day(-100), day(-10), day(-100)],
+    })
+    maintenance = pd.DataFrame({
+        'kode_barang': ['T1', 'T1', 'T1', 'T2', 'T2', 'T2', 'T4'],
+        # T2: dua baris di hari 5 = satu event
+        'tanggal_maintenance': [day(0), day(10), day(25), day(5), day(5), day(25), day(30)],
+    })
+    events = build_maintenance_events(maintenance, katalog, until=as_of)
+    curves = survival_curves(events, katalog, as_of)
+    
+    # Kategori A - teramati: 10, 15 (T1), 20 (T2); tersensor: 15 (T1), 15 (T2), 50 (T3 belum pernah maintenance)
+    # S(10) = 5/6, S(15) = 5/6 * 4/5, S(20) = 2/3 * 1/2, hari 50 hanya sensor
+    expected = pd.DataFrame({
+        'kategori': ['A'] * 5 + ['B'] * 2,
+        'hari': [0, 10, 15, 20, 50, 0, 10],
+        'at_risk': [6, 6, 5, 2, 1, 1, 1],
+        'maintenance': [0, 1, 1, 1, 0, 0, 0],
+        'tersensor': [0, 0, 2, 0, 1, 0, 1],
+        'survival': [1, 5 / 6, 2 / 3, 1 / 3, 1 / 3, 1, 1],
+    })
+    pd.testing.assert_frame_equal(curves, expected, check_dtype=False)
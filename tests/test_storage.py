@@ -0,0 +1,121 @@
+"""Test backend SQLite (src.data.storage) dan ingest history ke database (src.data.loader)"""
+import pandas as pd
+import pytest
+
+from src.data import loader, storage
+from src.data.processor import aggregate_maintenance, aggregate_rentals
+
+HEADER = "id_penyewaan,kode_barang,nama_pelanggan,tanggal_sewa,durasi_sewa\n"
+ROWS = [
+    "R0001,T201,Joko,2025-11-14,1\n",
+    "R0002,T202,Budi,2025-11-19,4\n",
+    "R0003,T202,Gita,,3\n",
+]
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'SQLITE_DB_FILE', tmp_path / "dashboard.sqlite")
+    monkeypatch.setattr(loader, 'ENABLE_SNAPSHOT_CACHE', False)
+    path = tmp_path / "riwayat_penyewaan.csv"
+    path.write_text(HEADER + "".join(ROWS))
+    yield path
+    loader._INCREMENTAL_STATE.pop(str(path), None)
+
+
+def _sync(path):
+    fingerprint = loader.get_file_fingerprint(path)
+    loader._sync_history_sqlite(path, 'penyewaan', fingerprint, loader.PENYEWAAN_SCHEMA)
+    return fingerprint
+
+
+def _pandas(path, fingerprint):
+    return loader._ingest_history(path, fingerprint, loader.PENYEWAAN_SCHEMA, aggregate_rentals)
+
+
+def _spy_writes(monkeypatch):
+    """Catat (replace, jumlah baris) setiap write_source"""
+    writes = []
+    write_source = storage.write_source
+    
+    def spy(conn, source, chunks, fingerprint, replace, byte_offset, probe):
+        chunks = list(chunks)
+        writes.append((replace, sum(len(chunk) for chunk in chunks)))
+        return write_source(conn, source, chunks, fingerprint, replace, byte_offset, probe)
+    
+    monkeypatch.setattr(storage, 'write_source', spy)
+    return writes
+
+
+def test_sync_appends_only_delta_for_appended_file(history, monkeypatch):
+    writes = _spy_writes(monkeypatch)
+    _sync(history)
+    with open(history, 'a') as f:
+        f.write("R0004,T201,Gita,2025-11-07,8\n")
+    fingerprint = _sync(history)
+    assert writes == [(True, 3), (False, 1)]
+    
+    # Versi yang sama tidak di-ingest ulang
+    _sync(history)
+    assert len(writes) == 2
+    
+    stored = loader._typed_history(storage.read_source('penyewaan', fingerprint), loader.PENYEWAAN_SCHEMA)
+    pd.testing.assert_frame_equal(stored, _pandas(history, fingerprint)[0], check_categorical=False)
+
+
+def test_rewritten_file_replaces_table(history, monkeypatch):
+    writes = _spy_writes(monkeypatch)
+    _sync(history)
+    history.write_text(HEADER + "".join(reversed(ROWS)))
+    fingerprint = _sync(history)
+    assert writes == [(True, 3), (True, 3)]
+    assert storage.read_source('penyewaan', fingerprint)['id_penyewaan'].tolist() == ['R0003', 'R0002', 'R0001']
+
+
+def test_old_version_never_overwrites_newer_database(history, monkeypatch):
+    old = loader.get_file_fingerprint(history)
+    with open(history, 'a') as f:
+        f.write("R0004,T201,Gita,2025-11-07,8\n")
+    new = _sync(history)
+    
+    writes = _spy_writes(monkeypatch)
+    loader._sync_history_sqlite(history, 'penyewaan', old, loader.PENYEWAAN_SCHEMA)
+    assert writes == []
+    # Query hanya dijawab untuk versi yang ada di database
+    assert storage.query_rental_aggregates(old) is None
+    assert storage.query_rental_cube(old) is None
+    assert storage.read_source('penyewaan', old) is None
+    assert storage.query_rental_aggregates(new) is not None
+
+
+def test_sql_aggregates_match_pandas(history):
+    fingerprint = _sync(history)
+    df, expected = _pandas(history, fingerprint)
+    actual = storage.query_rental_aggregates(fingerprint)
+    assert actual.sort_values('kode_barang').to_dict('list') == expected.sort_values('kode_barang').to_dict('list')
+    
+    maintenance = pd.DataFrame({
+        'id_maintenance': ['M1', 'M2', None, 'M4'],
+        'kode_barang': ['T1', 'T1', 'T2', 'T2'],
+        'severity': ['Ringan', None, 'Berat', 'Berat'],
+    })
+    with storage.ingest_transaction() as conn:
+        storage.write_source(conn, 'maintenance', [maintenance], ('m1',), True, 0, b'')
+    keys = ['kode_barang', 'severity']
+    actual = storage.query_maintenance_aggregates(('m1',)).sort_values(keys, ignore_index=True)
+    expected = aggregate_maintenance(maintenance).sort_values(keys, ignore_index=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_ingest_falls_back_to_pandas_for_version_not_in_database(history, monkeypatch):
+    monkeypatch.setattr(loader, 'RIWAYAT_PENYEWAAN_FILE', history)
+    old = loader.get_file_fingerprint(history)
+    with open(history, 'a') as f:
+        f.write("R0004,T201,Gita,2025-11-07,8\n")
+    _sync(history)
+    
+    preview, agg = loader._ingest_penyewaan_sqlite(old)
+    # Versi lama dihitung dari prefix file (3 baris), database tetap berisi versi baru
+    assert preview['id_penyewaan'].tolist() == ['R0001', 'R0002', 'R0003']
+    assert agg.set_index('kode_barang')['freq_sewa'].to_dict() == {'T201': 1, 'T202': 2}
+    assert storage.query_rental_aggregates(loader.get_file_fingerprint(history)) is not None
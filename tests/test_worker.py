@@ -0,0 +1,115 @@
+"""Test worker stale-while-revalidate (src.utils.worker)"""
+import threading
+
+import pytest
+
+from src.data import loader
+from src.utils.worker import ComputeWorker
+
+
+class Compute:
+    """compute() yang bisa ditahan (gate) dan digagalkan per key; mencatat key yang dihitung"""
+    
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+    
+    def __call__(self, key):
+        self.calls.append(key)
+        self.started.set()
+        self.gate.wait(5)
+        if key in self.failing:
+            raise RuntimeError(f"gagal {key}")
+        return f"hasil {key}"
+
+
+def _drain(worker: ComputeWorker) -> None:
+    """Tunggu sampai semua run yang sudah dijadwalkan selesai"""
+    worker._executor.submit(lambda: None).result(5)
+
+
+def test_failed_version_is_not_resubmitted_until_key_changes_or_cooldown():
+    compute = Compute()
+    worker = ComputeWorker(compute, retry_after=3600)
+    assert worker.get('v1') == ('v1', 'hasil v1')
+    
+    compute.failing.add('v2')
+    for _ in range(5):
+        # Versi lama tetap disajikan, versi gagal tidak dijadwalkan ulang setiap get()
+        assert worker.get('v2') == ('v1', 'hasil v1')
+        _drain(worker)
+        assert not worker.refreshing
+    assert compute.calls == ['v1', 'v2']
+    assert str(worker.last_error) == "gagal v2"
+    
+    # Key baru (fingerprint berubah) langsung dihitung
+    assert worker.get('v3') == ('v1', 'hasil v1')
+    _drain(worker)
+    assert worker.get('v3') == ('v3', 'hasil v3')
+    assert worker.last_error is None
+    
+    # Setelah cooldown lewat, versi yang gagal dicoba ulang
+    compute.failing.add('v4')
+    worker._retry_after = 0
+    worker.get('v4')
+    _drain(worker)
+    worker.get('v4')
+    _drain(worker)
+    assert compute.calls == ['v1', 'v2', 'v3', 'v4', 'v4']
+
+
+def test_cold_start_failure_is_raised_without_recompute():
+    compute = Compute()
+    compute.failing.add('v1')
+    worker = ComputeWorker(compute, retry_after=3600)
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match="gagal v1"):
+            worker.get('v1')
+    assert compute.calls == ['v1']
+
+
+def test_reset_drops_in_flight_and_pending_versions():
+    compute = Compute()
+    worker = ComputeWorker(compute)
+    assert worker.get('v1') == ('v1', 'hasil v1')
+    
+    # v2 sedang dihitung, v3 menunggu di antrian saat reset
+    compute.gate.clear()
+    compute.started.clear()
+    worker.get('v2')
+    assert compute.started.wait(5)
+    worker.get('v3')
+    worker.reset()
+    assert not worker.refreshing
+    
+    compute.gate.set()
+    _drain(worker)
+    # Hasil v2 (generasi lama) tidak dipasang, v3 tidak pernah dihitung
+    assert worker._current is None
+    assert compute.calls == ['v1', 'v2']
+    
+    assert worker.get('v3') == ('v3', 'hasil v3')
+    assert compute.calls == ['v1', 'v2', 'v3']
+
+
+def test_refresh_cache_clears_incremental_state_under_file_lock(monkeypatch):
+    monkeypatch.setattr(loader, 'BACKGROUND_COMPUTE', False)
+    monkeypatch.setattr(loader, 'SNAPSHOT_DIR', loader.SNAPSHOT_DIR / "tidak-ada")
+    monkeypatch.setattr(loader, '_INCREMENTAL_STATE', {'a.csv': {'rows': 1}})
+    lock = threading.Lock()
+    monkeypatch.setattr(loader, '_INCREMENTAL_LOCKS', {'a.csv': lock})
+    
+    # Ingest yang sedang berjalan memegang lock file: refresh menunggu sampai ingest selesai
+    lock.acquire()
+    refresh = threading.Thread(target=loader.refresh_cache)
+    refresh.start()
+    refresh.join(0.2)
+    assert refresh.is_alive()
+    assert 'a.csv' in loader._INCREMENTAL_STATE
+    
+    lock.release()
+    refresh.join(5)
+    assert loader._INCREMENTAL_STATE == {}